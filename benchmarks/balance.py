@@ -0,0 +1,310 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains a Monte Carlo simulation of whole games on headless boards
+to tune the level time, the level goals and the number of colors. Games are
+played by a policy and sharded over a pool of processes, and the aggregate
+results are printed as the shards finish.
+
+Run it from the repository root:
+
+    python -m benchmarks.balance --games 100000 --policy greedy
+"""
+
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+from src.core import BitboardBoardCore, BoardCore, CascadeStep
+from src.core.MoveIndex import Move
+from src.core.Solver import (
+    Solver,
+    cascade_points,
+    evaluate_move,
+    evaluate_power_up,
+    resolve_power_up,
+    valid_moves,
+    POINTS_PER_TILE,
+)
+
+# Game time spent by the swap and by every fall of a cascade, as the tweens
+# of PlayState
+SWAP_TIME = 0.25
+FALL_TIME = 0.25
+# Width of the buckets of the score histograms
+SCORE_BUCKET = 250
+
+# A swap (i1, j1, i2, j2) or the click on the power-up at (i, j)
+Action = Tuple[int, ...]
+
+
+def random_policy(core: BoardCore) -> Move:
+    return random.choice(valid_moves(core))
+
+
+def greedy_policy(core: BoardCore) -> Move:
+    return Solver(seed=random.getrandbits(32)).best_move(core, 1)
+
+
+def solver_policy(core: BoardCore) -> Move:
+    return Solver(seed=random.getrandbits(32)).best_move(core, 2)
+
+
+def power_up_policy(core: BoardCore) -> Action:
+    # The greedy choice among the swaps and the power-ups on the board, all
+    # evaluated with the same new tiles
+    seed = random.getrandbits(32)
+    actions: List[Tuple[int, Action]] = [
+        (evaluate_move(core, move, 1, seed), move) for move in valid_moves(core)
+    ]
+    actions += [
+        (evaluate_power_up(core, i, j, 1, seed), (i, j))
+        for i, j in core.power_up_cells()
+    ]
+    return max(actions, key=lambda action: action[0])[1]
+
+
+POLICIES: Dict[str, Callable[[BoardCore], Action]] = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "solver": solver_policy,
+    "power-ups": power_up_policy,
+}
+
+
+BACKENDS: Dict[str, Type[BoardCore]] = {
+    "bytearray": BoardCore,
+    "bitboard": BitboardBoardCore,
+}
+try:
+    from src.core.NumpyBoardCore import NumpyBoardCore
+
+    BACKENDS["numpy"] = NumpyBoardCore
+except ImportError:
+    # NumPy is optional; only the NumPy backend needs it
+    pass
+
+
+def new_results() -> Dict[str, Any]:
+    return {
+        "games": 0,
+        "moves": 0,
+        "reshuffles": 0,
+        # level -> games that reached it, games that cleared it and the
+        # histogram of the points scored in it
+        "levels": {},
+        "cascades": Counter(),
+        "power_ups": Counter(),
+        "activations": Counter(),
+        "final_levels": Counter(),
+    }
+
+
+def merge_results(total: Dict[str, Any], results: Dict[str, Any]) -> None:
+    for key in ("games", "moves", "reshuffles"):
+        total[key] += results[key]
+
+    for key in ("cascades", "power_ups", "activations", "final_levels"):
+        total[key].update(results[key])
+
+    for level, stats in results["levels"].items():
+        level_stats = total["levels"].setdefault(
+            level, {"reached": 0, "cleared": 0, "scores": Counter()}
+        )
+        level_stats["reached"] += stats["reached"]
+        level_stats["cleared"] += stats["cleared"]
+        level_stats["scores"].update(stats["scores"])
+
+
+def record_steps(steps: List[CascadeStep], results: Dict[str, Any]) -> None:
+    for step in steps:
+        for _, _, _, _, power_up in step.power_ups:
+            results["power_ups"][power_up] += 1
+
+    results["cascades"][len(steps)] += 1
+
+
+def play_action(
+    core: BoardCore, action: Action, results: Dict[str, Any]
+) -> Tuple[int, float]:
+    # Plays a swap or a power-up and its cascade, returning the points and
+    # the game time of the animations
+    if len(action) == 2:
+        i, j = action
+        results["activations"][core.power_up(i, j)] += 1
+        cleared, steps = resolve_power_up(core, i, j)
+        record_steps(steps, results)
+        points = cleared * POINTS_PER_TILE + cascade_points(steps)
+        return points, len(steps) * FALL_TIME
+
+    i1, j1, i2, j2 = action
+    core.swap(i1, j1, i2, j2)
+    steps = core.resolve_cascade([(i1, j1), (i2, j2)], i2, j2)
+    record_steps(steps, results)
+    return cascade_points(steps), SWAP_TIME + len(steps) * FALL_TIME
+
+
+def play_game(
+    policy: Callable[[BoardCore], Action],
+    args: argparse.Namespace,
+    results: Dict[str, Any],
+) -> None:
+    level = 1
+    score = 0
+
+    while True:
+        # Every level starts on a new board with the full time. The score is
+        # kept between levels and the goal grows with the level.
+        core = BACKENDS[args.backend](
+            args.width,
+            args.height,
+            args.colors,
+            args.varieties,
+            seed=random.getrandbits(64),
+        )
+        goal = level * args.goal_factor
+        level_stats = results["levels"].setdefault(
+            level, {"reached": 0, "cleared": 0, "scores": Counter()}
+        )
+        level_stats["reached"] += 1
+        timer = float(args.level_time)
+        points = 0
+
+        while timer > 0 and score + points < goal:
+            reshuffle_count = core.reshuffle_count
+            core.count_possible_matches()
+            results["reshuffles"] += core.reshuffle_count - reshuffle_count
+
+            move_points, animation_time = play_action(core, policy(core), results)
+            results["moves"] += 1
+            points += move_points
+            timer -= args.move_time + animation_time
+
+        level_stats["scores"][points // SCORE_BUCKET * SCORE_BUCKET] += 1
+        score += points
+
+        if score < goal:
+            break
+
+        level_stats["cleared"] += 1
+
+        # A game that clears every level would never end
+        if level == args.max_level:
+            break
+
+        level += 1
+
+    results["games"] += 1
+    results["final_levels"][level] += 1
+
+
+def play_games(shard: Tuple[argparse.Namespace, int, int]) -> Dict[str, Any]:
+    args, seed, games = shard
+    random.seed(seed)
+    policy = POLICIES[args.policy]
+    results = new_results()
+
+    for _ in range(games):
+        play_game(policy, args, results)
+
+    return results
+
+
+def print_progress(total: Dict[str, Any], elapsed: float) -> None:
+    moves = max(1, total["moves"])
+    print(
+        f"{total['games']:>10} games {total['games'] / elapsed:>10.1f} games/s "
+        f"{total['reshuffles'] / moves * 100:>6.2f}% reshuffles per move"
+    )
+
+
+def print_report(total: Dict[str, Any]) -> None:
+    moves = max(1, total["moves"])
+
+    print("\nlevel   reached   cleared   points (% of games per bucket)")
+    for level in sorted(total["levels"]):
+        stats = total["levels"][level]
+        histogram = " ".join(
+            f"{score}:{count / stats['reached'] * 100:.1f}"
+            for score, count in sorted(stats["scores"].items())
+        )
+        print(
+            f"{level:>5} {stats['reached']:>9} "
+            f"{stats['cleared'] / stats['reached'] * 100:>8.1f}%   {histogram}"
+        )
+
+    print("\nfalls per move (%)")
+    for falls, count in sorted(total["cascades"].items()):
+        print(f"{falls:>5} {count / moves * 100:>8.2f}")
+
+    print("\npower-ups per 100 moves")
+    for name, power_up in (("cross", 1), ("circle", 2)):
+        print(f"{name:>7} {total['power_ups'][power_up] / moves * 100:>8.2f}")
+
+    print("\npower-ups activated per 100 moves")
+    for name, power_up in (("cross", 1), ("circle", 2)):
+        print(f"{name:>7} {total['activations'][power_up] / moves * 100:>8.2f}")
+
+    print("\nlast level reached (% of games)")
+    for level, count in sorted(total["final_levels"].items()):
+        print(f"{level:>5} {count / max(1, total['games']) * 100:>8.2f}")
+
+    print(f"\nreshuffles per 100 moves {total['reshuffles'] / moves * 100:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Simulate games to balance the level time, goals and colors."
+    )
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="bitboard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--shard-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    # Defaults of settings.py and PlayState
+    parser.add_argument("--level-time", type=float, default=60)
+    parser.add_argument("--goal-factor", type=float, default=1.25 * 1000)
+    parser.add_argument("--colors", type=int, default=18)
+    parser.add_argument("--varieties", type=int, default=6)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--max-level", type=int, default=20)
+    # Seconds a player takes to choose a move
+    parser.add_argument("--move-time", type=float, default=1.0)
+    args = parser.parse_args()
+
+    shards: List[Tuple[argparse.Namespace, int, int]] = []
+    for start in range(0, args.games, args.shard_size):
+        shards.append(
+            (args, args.seed + len(shards), min(args.shard_size, args.games - start))
+        )
+
+    total = new_results()
+    start = time.perf_counter()
+    last_print = start
+
+    with multiprocessing.Pool(args.workers) as pool:
+        for results in pool.imap_unordered(play_games, shards):
+            merge_results(total, results)
+
+            # At most one progress line per second
+            now = time.perf_counter()
+            if now - last_print >= 1 or total["games"] == args.games:
+                print_progress(total, now - start)
+                last_print = now
+
+    print_report(total)
+
+
+if __name__ == "__main__":
+    main()
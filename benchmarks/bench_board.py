@@ -0,0 +1,244 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the benchmark suite of the Board hot paths for several
+board sizes and numbers of colors. Results are written as JSON, and a run
+compared against a previous one fails when a benchmark got slower than the
+threshold.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_board --output baseline.json
+    python -m benchmarks.bench_board --compare baseline.json --threshold 0.2
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from typing import Any, Callable, Dict, List, Tuple
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import pygame
+
+import settings
+from src.Board import Board
+from src.BoardRenderer import BoardRenderer
+from src.core import BoardCore
+from src.core.Solver import valid_moves
+
+# A benchmark prepares a board, untimed, and returns the operation to time
+Benchmark = Callable[[Board, random.Random], Callable[[], Any]]
+
+
+def new_board(size: int, num_colors: int, seed: int) -> Board:
+    # Rendering covers the viewport of the game, whatever the board size
+    core = BoardCore(size, size, num_colors, settings.NUM_VARIETIES, seed=seed)
+    return Board(0, settings.TILE_SIZE, core=core)
+
+
+def bench_init(board: Board, rng: random.Random) -> Callable[[], Any]:
+    seed = rng.getrandbits(64)
+    return lambda: new_board(board.width, board.core.num_colors, seed)
+
+
+def bench_calculate_matches(board: Board, rng: random.Random) -> Callable[[], Any]:
+    # Every tile is checked, as after a board-wide change
+    tiles = [tile for row in board.tiles for tile in row]
+    return lambda: board.calculate_matches_for(tiles)
+
+
+def make_match(board: Board, rng: random.Random) -> Tuple[int, int]:
+    # Plays a valid swap and finds its matches, returning the moved cell
+    i1, j1, i2, j2 = rng.choice(valid_moves(board.core))
+    tile1 = board.tiles[i1][j1]
+    tile2 = board.tiles[i2][j2]
+    board.swap(tile1, tile2)
+    board.calculate_matches_for([tile1, tile2], i2, j2)
+    return i2, j2
+
+
+def bench_remove_matches(board: Board, rng: random.Random) -> Callable[[], Any]:
+    make_match(board, rng)
+    return board.remove_matches
+
+
+def bench_falling_tiles(board: Board, rng: random.Random) -> Callable[[], Any]:
+    # A cleared row, as a cross power-up leaves it
+    board.remove_tiles(list(board.tiles[rng.randrange(len(board.tiles))]))
+    return board.get_falling_tiles
+
+
+def bench_count_matches(board: Board, rng: random.Random) -> Callable[[], Any]:
+    # Counted from scratch, as on a new board
+    board.core.move_index.invalidate_all()
+    return board.count_possible_matches
+
+
+def bench_activate_power_up(board: Board, rng: random.Random) -> Callable[[], Any]:
+    tile = rng.choice(rng.choice(board.tiles))
+    board.create_power_up(tile, rng.choice((4, 5)))
+    return lambda: board.activate_power_up(tile)
+
+
+def bench_render_full(board: Board, rng: random.Random) -> Callable[[], Any]:
+    surface = pygame.Surface(board.renderer.layer.get_size())
+    board.renderer = BoardRenderer(board)
+    return lambda: board.render(surface)
+
+
+def bench_render_frame(board: Board, rng: random.Random) -> Callable[[], Any]:
+    # A frame in the middle of a fall, after a full frame
+    surface = pygame.Surface(board.renderer.layer.get_size())
+    board.render(surface)
+    rows = board.view_height // settings.TILE_SIZE
+    board.remove_tiles(list(board.tiles[rng.randrange(rows)]))
+    for tile, target in board.tweens(board.get_falling_tiles()):
+        tile.y = (tile.y + target["y"]) / 2
+    return lambda: board.render(surface)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "init": bench_init,
+    "calculate_matches_for": bench_calculate_matches,
+    "remove_matches": bench_remove_matches,
+    "get_falling_tiles": bench_falling_tiles,
+    "count_possible_matches": bench_count_matches,
+    "activate_power_up": bench_activate_power_up,
+    "render_full": bench_render_full,
+    "render_frame": bench_render_frame,
+}
+
+
+def run_benchmark(
+    benchmark: Benchmark,
+    size: int,
+    num_colors: int,
+    min_time: float,
+    max_time: float,
+    min_runs: int,
+) -> Dict[str, Any]:
+    rng = random.Random(size * 1000 + num_colors)
+    times: List[float] = []
+    # Setting up a large board takes longer than most of the operations
+    deadline = time.perf_counter() + max_time
+
+    while len(times) < min_runs or (
+        sum(times) < min_time and time.perf_counter() < deadline
+    ):
+        board = new_board(size, num_colors, rng.getrandbits(64))
+        operation = benchmark(board, rng)
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "runs": len(times),
+        "median_ms": statistics.median(times) * 1000,
+        "min_ms": min(times) * 1000,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> List[str]:
+    regressions = []
+
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result["median_ms"] / max(baseline[key]["median_ms"], 1e-9)
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{key}: {baseline[key]['median_ms']:.3f} ms -> "
+                f"{result['median_ms']:.3f} ms ({(ratio - 1) * 100:+.0f}%)"
+            )
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Board hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 32, 128, 512])
+    parser.add_argument("--colors", type=int, nargs="+", default=[4, 6, 18])
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    # Every benchmark runs at least min-runs times, and then until it has
+    # been timed for min-time seconds or max-time seconds have passed
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--max-time", type=float, default=2.0)
+    parser.add_argument("--min-runs", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    # Allowed slowdown of the median time, as a fraction
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'benchmark':<40} {'runs':>6} {'median ms':>11} {'min ms':>11}")
+
+    for size in args.sizes:
+        for num_colors in args.colors:
+            for name in args.benchmarks:
+                key = f"{name}/{size}x{size}/{num_colors}"
+                result = run_benchmark(
+                    BENCHMARKS[name],
+                    size,
+                    num_colors,
+                    args.min_time,
+                    args.max_time,
+                    args.min_runs,
+                )
+                results[key] = result
+                print(
+                    f"{key:<40} {result['runs']:>6} {result['median_ms']:>11.3f} "
+                    f"{result['min_ms']:>11.3f}"
+                )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+        print(f"\nno regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
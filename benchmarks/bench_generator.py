@@ -0,0 +1,55 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains a benchmark of the board generator. It reports boards per
+second and the worst-case latency for several board sizes and color counts.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_generator --boards 200
+"""
+
+import argparse
+import time
+
+from src.core.board_generator import generate_tiles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the board generator.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32, 64, 128])
+    parser.add_argument("--colors", type=int, nargs="+", default=[4, 6, 18])
+    parser.add_argument("--boards", type=int, default=200)
+    parser.add_argument("--min-moves", type=int, default=1)
+    parser.add_argument("--varieties", type=int, default=6)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>9} {'colors':>6} {'boards/s':>10} "
+        f"{'mean ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+
+    for size in args.sizes:
+        for num_colors in args.colors:
+            latencies = []
+            for _ in range(args.boards):
+                start = time.perf_counter()
+                generate_tiles(size, size, num_colors, args.varieties, args.min_moves)
+                latencies.append(time.perf_counter() - start)
+
+            latencies.sort()
+            total = sum(latencies)
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(
+                f"{f'{size}x{size}':>9} {num_colors:>6} {len(latencies) / total:>10.1f} "
+                f"{total / len(latencies) * 1000:>9.3f} {p99 * 1000:>9.3f} "
+                f"{latencies[-1] * 1000:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
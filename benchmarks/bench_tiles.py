@@ -0,0 +1,87 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains a benchmark of the tile memory footprint and of the
+allocations and garbage collections made by long cascades, with and without
+the tile pool.
+
+Run it from the repository root:
+
+    python -m benchmarks.bench_tiles --cascades 2000
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+import settings
+from src.Board import Board
+from src.Tile import Tile
+from src.TilePool import TilePool
+
+
+def measure_tile_size(count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tiles = [Tile(i % 8, i % 8, 0, 0) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Discount the list that holds the tiles
+    return (after - before) / len(tiles) - 8
+
+
+def run_cascades(cascades: int, pool_size: int) -> None:
+    TilePool.clear()
+    TilePool.max_size = pool_size
+    random.seed(0)
+    board = Board(0, 0, seed=0)
+
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    start = time.perf_counter()
+
+    for _ in range(cascades):
+        # Clear a random row, as a cross power-up does, and let it settle
+        i = random.randrange(settings.BOARD_HEIGHT)
+        board.remove_tiles(list(board.tiles[i]))
+        tiles = [tile for tile, _ in board.tweens(board.get_falling_tiles())]
+
+        while board.calculate_matches_for(tiles) is not None:
+            board.remove_matches()
+            tiles = [tile for tile, _ in board.tweens(board.get_falling_tiles())]
+
+    elapsed = time.perf_counter() - start
+    collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+
+    print(
+        f"{'pool' if pool_size else 'no pool':>8} {TilePool.allocated:>10} "
+        f"{TilePool.reused:>10} {collections:>12} {elapsed:>9.3f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark tile memory and churn.")
+    parser.add_argument("--tiles", type=int, default=100000)
+    parser.add_argument("--cascades", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"bytes per tile: {measure_tile_size(args.tiles):.1f}")
+    print(
+        f"{'':>8} {'allocated':>10} {'reused':>10} {'gc collects':>12} {'seconds':>9}"
+    )
+    run_cascades(args.cascades, 0)
+    run_cascades(args.cascades, 1024)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains a load test of the session server. The server runs in its
+own process, on one core, and the clients play random valid swaps and
+power-up clicks on many sessions at once, one every move time per session,
+keeping a copy of every board from the diffs. It reports the latency of the
+commands, the CPU time the server spent on each one and the sessions one core
+can host at that pace.
+
+Run it from the repository root:
+
+    python -m benchmarks.load_test --sessions 2000 --commands 20
+"""
+
+from typing import List, Tuple
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from multiprocessing.connection import Connection
+
+from src.core.SessionServer import OK, SessionClient, SessionServer
+from src.core.Solver import valid_moves
+
+
+def percentile(values: List[float], p: float) -> float:
+    # Nearest-rank percentile of sorted values
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run_server(connection: Connection) -> None:
+    # Serves until the parent sends anything, then sends back the CPU time
+    # spent and the commands executed
+    async def serve() -> Tuple[float, int]:
+        server = SessionServer(seed=0)
+        listener = await server.start()
+        connection.send(listener.sockets[0].getsockname()[1])
+        start = time.process_time()
+        await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+        listener.close()
+        return time.process_time() - start, server.commands
+
+    connection.send(asyncio.run(serve()))
+
+
+async def play(
+    client: SessionClient,
+    args: argparse.Namespace,
+    rng: random.Random,
+    latencies: List[float],
+) -> int:
+    # Plays a session, returning the commands the server rejected. The
+    # sessions start at random times within the first move time.
+    await asyncio.sleep(rng.uniform(0, args.move_time))
+    session, board = await client.new_session()
+    rejected = 0
+
+    for _ in range(args.commands):
+        await asyncio.sleep(args.move_time)
+        power_ups = board.power_up_cells()
+
+        # A power-up cannot be the moved tile of a swap, as the game
+        # activates it when it is clicked
+        moves = valid_moves(board)
+
+        if len(power_ups) > 0 and (len(moves) == 0 or rng.random() < 0.2):
+            command = client.power_up(session, *rng.choice(power_ups))
+        else:
+            command = client.swap(session, *rng.choice(moves))
+
+        start = time.perf_counter()
+        status, _, diffs = await command
+        latencies.append(time.perf_counter() - start)
+
+        if status != OK:
+            rejected += 1
+        for diff in diffs:
+            diff.apply(board)
+        board.count_possible_matches()
+
+    await client.close_session(session)
+    return rejected
+
+
+async def run_clients(
+    port: int, args: argparse.Namespace
+) -> Tuple[List[float], int, float]:
+    clients = [
+        await SessionClient.connect(port=port) for _ in range(args.connections)
+    ]
+    rng = random.Random(args.seed)
+    latencies: List[float] = []
+
+    start = time.perf_counter()
+    rejected = await asyncio.gather(
+        *(
+            play(
+                clients[k % len(clients)],
+                args,
+                random.Random(rng.getrandbits(64)),
+                latencies,
+            )
+            for k in range(args.sessions)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    for client in clients:
+        await client.close()
+
+    return latencies, sum(rejected), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test of the session server.")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--commands", type=int, default=10)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    # Seconds a player takes to choose a move; 0 plays as fast as possible
+    parser.add_argument("--move-time", type=float, default=1.0)
+    args = parser.parse_args()
+
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=run_server, args=(child,))
+    server.start()
+    port = parent.recv()
+
+    latencies, rejected, elapsed = asyncio.run(run_clients(port, args))
+
+    parent.send(None)
+    cpu_time, commands = parent.recv()
+    server.join()
+
+    latencies.sort()
+    cpu_per_command = cpu_time / commands
+
+    print(f"sessions {args.sessions}, commands {commands}, rejected {rejected}")
+    print(f"commands per second {commands / elapsed:.0f} in {elapsed:.2f} s")
+    print(
+        "latency "
+        + " ".join(
+            f"p{p} {percentile(latencies, p) * 1000:.2f}" for p in (50, 95, 99)
+        )
+        + " ms"
+    )
+    print(f"server CPU per command {cpu_per_command * 1e6:.0f} us")
+    # A session sends a command every move time
+    if args.move_time > 0:
+        print(f"sessions per core {args.move_time / cpu_per_command:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,25 @@ alejandro.j.mujic4@gmail.com
 This file contains the main program to run the game.
 """
 
+import argparse
+
 import settings
+from src.core.Replay import Replay
 from src.Match3 import Match3
+from src.Profiler import Profiler
 
 if __name__ == "__main__":
+    Profiler.start_clock()
+    parser = argparse.ArgumentParser(description="Match 3")
+    parser.add_argument("--replay", help="watch a recorded game")
+    parser.add_argument(
+        "--profile", help="record the frames and write them to this CSV or JSON file"
+    )
+    args = parser.parse_args()
+
+    if args.profile is not None:
+        Profiler.enable()
+
     match3 = Match3(
         "Match 3",
         settings.WINDOW_WIDTH,
@@ -19,4 +34,12 @@ if __name__ == "__main__":
         settings.VIRTUAL_WIDTH,
         settings.VIRTUAL_HEIGHT,
     )
-    match3.exec()
+
+    if args.replay is not None:
+        match3.state_machine.change("replay", replay=Replay.load(args.replay))
+
+    try:
+        match3.exec()
+    finally:
+        if args.profile is not None:
+            Profiler.export(args.profile)
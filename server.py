@@ -0,0 +1,51 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the main program to run the session server, which hosts
+headless games and validates their moves (see src/core/SessionServer.py).
+"""
+
+import argparse
+import asyncio
+
+from src.core.SessionServer import SessionServer
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = SessionServer(
+        args.width,
+        args.height,
+        args.colors,
+        args.varieties,
+        max_sessions=args.max_sessions,
+        seed=args.seed,
+    )
+    listener = await server.start(args.host, args.port, args.unix)
+    for sock in listener.sockets:
+        print("serving on", sock.getsockname())
+
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match 3 session server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7333)
+    parser.add_argument("--unix", help="listen on this Unix socket instead")
+    parser.add_argument("--max-sessions", type=int, default=100000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--colors", type=int, default=18)
+    parser.add_argument("--varieties", type=int, default=6)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--height", type=int, default=8)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -7,15 +7,15 @@ alejandro.j.mujic4@gmail.com
 
 This file contains the game settings that include the association of the
 inputs with an their ids, constants of values to set up the game, sounds,
-textures, frames, and fonts.
+textures, frames, and fonts. Assets are loaded the first time they are used.
 """
 
+import os
 from pathlib import Path
 
-import pygame
-
 from gale import input_handler
 
+from src.AssetRegistry import AssetRegistry, load_font, load_image, load_sound
 from src.frames_utility import generate_tile_frames
 
 input_handler.InputHandler.set_keyboard_action(input_handler.KEY_ESCAPE, "quit")
@@ -23,13 +23,14 @@ input_handler.InputHandler.set_keyboard_action(input_handler.KEY_KP_ENTER, "ente
 input_handler.InputHandler.set_keyboard_action(input_handler.KEY_RETURN, "enter")
 input_handler.InputHandler.set_keyboard_action(input_handler.KEY_UP, "up")
 input_handler.InputHandler.set_keyboard_action(input_handler.KEY_DOWN, "down")
+input_handler.InputHandler.set_keyboard_action(input_handler.KEY_LEFT, "left")
+input_handler.InputHandler.set_keyboard_action(input_handler.KEY_RIGHT, "right")
+input_handler.InputHandler.set_keyboard_action(input_handler.KEY_h, "hint")
+input_handler.InputHandler.set_keyboard_action(input_handler.KEY_p, "profiler")
 input_handler.InputHandler.set_mouse_click_action(input_handler.MOUSE_BUTTON_1, "click")
 
-for dx in range(-10, 11):
-    for dy in range(-10, 11):
-        if dx == 0 and dy == 0:
-            continue
-        input_handler.InputHandler.set_mouse_motion_action((dx, dy), "mouse_motion")
+# Mouse motion is not bound to actions: Match3 drains the motion events once
+# per frame and sends a single "mouse_motion" input with the latest position.
 
 
 WINDOW_WIDTH = 1280
@@ -41,6 +42,10 @@ VIRTUAL_HEIGHT = 288
 BOARD_WIDTH = 8
 BOARD_HEIGHT = 8
 
+# Cells shown at once; larger boards scroll
+BOARD_VIEW_WIDTH = 8
+BOARD_VIEW_HEIGHT = 8
+
 TILE_SIZE = 32
 
 NUM_VARIETIES = 6
@@ -51,35 +56,64 @@ BACKGROUND_LOOPING_POINT = -1024 + VIRTUAL_WIDTH - 4 + 51
 
 LEVEL_TIME = 60
 
-BASE_DIR = Path(__file__).parent
-
-TEXTURES = {
-    "background": pygame.image.load(
-        BASE_DIR / "assets" / "graphics" / "background.png"
-    ),
-    "tiles": pygame.image.load(BASE_DIR / "assets" / "graphics" / "match3.png"),
-}
+# The hint looks this many moves ahead within the time of a frame
+HINT_DEPTH = 2
+HINT_TIME_BUDGET = 1 / 60
+HINT_DURATION = 2
 
-FRAMES = {"tiles": generate_tile_frames(TEXTURES["tiles"])}
+# Cascades are shown at once, without the falling animations
+SKIP_ANIMATIONS = False
 
-pygame.mixer.init()
+# Frames kept by the profiler for its percentiles and exports
+PROFILER_FRAMES = 600
 
-SOUNDS = {
-    "clock": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "clock.wav"),
-    "error": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "error.wav"),
-    "game-over": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "game-over.wav"),
-    "match": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "match.wav"),
-    "next-level": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "next-level.wav"),
-    "select": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "select.wav"),
-}
-
-pygame.mixer.music.load(BASE_DIR / "assets" / "sounds" / "music.mp3")
-
-pygame.font.init()
+BASE_DIR = Path(__file__).parent
 
-FONTS = {
-    "small": pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 12),
-    "medium": pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 24),
-    "large": pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 48),
-    "huge": pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 64),
-}
+# Every finished game is saved as a replay in the data directory of the user,
+# not in the repository. None disables recording.
+REPLAY_DIR = (
+    Path(
+        os.environ.get("APPDATA")
+        or os.environ.get("XDG_DATA_HOME")
+        or Path.home() / ".local" / "share"
+    )
+    / "match3"
+    / "replays"
+)
+
+TEXTURES = AssetRegistry(
+    {
+        "background": lambda: load_image(
+            BASE_DIR / "assets" / "graphics" / "background.png"
+        ),
+        "tiles": lambda: load_image(BASE_DIR / "assets" / "graphics" / "match3.png"),
+    }
+)
+
+FRAMES = AssetRegistry({"tiles": lambda: generate_tile_frames(TEXTURES.load("tiles"))})
+
+SOUNDS = AssetRegistry(
+    {
+        "clock": lambda: load_sound(BASE_DIR / "assets" / "sounds" / "clock.wav"),
+        "error": lambda: load_sound(BASE_DIR / "assets" / "sounds" / "error.wav"),
+        "game-over": lambda: load_sound(
+            BASE_DIR / "assets" / "sounds" / "game-over.wav"
+        ),
+        "match": lambda: load_sound(BASE_DIR / "assets" / "sounds" / "match.wav"),
+        "next-level": lambda: load_sound(
+            BASE_DIR / "assets" / "sounds" / "next-level.wav"
+        ),
+        "select": lambda: load_sound(BASE_DIR / "assets" / "sounds" / "select.wav"),
+    }
+)
+
+MUSIC = BASE_DIR / "assets" / "sounds" / "music.mp3"
+
+FONTS = AssetRegistry(
+    {
+        "small": lambda: load_font(BASE_DIR / "assets" / "fonts" / "font.ttf", 12),
+        "medium": lambda: load_font(BASE_DIR / "assets" / "fonts" / "font.ttf", 24),
+        "large": lambda: load_font(BASE_DIR / "assets" / "fonts" / "font.ttf", 48),
+        "huge": lambda: load_font(BASE_DIR / "assets" / "fonts" / "font.ttf", 64),
+    }
+)
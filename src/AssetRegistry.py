@@ -0,0 +1,95 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class AssetRegistry, a read-only mapping that loads
+each asset the first time it is used, and the functions to load assets and
+prewarm registries.
+"""
+
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set
+
+import threading
+
+import pygame
+
+
+class AssetRegistry(Mapping):
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]) -> None:
+        self.loaders = loaders
+        self.assets: Dict[str, Any] = {}
+        self.converted: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def load(self, name: str) -> Any:
+        asset = self.assets.get(name)
+
+        if asset is None:
+            with self.lock:
+                asset = self.assets.get(name)
+                if asset is None:
+                    asset = self.assets[name] = self.loaders[name]()
+
+        return asset
+
+    def __getitem__(self, name: str) -> Any:
+        asset = self.load(name)
+
+        # Surfaces are converted to the display pixel format once it exists
+        if (
+            name not in self.converted
+            and isinstance(asset, pygame.Surface)
+            and pygame.display.get_surface() is not None
+        ):
+            if asset.get_flags() & pygame.SRCALPHA:
+                asset = asset.convert_alpha()
+            else:
+                asset = asset.convert()
+            self.assets[name] = asset
+            self.converted.add(name)
+
+        return asset
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.loaders)
+
+    def __len__(self) -> int:
+        return len(self.loaders)
+
+
+def load_image(path: Path) -> pygame.Surface:
+    return pygame.image.load(path)
+
+
+def load_sound(path: Path) -> pygame.mixer.Sound:
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    return pygame.mixer.Sound(path)
+
+
+def load_font(path: Path, size: int) -> pygame.font.Font:
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(path, size)
+
+
+def prewarm(
+    registries: Iterable[AssetRegistry], background: bool = True
+) -> Optional[threading.Thread]:
+    def load_all() -> None:
+        for registry in registries:
+            for name in registry:
+                registry.load(name)
+
+    if not background:
+        load_all()
+        return None
+
+    thread = threading.Thread(target=load_all, name="asset-prewarm", daemon=True)
+    thread.start()
+    return thread
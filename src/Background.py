@@ -0,0 +1,50 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Background, which scrolls the background of the
+game and draws it whole or only the parts under other layers.
+"""
+
+from typing import Optional
+
+import pygame
+
+import settings
+
+
+class Background:
+    x: float = 0
+
+    @classmethod
+    def update(cls, dt: float) -> None:
+        cls.x -= settings.BACKGROUND_SCROLL_SPEED * dt
+
+        if cls.x <= settings.BACKGROUND_LOOPING_POINT:
+            cls.x = 0
+
+    @classmethod
+    def offset(cls) -> int:
+        # Blits truncate the position, so the background only changes on
+        # screen when this does
+        return int(cls.x)
+
+    @classmethod
+    def render(
+        cls,
+        surface: pygame.Surface,
+        area: Optional[pygame.Rect] = None,
+        x: int = 0,
+        y: int = 0,
+    ) -> None:
+        # Draws the area of the screen given (the whole screen by default)
+        # at (x, y) of the surface
+        texture = settings.TEXTURES["background"]
+
+        if area is None:
+            surface.blit(texture, (cls.offset() + x, y))
+        else:
+            surface.blit(texture, (x, y), area.move(-cls.offset(), 0))
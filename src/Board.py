@@ -5,317 +5,312 @@ Study Case: Match-3
 Author: Alejandro Mujica
 alejandro.j.mujic4@gmail.com
 
-This file contains the class Board.
+This file contains the class Board, the pygame adapter that renders a
+BoardCore through Tile objects.
 """
 
-from typing import List, Optional, Tuple, Any, Dict, Set
+from typing import List, Optional, Set, Tuple, Any, Dict, Type
 
 import pygame
 
-import random
-
 import settings
+from src.BoardRenderer import BoardRenderer
+from src.core import BoardCore, BoardDiff, CascadeStep
+from src.core.Solver import Solver
+from src.Profiler import Profiler
 from src.Tile import Tile
+from src.TileAnimator import TileAnimator
+from src.TilePool import TilePool
 
 
 class Board:
-    def __init__(self, x: int, y: int) -> None:
+    def __init__(
+        self,
+        x: int,
+        y: int,
+        backend: Type[BoardCore] = BoardCore,
+        seed: Optional[int] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        view_width: Optional[int] = None,
+        view_height: Optional[int] = None,
+        core: Optional[BoardCore] = None,
+    ) -> None:
+        # (x, y) is the screen position of the viewport, which shows
+        # view_width x view_height cells of a board of width x height cells.
+        # A given core is rendered as it is instead of a new one.
         self.x = x
         self.y = y
+        if core is not None:
+            width, height = core.width, core.height
+        self.width = settings.BOARD_WIDTH if width is None else width
+        self.height = settings.BOARD_HEIGHT if height is None else height
+        if view_width is None:
+            view_width = settings.BOARD_VIEW_WIDTH
+        if view_height is None:
+            view_height = settings.BOARD_VIEW_HEIGHT
+        self.view_width = min(view_width, self.width) * settings.TILE_SIZE
+        self.view_height = min(view_height, self.height) * settings.TILE_SIZE
+        # Board pixel shown at the top left corner of the viewport
+        self.camera_x = 0
+        self.camera_y = 0
+        if core is None:
+            core = backend(
+                self.width,
+                self.height,
+                settings.NUM_COLORS,
+                settings.NUM_VARIETIES,
+                seed=seed,
+            )
+        self.core = core
         self.matches: List[List[Tile]] = []
         self.tiles: List[List[Tile]] = []
-        self.__initialize_tiles()
+        # Tiles of each column that may be away from their cells, falling to
+        # them
+        self.moving_tiles: List[Set[Tile]] = [set() for _ in range(self.width)]
+        self.__build_tiles()
+        self.renderer = BoardRenderer(self)
+        # Swaps and falls of the tiles are animated in batches
+        self.animator = TileAnimator(self)
+
+    def update(self, dt: float) -> None:
+        self.animator.update(dt)
 
     def render(self, surface: pygame.Surface) -> None:
-        for row in self.tiles:
-            for tile in row:
-                # Adjustment not to draw twice the tile that I move
-                if tile.draw:
-                    tile.render(surface, self.x, self.y)
-
-    def __is_match_generated(self, i: int, j: int, color: int) -> bool:
-        if (
-            i >= 2
-            and self.tiles[i - 1][j].color == color
-            and self.tiles[i - 2][j].color == color
-        ):
-            return True
+        self.renderer.render(surface)
+
+    def scroll(self, dx: int, dy: int) -> None:
+        self.camera_x = max(
+            0,
+            min(self.width * settings.TILE_SIZE - self.view_width, self.camera_x + dx),
+        )
+        self.camera_y = max(
+            0,
+            min(
+                self.height * settings.TILE_SIZE - self.view_height, self.camera_y + dy
+            ),
+        )
+
+    def screen_origin(self) -> Tuple[int, int]:
+        # Screen position of the top left corner of the board
+        return self.x - self.camera_x, self.y - self.camera_y
+
+    def view_rect(self) -> pygame.Rect:
+        return pygame.Rect(self.x, self.y, self.view_width, self.view_height)
+
+    def visible_cells(self) -> Tuple[int, int, int, int]:
+        # Rows i0 to i1 and columns j0 to j1 (exclusive) in the viewport, with
+        # one more cell around for the tiles moving in or out of it
+        i0 = max(0, self.camera_y // settings.TILE_SIZE - 1)
+        i1 = min(
+            self.height, (self.camera_y + self.view_height) // settings.TILE_SIZE + 2
+        )
+        j0 = max(0, self.camera_x // settings.TILE_SIZE - 1)
+        j1 = min(
+            self.width, (self.camera_x + self.view_width) // settings.TILE_SIZE + 2
+        )
+        return i0, i1, j0, j1
+
+    def cell_at(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        # Cell under a point of the screen, if it is in the viewport
+        if not self.view_rect().collidepoint(x, y):
+            return None
 
         return (
-            j >= 2
-            and self.tiles[i][j - 1].color == color
-            and self.tiles[i][j - 2].color == color
+            (y - self.y + self.camera_y) // settings.TILE_SIZE,
+            (x - self.x + self.camera_x) // settings.TILE_SIZE,
         )
 
-    def __initialize_tiles(self) -> None:
+    def __make_tile(self, i: int, j: int) -> Tile:
+        tile = TilePool.acquire(i, j, self.core.color(i, j), self.core.variety(i, j))
+        tile.power_up = self.core.power_up(i, j)
+        return tile
+
+    def __build_tiles(self) -> None:
+        for row in self.tiles:
+            for tile in row:
+                TilePool.release(tile)
+
         self.tiles = [
-            [None for _ in range(settings.BOARD_WIDTH)]
-            for _ in range(settings.BOARD_HEIGHT)
+            [self.__make_tile(i, j) for j in range(self.width)]
+            for i in range(self.height)
         ]
-        for i in range(settings.BOARD_HEIGHT):
-            for j in range(settings.BOARD_WIDTH):
-                color = random.randint(0, settings.NUM_COLORS - 1)
-                while self.__is_match_generated(i, j, color):
-                    color = random.randint(0, settings.NUM_COLORS - 1)
-
-                self.tiles[i][j] = Tile(
-                    i, j, color, random.randint(0, settings.NUM_VARIETIES - 1)
-                )
-
-    def __calculate_match_rec(self, tile: Tile) -> Set[Tile]:
-        if tile in self.in_stack:
-            return []
-
-        self.in_stack.add(tile)
-
-        color_to_match = tile.color
-
-        ## Check horizontal match
-        h_match: List[Tile] = []
-
-        # Check left
-        if tile.j > 0:
-            left = max(0, tile.j - 2)
-            for j in range(tile.j - 1, left - 1, -1):
-                if self.tiles[tile.i][j].color != color_to_match:
-                    break
-                h_match.append(self.tiles[tile.i][j])
-
-        # Check right
-        if tile.j < settings.BOARD_WIDTH - 1:
-            right = min(settings.BOARD_WIDTH - 1, tile.j + 2)
-            for j in range(tile.j + 1, right + 1):
-                if self.tiles[tile.i][j].color != color_to_match:
-                    break
-                h_match.append(self.tiles[tile.i][j])
-
-        ## Check vertical match
-        v_match: List[Tile] = []
-
-        # Check top
-        if tile.i > 0:
-            top = max(0, tile.i - 2)
-            for i in range(tile.i - 1, top - 1, -1):
-                if self.tiles[i][tile.j].color != color_to_match:
-                    break
-                v_match.append(self.tiles[i][tile.j])
-
-        # Check bottom
-        if tile.i < settings.BOARD_HEIGHT - 1:
-            bottom = min(settings.BOARD_HEIGHT - 1, tile.i + 2)
-            for i in range(tile.i + 1, bottom + 1):
-                if self.tiles[i][tile.j].color != color_to_match:
-                    break
-                v_match.append(self.tiles[i][tile.j])
-
-        match: List[Tile] = []
-
-        if len(h_match) >= 2:
-            for t in h_match:
-                if t not in self.in_match:
-                    self.in_match.add(t)
-                    match.append(t)
-
-        if len(v_match) >= 2:
-            for t in v_match:
-                if t not in self.in_match:
-                    self.in_match.add(t)
-                    match.append(t)
-
-        if len(match) > 0:
-            if tile not in self.in_match:
-                self.in_match.add(tile)
-                match.append(tile)
-
-        for t in match:
-            match += self.__calculate_match_rec(t)
-
-        self.in_stack.remove(tile)
-        return match
+
+    def to_bytes(self) -> bytes:
+        # Two bytes per cell; the tiles are made again from them
+        return self.core.to_bytes()
+
+    @classmethod
+    def from_bytes(
+        cls,
+        x: int,
+        y: int,
+        data: bytes,
+        backend: Type[BoardCore] = BoardCore,
+        seed: Optional[int] = None,
+        **view_size: Any,
+    ) -> "Board":
+        return cls(x, y, core=backend.from_bytes(data, seed), **view_size)
+
+    def swap(self, tile1: Tile, tile2: Tile) -> BoardDiff:
+        moved = [
+            (tile1.i, tile1.j, tile2.i, tile2.j),
+            (tile2.i, tile2.j, tile1.i, tile1.j),
+        ]
+        self.core.swap(tile1.i, tile1.j, tile2.i, tile2.j)
+        self.tiles[tile1.i][tile1.j], self.tiles[tile2.i][tile2.j] = tile2, tile1
+        tile1.i, tile1.j, tile2.i, tile2.j = tile2.i, tile2.j, tile1.i, tile1.j
+        return BoardDiff([], moved, [], [])
 
     def calculate_matches_for(
         self, new_tiles: List[Tile], last_moved_i: int = -1, last_moved_j: int = -1
     ) -> Optional[List[List[Tile]]]:
-        self.in_match: Set[Tile] = set()
-        self.in_stack: Set[Tile] = set()
+        matches = self.core.calculate_matches_for(
+            [(tile.i, tile.j) for tile in new_tiles], last_moved_i, last_moved_j
+        )
 
+        if last_moved_i >= 0 and last_moved_j >= 0:
+            self.tiles[last_moved_i][last_moved_j].power_up = self.core.power_up(
+                last_moved_i, last_moved_j
+            )
+
+        self.matches = [
+            [self.tiles[i][j] for i, j in match] for match in self.core.matches
+        ]
+        return self.matches if matches is not None else None
+
+    def remove_matches(self) -> BoardDiff:
+        self.core.remove_matches()
+        removed = self.__release([tile for match in self.matches for tile in match])
         self.matches = []
-        match_sizes = []
-
-        for tile in new_tiles:
-            if tile in self.in_match:
-                continue
-            match = self.__calculate_match_rec(tile)
-            if len(match) > 0:
-                self.matches.append(match)
-                match_sizes.append(len(match))
-
-        delattr(self, "in_match")
-        delattr(self, "in_stack")
-
-        if last_moved_i >= 0 and last_moved_j >= 0 and match_sizes:
-            for i, match in enumerate(self.matches):
-                if i < len(match_sizes) and match_sizes[i] >= 4:
-                    for tile in match:
-                        if tile.i == last_moved_i and tile.j == last_moved_j:
-                            match_color = tile.color
-                            match.remove(tile)
-                            power_up_type = 1 if match_sizes[i] == 4 else 2
-                            tile.power_up = power_up_type
-                            break
-
-        return self.matches if len(self.matches) > 0 else None
-
-    def remove_matches(self, last_moved_i: int = -1, last_moved_j: int = -1) -> List[Tuple[int, int, int]]:
-        power_ups_to_create = []
-    
-        for match in self.matches:
-            if len(match) >= 4 and last_moved_i >= 0 and last_moved_j >= 0:
-                for tile in match:
-                    if tile.i == last_moved_i and tile.j == last_moved_j:
-                        power_up_type = 1 if len(match) == 4 else 2
-                        power_ups_to_create.append((tile.i, tile.j, tile.color, power_up_type))
-                        break
-                    
-            for tile in match:
-                if any(tile.i == i and tile.j == j for i, j, _, _ in power_ups_to_create):
-                    continue
-                self.tiles[tile.i][tile.j] = None
-    
-        # Create power-ups
-        for i, j, color, power_up_type in power_ups_to_create:
-            self.tiles[i][j] = Tile(i, j, color, random.randint(0, settings.NUM_VARIETIES - 1))
-            self.tiles[i][j].power_up = power_up_type
-    
-        self.matches = []
-        return power_ups_to_create
+        return BoardDiff(removed, [], [], [])
+
+    def remove_tiles(self, tiles: List[Tile]) -> BoardDiff:
+        self.core.remove_cells([(tile.i, tile.j) for tile in tiles])
+        return BoardDiff(self.__release(tiles), [], [], [])
+
+    def __release(self, tiles: List[Tile]) -> List[Tuple[int, int]]:
+        removed = []
+        for tile in tiles:
+            self.tiles[tile.i][tile.j] = None
+            TilePool.release(tile)
+            removed.append((tile.i, tile.j))
+        return removed
+
+    def __fall(
+        self,
+        moves: List[Tuple[int, int, int]],
+        new_tiles: List[Tuple[int, int, int, int]],
+    ) -> List[Tuple[int, int, int, int]]:
+        # Moves the tiles down and creates the new ones above the board,
+        # returning the moves as (from_i, from_j, to_i, to_j)
+        moved = []
+
+        for from_i, to_i, j in moves:
+            tile = self.tiles[from_i][j]
+            self.tiles[to_i][j] = tile
+            self.tiles[from_i][j] = None
+            tile.i = to_i
+            self.moving_tiles[j].add(tile)
+            moved.append((from_i, j, to_i, j))
+
+        # create a replacement tiles at the top of the screen
+        for i, j, color, variety in new_tiles:
+            tile = TilePool.acquire(i, j, color, variety)
+            tile.y -= settings.TILE_SIZE
+            self.tiles[i][j] = tile
+            self.moving_tiles[j].add(tile)
+
+        return moved
+
+    def tweens(self, diff: BoardDiff) -> List[Tuple[Tile, Dict[str, Any]]]:
+        # Tweens that take the moved and created tiles of a diff to their cells
+        cells = [(i, j) for _, _, i, j in diff.moved]
+        cells += [(i, j) for i, j, _, _ in diff.created]
+        size = settings.TILE_SIZE
+        return [(self.tiles[i][j], {"x": j * size, "y": i * size}) for i, j in cells]
+
+    def get_falling_tiles(self) -> BoardDiff:
+        moves, new_cells = self.core.get_falling_tiles()
+        new_tiles = [
+            (i, j, self.core.color(i, j), self.core.variety(i, j)) for i, j in new_cells
+        ]
+        return BoardDiff([], self.__fall(moves, new_tiles), new_tiles, [])
+
+    @Profiler.timed("board.resolve_cascade")
+    def resolve_cascade(
+        self, tiles: List[Tile], last_moved_i: int = -1, last_moved_j: int = -1
+    ) -> List[CascadeStep]:
+        # The core resolves the whole cascade at once and the tiles stay as
+        # they are until every step is applied in order with apply_step.
+        return self.core.resolve_cascade(
+            [(tile.i, tile.j) for tile in tiles], last_moved_i, last_moved_j
+        )
+
+    @Profiler.timed("board.apply_step")
+    def apply_step(self, step: CascadeStep) -> BoardDiff:
+        removed = self.__release(
+            [self.tiles[i][j] for match in step.matches for i, j in match]
+        )
 
-    def get_falling_tiles(self) -> Tuple[Any, Dict[str, Any]]:
-        # List of tweens to create
-        tweens: Tuple[Tile, Dict[str, Any]] = []
+        for i, j, color, variety, power_up in step.power_ups:
+            tile = self.tiles[i][j]
+            if tile is None:
+                tile = self.tiles[i][j] = TilePool.acquire(i, j, color, variety)
+            tile.color = color
+            tile.variety = variety
+            tile.power_up = power_up
 
-        # for each column, go up tile by tile until we hit a space
-        for j in range(settings.BOARD_WIDTH):
-            space = False
-            space_i = -1
-            i = settings.BOARD_HEIGHT - 1
+        # The cells of the core already hold the tiles of later steps, so the
+        # new tiles are made from the recorded values
+        moved = self.__fall(step.moves, step.new_tiles)
+        return BoardDiff(removed, moved, step.new_tiles, step.power_ups)
 
-            while i >= 0:
-                tile = self.tiles[i][j]
+    @Profiler.timed("board.count_possible_matches")
+    def count_possible_matches(self) -> int:
+        reshuffle_count = self.core.reshuffle_count
+        match_count = self.core.count_possible_matches()
 
-                # if our previous tile was a space
-                if space:
-                    # if the current tile is not a space
-                    if tile is not None:
-                        self.tiles[space_i][j] = tile
-                        tile.i = space_i
+        # The core recreates the board when there are no moves left
+        if self.core.reshuffle_count != reshuffle_count:
+            self.__build_tiles()
 
-                        # set its prior position to None
-                        self.tiles[i][j] = None
+        return match_count
 
-                        tweens.append((tile, {"y": tile.i * settings.TILE_SIZE}))
-                        space = False
-                        i = space_i
-                        space_i = -1
-                elif tile is None:
-                    space = True
+    def has_any_move(self) -> bool:
+        return self.core.has_any_move()
 
-                    if space_i == -1:
-                        space_i = i
+    def recreate_board(self) -> None:
+        self.core.recreate_board()
+        self.__build_tiles()
+
+    def create_power_up(self, tile: Tile, match_size: int) -> BoardDiff:
+        self.core.create_power_up(tile.i, tile.j, match_size)
+        tile.power_up = self.core.power_up(tile.i, tile.j)
+        tile.variety = self.core.variety(tile.i, tile.j)
+        return BoardDiff(
+            [], [], [], [(tile.i, tile.j, tile.color, tile.variety, tile.power_up)]
+        )
 
-                i -= 1
+    def activate_power_up(self, tile: Tile) -> List[Tile]:
+        return [self.tiles[i][j] for i, j in self.core.activate_power_up(tile.i, tile.j)]
 
-        # create a replacement tiles at the top of the screen
-        for j in range(settings.BOARD_WIDTH):
-            for i in range(settings.BOARD_HEIGHT):
-                tile = self.tiles[i][j]
-
-                if tile is None:
-                    tile = Tile(
-                        i,
-                        j,
-                        random.randint(0, settings.NUM_COLORS - 1),
-                        random.randint(0, settings.NUM_VARIETIES - 1),
-                    )
-                    tile.y -= settings.TILE_SIZE
-                    self.tiles[i][j] = tile
-                    tweens.append((tile, {"y": tile.i * settings.TILE_SIZE}))
-
-        return tweens
+    def tiles_of_color(self, color: int) -> List[Tile]:
+        return [self.tiles[i][j] for i, j in self.core.cells_of_color(color)]
 
-    def count_possible_matches(self) -> int:
-        def swap(i1, j1, i2, j2):
-            self.tiles[i1][j1], self.tiles[i2][j2] = self.tiles[i2][j2], self.tiles[i1][j1]
-        
-        # Lightweight quick-check for potential matches
-        def has_match():
-            for i in range(settings.BOARD_HEIGHT):
-                count = 1
-                for j in range(1, settings.BOARD_WIDTH):
-                    if self.tiles[i][j].color == self.tiles[i][j - 1].color:
-                        count += 1
-                        if count >= 3:
-                            return True
-                    else:
-                        count = 1
-
-            for j in range(settings.BOARD_WIDTH):
-                count = 1
-                for i in range(1, settings.BOARD_HEIGHT):
-                    if self.tiles[i][j].color == self.tiles[i - 1][j].color:
-                        count += 1
-                        if count >= 3:
-                            return True
-                    else:
-                        count = 1
-            return False
-
-        match_count = 0
-
-        for i in range(settings.BOARD_HEIGHT):
-            for j in range(settings.BOARD_WIDTH):
-                if j < settings.BOARD_WIDTH - 1:
-                    swap(i, j, i, j + 1)
-                    if has_match():
-                        match_count += 1
-                    swap(i, j, i, j + 1)
-
-                if i < settings.BOARD_HEIGHT - 1:
-                    swap(i, j, i + 1, j)
-                    if has_match():
-                        match_count += 1
-                    swap(i, j, i + 1, j)
-
-        if match_count == 0:
-            self.recreate_board()
-            match_count = self.count_possible_matches()
+    def power_up_tiles(self) -> List[Tile]:
+        return [self.tiles[i][j] for i, j in self.core.power_up_cells()]
 
-        return match_count
+    def color_counts(self) -> List[int]:
+        return self.core.color_counts()
 
-    def recreate_board(self) -> None:
-        self.__initialize_tiles()
+    def find_best_swap(
+        self, solver: Solver, max_depth: int = 2, time_budget: Optional[float] = None
+    ) -> Optional[Tuple[Tile, Tile]]:
+        move = solver.best_move(self.core, max_depth, time_budget)
 
-    def create_power_up(self, tile: Tile, match_size: int) -> None:
-        tile.power_up = 1 if match_size == 4 else 2
-        tile.variety = random.randint(0, settings.NUM_VARIETIES - 1)
+        if move is None:
+            return None
 
-    def activate_power_up(self, tile: Tile) -> List[Tile]:
-        affected_tiles = []
-   
-        if tile.power_up == 1:
-            for j in range(settings.BOARD_WIDTH):
-                if j != tile.j and self.tiles[tile.i][j] is not None:
-                    affected_tiles.append(self.tiles[tile.i][j])
-       
-            for i in range(settings.BOARD_HEIGHT):
-                if i != tile.i and self.tiles[i][tile.j] is not None:
-                    affected_tiles.append(self.tiles[i][tile.j])
-
-        elif tile.power_up == 2:
-            for i in range(settings.BOARD_HEIGHT):
-                for j in range(settings.BOARD_WIDTH):
-                    if self.tiles[i][j] is not None and self.tiles[i][j].color == tile.color:
-                        if i != tile.i or j != tile.j:
-                            affected_tiles.append(self.tiles[i][j])
-   
-        return affected_tiles
\ No newline at end of file
+        i1, j1, i2, j2 = move
+        return self.tiles[i1][j1], self.tiles[i2][j2]
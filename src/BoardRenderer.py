@@ -0,0 +1,310 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class BoardRenderer, which keeps the tiles in the
+viewport of a board drawn in an offscreen layer and redraws only the regions
+of the tiles that moved or changed since the previous frame. While the
+background holds still, the layer is composed over it in an opaque scene,
+which is only updated where the layer changed.
+"""
+
+from typing import Dict, List, Tuple
+
+import pygame
+
+import settings
+from src.Background import Background
+from src.Profiler import Profiler
+from src.SpriteCache import SpriteCache
+from src.Tile import Tile
+
+# Sprites include a 2px shadow
+SPRITE_SIZE = settings.TILE_SIZE + 2
+
+
+class BoardRenderer:
+    def __init__(self, board) -> None:
+        self.board = board
+        # The viewport with one extra row on top for the tiles that fall into
+        # the board
+        self.layer = pygame.Surface(
+            (board.view_width + 2, board.view_height + settings.TILE_SIZE + 2),
+            pygame.SRCALPHA,
+        )
+        # What was drawn of each tile on the layer: (x, y, color, variety,
+        # power_up, draw, i, j). The cell matters because it sets the drawing
+        # order of overlapping shadows.
+        self.drawn: Dict[Tile, Tuple[int, int, int, int, int, bool, int, int]] = {}
+        self.dirty_rects: List[pygame.Rect] = []
+        # Rects of the layer redrawn this frame
+        self.redrawn_rects: List[pygame.Rect] = []
+        # The layer over the background under it
+        self.scene = pygame.Surface(self.layer.get_size())
+        # Camera and background offset of the last frame drawn, and
+        # background offset of the scene (None when it is out of date)
+        self.camera = None
+        self.background_offset = None
+        self.scene_offset = None
+
+    def __sprite_position(self, x: float, y: float) -> Tuple[int, int]:
+        # Positions are truncated on screen coordinates, as blit does when a
+        # tile is drawn directly in the middle of a tween.
+        origin_x, origin_y = self.board.screen_origin()
+        return (
+            int(origin_x + x) - self.board.x,
+            int(origin_y + y) - self.board.y + settings.TILE_SIZE,
+        )
+
+    def __sprite_rect(self, x: float, y: float) -> pygame.Rect:
+        return pygame.Rect(self.__sprite_position(x, y), (SPRITE_SIZE, SPRITE_SIZE))
+
+    def __cells_under(self, rect: pygame.Rect) -> Tuple[int, int, int, int]:
+        # Rows i0 to i1 and columns j0 to j1 (exclusive) of the tiles at rest
+        # that a rect of the layer can overlap, as their shadows reach into
+        # the next cell
+        size = settings.TILE_SIZE
+        x = rect.x + self.board.camera_x
+        y = rect.y + self.board.camera_y - size
+        return (
+            max(0, (y - 2) // size),
+            min(self.board.height, (y + rect.height - 1) // size + 1),
+            max(0, (x - 2) // size),
+            min(self.board.width, (x + rect.width - 1) // size + 1),
+        )
+
+    def __visible_tiles(self) -> List[Tuple[int, int, Tile]]:
+        i0, i1, j0, j1 = self.board.visible_cells()
+        tiles = self.board.tiles
+        visible_tiles = [
+            (i, j, tiles[i][j])
+            for i in range(i0, i1)
+            for j in range(j0, j1)
+            if tiles[i][j] is not None
+        ]
+
+        # A tile can fall through the viewport to a cell out of it. Tiles only
+        # fall down their column, so other columns never reach the viewport.
+        outside = []
+        slots = self.board.animator.slots
+        for j in range(j0, j1):
+            column = self.board.moving_tiles[j]
+            for tile in list(column):
+                if tiles[tile.i][j] is not tile or (
+                    tile not in slots
+                    and tile.x == j * settings.TILE_SIZE
+                    and tile.y == tile.i * settings.TILE_SIZE
+                ):
+                    column.discard(tile)
+                elif not i0 <= tile.i < i1:
+                    outside.append((tile.i, j, tile))
+
+        if outside:
+            visible_tiles = sorted(
+                visible_tiles + outside, key=lambda item: (item[0], item[1])
+            )
+
+        return visible_tiles
+
+    def __sprite_positions(
+        self, visible_tiles: List[Tuple[int, int, Tile]]
+    ) -> List[Tuple[int, int]]:
+        # __sprite_position of every visible tile, computed once per frame.
+        # The tiles in motion are interpolated here from the arrays of their
+        # batches.
+        origin_x, origin_y = self.board.screen_origin()
+        x, y = self.board.x, self.board.y - settings.TILE_SIZE
+        slots = self.board.animator.slots
+
+        if not slots:
+            return [
+                (int(origin_x + tile.x) - x, int(origin_y + tile.y) - y)
+                for _, _, tile in visible_tiles
+            ]
+
+        positions = []
+        for _, _, tile in visible_tiles:
+            slot = slots.get(tile)
+            if slot is None:
+                tile_x, tile_y = tile.x, tile.y
+            else:
+                batch, k = slot
+                tile_x = batch.start_x[k] + batch.distance_x[k] * batch.fraction
+                tile_y = batch.start_y[k] + batch.distance_y[k] * batch.fraction
+            positions.append((int(origin_x + tile_x) - x, int(origin_y + tile_y) - y))
+        return positions
+
+    def __update_dirty_rects(
+        self,
+        visible_tiles: List[Tuple[int, int, Tile]],
+        positions: List[Tuple[int, int]],
+    ) -> None:
+        drawn: Dict[Tile, Tuple[int, int, int, int, int, bool, int, int]] = {}
+
+        for (i, j, tile), position in zip(visible_tiles, positions):
+            state = (
+                tile.x,
+                tile.y,
+                tile.color,
+                tile.variety,
+                tile.power_up,
+                tile.draw,
+                i,
+                j,
+            )
+            drawn[tile] = state
+            last = self.drawn.pop(tile, None)
+
+            if last != state:
+                self.dirty_rects.append(
+                    pygame.Rect(position, (SPRITE_SIZE, SPRITE_SIZE))
+                )
+                if last is not None:
+                    self.dirty_rects.append(self.__sprite_rect(last[0], last[1]))
+
+        # Tiles that left the board or the viewport
+        for last in self.drawn.values():
+            self.dirty_rects.append(self.__sprite_rect(last[0], last[1]))
+
+        self.drawn = drawn
+
+    def __redraw_all(
+        self,
+        visible_tiles: List[Tuple[int, int, Tile]],
+        positions: List[Tuple[int, int]],
+    ) -> None:
+        self.layer.fill((0, 0, 0, 0))
+
+        # Tiles are drawn in board order, as overlapping shadows expect
+        sprites = [
+            (SpriteCache.get(tile.color, tile.variety, tile.power_up), position)
+            for (_, _, tile), position in zip(visible_tiles, positions)
+            if tile.draw
+        ]
+        self.layer.blits(sprites, doreturn=False)
+        Profiler.count("blits", len(sprites))
+        self.dirty_rects = []
+        self.redrawn_rects = [self.layer.get_rect()]
+
+    def __redraw(
+        self,
+        visible_tiles: List[Tuple[int, int, Tile]],
+        positions: List[Tuple[int, int]],
+    ) -> None:
+        size = settings.TILE_SIZE
+        # Tiles away from their cells are tested against every dirty rect;
+        # the others are found from the cells under the rect
+        at_rest: Dict[Tuple[int, int], int] = {}
+        away: List[Tuple[int, pygame.Rect]] = []
+
+        for k, (i, j, tile) in enumerate(visible_tiles):
+            if tile.x == j * size and tile.y == i * size:
+                at_rest[(i, j)] = k
+            else:
+                away.append((k, pygame.Rect(positions[k], (SPRITE_SIZE, SPRITE_SIZE))))
+
+        for rect in self.dirty_rects:
+            self.layer.set_clip(rect)
+            self.layer.fill((0, 0, 0, 0))
+
+            i0, i1, j0, j1 = self.__cells_under(rect)
+            to_draw = [k for k, tile_rect in away if rect.colliderect(tile_rect)]
+            for i in range(i0, i1):
+                for j in range(j0, j1):
+                    k = at_rest.get((i, j))
+                    if k is not None:
+                        to_draw.append(k)
+
+            # Tiles are drawn in board order, as overlapping shadows expect
+            for k in sorted(to_draw):
+                tile = visible_tiles[k][2]
+                if tile.draw:
+                    self.layer.blit(
+                        SpriteCache.get(tile.color, tile.variety, tile.power_up),
+                        positions[k],
+                    )
+                    Profiler.count("blits")
+
+        self.layer.set_clip(None)
+        self.redrawn_rects = self.dirty_rects
+        self.dirty_rects = []
+
+    def __update_scene(self) -> bool:
+        # Whether the scene is up to date to be drawn
+        offset = Background.offset()
+        moved = offset != self.background_offset
+        self.background_offset = offset
+
+        if offset != self.scene_offset:
+            # While the background scrolls the scene would be composed whole
+            # every frame, so the layer is drawn straight over it instead
+            if moved:
+                self.redrawn_rects = []
+                return False
+
+            self.scene_offset = offset
+            self.redrawn_rects = [self.layer.get_rect()]
+
+        x, y = self.board.x, self.board.y - settings.TILE_SIZE
+        for rect in self.redrawn_rects:
+            Background.render(self.scene, rect.move(x, y), rect.x, rect.y)
+            self.scene.blit(self.layer, rect, rect)
+            Profiler.count("blits", 2)
+
+        self.redrawn_rects = []
+        return True
+
+    def render(self, surface: pygame.Surface) -> None:
+        visible_tiles = self.__visible_tiles()
+        positions = self.__sprite_positions(visible_tiles)
+        camera = (self.board.camera_x, self.board.camera_y)
+
+        if self.board.animator.batches:
+            # Most tiles move while a batch runs, so the layer is redrawn whole
+            # without comparing the tiles and drawn straight over the
+            # background. The next frame compares them again and composes the
+            # scene from scratch.
+            self.__redraw_all(visible_tiles, positions)
+            self.drawn = {}
+            self.camera = None
+            self.scene_offset = None
+            source = self.layer
+        else:
+            # Every tile moves on the layer when the camera moves
+            if camera != self.camera:
+                self.camera = camera
+                self.drawn = {}
+                self.dirty_rects = [self.layer.get_rect()]
+
+            self.__update_dirty_rects(visible_tiles, positions)
+
+            # When most of the viewport changed, redrawing it whole is cheaper
+            if len(self.dirty_rects) > len(visible_tiles) // 2:
+                self.__redraw_all(visible_tiles, positions)
+            elif self.dirty_rects:
+                self.__redraw(visible_tiles, positions)
+
+            # Nothing is composed again on the frames where neither the tiles
+            # nor the background changed
+            source = self.scene if self.__update_scene() else self.layer
+
+        # The row over the viewport only shows the tiles falling into the
+        # first row of the board
+        if self.board.camera_y == 0:
+            surface.blit(source, (self.board.x, self.board.y - settings.TILE_SIZE))
+        else:
+            surface.blit(
+                source,
+                (self.board.x, self.board.y),
+                pygame.Rect(
+                    0,
+                    settings.TILE_SIZE,
+                    self.layer.get_width(),
+                    self.layer.get_height() - settings.TILE_SIZE,
+                ),
+            )
+
+        Profiler.count("blits")
@@ -16,36 +16,90 @@ from gale.state import StateMachine
 
 import settings
 from src import states
+from src.AssetRegistry import prewarm
+from src.Background import Background
+from src.Profiler import Profiler
+from src.SpriteCache import SpriteCache
+from src.TextCache import TextCache
 
 
 class Match3(Game):
     def init(self) -> None:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        # Sounds and fonts keep loading while the first frames are drawn
+        prewarm([settings.SOUNDS, settings.FONTS])
+        pygame.mixer.music.load(settings.MUSIC)
         pygame.mixer.music.play(loops=-1)
+        SpriteCache.prewarm()
+
+        # The motion events of a frame are drained and coalesced into a
+        # single "mouse_motion" input with the last position, whatever the
+        # distance the pointer moved. The counters are the raw events
+        # received and the inputs sent to the states, at most one per frame.
+        self.mouse_position = pygame.mouse.get_pos()
+        self.motion_events_received = 0
+        self.motion_events_processed = 0
         self.state_machine = StateMachine(
             {
                 "start": lambda sm: states.StartState(sm, self),
                 "begin": states.BeginGameState,
                 "play": states.PlayState,
                 "game-over": states.GameOverState,
+                "replay": states.ReplayState,
             }
         )
         self.state_machine.change("start")
-        self.background_x = 0
 
     def update(self, dt: float) -> None:
-        self.background_x -= settings.BACKGROUND_SCROLL_SPEED * dt
+        Profiler.begin_frame()
+        Background.update(dt)
+        self.__dispatch_mouse_motion()
+
+        with Profiler.section(f"update:{type(self.state_machine.current).__name__}"):
+            self.state_machine.update(dt)
+
+    def __dispatch_mouse_motion(self) -> None:
+        events = pygame.event.get(pygame.MOUSEMOTION)
+        self.motion_events_received += len(events)
 
-        if self.background_x <= settings.BACKGROUND_LOOPING_POINT:
-            self.background_x = 0
+        # The events taken by the input pass of gale before the update are
+        # not seen here, but they still move the pointer
+        position = events[-1].pos if events else pygame.mouse.get_pos()
 
-        self.state_machine.update(dt)
+        if position == self.mouse_position:
+            return
+
+        self.mouse_position = position
+        self.motion_events_processed += 1
+        self.state_machine.on_input("mouse_motion", InputData(position=position))
 
     def render(self, surface: pygame.Surface) -> None:
-        surface.blit(settings.TEXTURES["background"], (self.background_x, 0))
-        self.state_machine.render(surface)
+        Background.render(surface)
+        Profiler.count("blits")
+
+        with Profiler.section(f"render:{type(self.state_machine.current).__name__}"):
+            self.state_machine.render(surface)
+
+        if Profiler.overlay:
+            self.__render_profiler(surface)
+
+        Profiler.first_frame()
+
+    def __render_profiler(self, surface: pygame.Surface) -> None:
+        lines = Profiler.overlay_lines()
+        y = settings.VIRTUAL_HEIGHT - 12 * len(lines) - 4
+
+        for line in lines:
+            TextCache.render_text(
+                surface, line, settings.FONTS["small"], 4, y, (255, 255, 255)
+            )
+            y += 12
 
     def on_input(self, input_id: str, input_data: InputData) -> None:
         if input_id == "quit" and input_data.pressed:
             self.quit()
+        elif input_id == "profiler" and input_data.pressed:
+            Profiler.toggle_overlay()
         else:
             self.state_machine.on_input(input_id, input_data)
@@ -0,0 +1,249 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Profiler, which times the frames, the update and
+render of every state and the board operations, counts the tiles allocated,
+the tweens created and the blits of every frame, and summarizes or exports
+the recorded frames. The time to the first frame is measured even when it is
+disabled.
+"""
+
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import csv
+import functools
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from gale.timer import Timer
+
+import settings
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], p: float) -> float:
+    # Nearest-rank percentile of sorted values
+    if len(values) == 0:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+class Profiler:
+    enabled = False
+    overlay = False
+
+    # Last recorded frames, each one a dict of milliseconds and counts
+    frames: Deque[Dict[str, float]] = deque(maxlen=settings.PROFILER_FRAMES)
+
+    # Values of the frame in progress
+    current: Dict[str, float] = {}
+    frame_start: Optional[float] = None
+    frame_count = 0
+
+    # Lines of the overlay and the frame they were computed on
+    lines: List[str] = []
+    lines_frame = 0
+
+    # Original attributes of gale's Timer while they are wrapped
+    timer_attributes: Dict[str, Any] = {}
+
+    # Milliseconds from start_clock to the first frame rendered
+    start_time: Optional[float] = None
+    time_to_first_frame: Optional[float] = None
+
+    @classmethod
+    def start_clock(cls) -> None:
+        cls.start_time = time.perf_counter()
+
+    @classmethod
+    def first_frame(cls) -> None:
+        if cls.start_time is None or cls.time_to_first_frame is not None:
+            return
+        cls.time_to_first_frame = (time.perf_counter() - cls.start_time) * 1000
+
+    @classmethod
+    def enable(cls) -> None:
+        cls.enabled = True
+        cls.frame_start = None
+
+        # Tweens are created by gale, so its Timer is wrapped to count them
+        # while the profiler is enabled
+        if "tween" not in cls.timer_attributes:
+            # The class attribute as it is, so disable puts back the same
+            # classmethod
+            cls.timer_attributes["tween"] = vars(Timer)["tween"]
+            timer_tween = Timer.tween
+
+            def tween(duration: float, objects: List, *args, **kwargs) -> Any:
+                cls.count("tweens", len(objects))
+                return timer_tween(duration, objects, *args, **kwargs)
+
+            Timer.tween = tween
+
+    @classmethod
+    def disable(cls) -> None:
+        cls.enabled = False
+        cls.overlay = False
+
+        for name, value in cls.timer_attributes.items():
+            setattr(Timer, name, value)
+        cls.timer_attributes = {}
+
+    @classmethod
+    def toggle_overlay(cls) -> None:
+        if not cls.enabled:
+            cls.enable()
+        cls.overlay = not cls.overlay
+
+    @classmethod
+    def begin_frame(cls) -> None:
+        if not cls.enabled:
+            return
+
+        now = time.perf_counter()
+
+        # A frame lasts from the start of one update to the start of the next
+        if cls.frame_start is not None:
+            cls.current["frame"] = (now - cls.frame_start) * 1000
+            cls.frames.append(cls.current)
+            cls.frame_count += 1
+
+        cls.current = {}
+        cls.frame_start = now
+
+    @classmethod
+    def add(cls, name: str, value: float) -> None:
+        cls.current[name] = cls.current.get(name, 0) + value
+
+    @classmethod
+    def count(cls, name: str, n: int = 1) -> None:
+        if cls.enabled:
+            cls.add(name, n)
+
+    @classmethod
+    @contextmanager
+    def section(cls, name: str):
+        if not cls.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.add(name, (time.perf_counter() - start) * 1000)
+
+    @classmethod
+    def timed(cls, name: str) -> Callable:
+        # Decorator of the functions timed on every call
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return function(*args, **kwargs)
+
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    cls.add(name, (time.perf_counter() - start) * 1000)
+
+            return wrapper
+
+        return decorator
+
+    @classmethod
+    def summary(cls) -> Dict[str, Dict[str, float]]:
+        # Mean and percentiles of every value over the recorded frames. A
+        # frame without a value counts as 0.
+        values: Dict[str, List[float]] = {}
+        for frame in cls.frames:
+            for name in frame:
+                values.setdefault(name, [])
+
+        result = {}
+        for name in values:
+            column = sorted(frame.get(name, 0) for frame in cls.frames)
+            result[name] = {"mean": sum(column) / len(column)}
+            for p in PERCENTILES:
+                result[name][f"p{p}"] = percentile(column, p)
+
+        return result
+
+    @classmethod
+    def export(cls, path: Path) -> None:
+        # CSV with a row per frame, or JSON with the frames, the summary and
+        # the time to the first frame
+        path = Path(path)
+        names = ["frame"]
+        for frame in cls.frames:
+            for name in frame:
+                if name not in names:
+                    names.append(name)
+
+        if path.suffix == ".csv":
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=names, restval=0)
+                writer.writeheader()
+                writer.writerows(cls.frames)
+        else:
+            with open(path, "w") as f:
+                json.dump(
+                    {
+                        "frames": list(cls.frames),
+                        "summary": cls.summary(),
+                        "time_to_first_frame": cls.time_to_first_frame,
+                    },
+                    f,
+                    indent=2,
+                )
+
+    @classmethod
+    def overlay_lines(cls) -> List[str]:
+        # The summary is recomputed every few frames, not on every frame
+        if cls.frame_count - cls.lines_frame < 30 and cls.lines:
+            return cls.lines
+
+        summary = cls.summary()
+        lines = []
+
+        if "frame" in summary:
+            frame = summary["frame"]
+            lines.append(
+                "frame "
+                + " ".join(f"p{p} {frame[f'p{p}']:.1f}" for p in PERCENTILES)
+                + " ms"
+            )
+
+        # The costliest sections by their 95th percentile, as mean / p95
+        sections = sorted(
+            (name for name in summary if ":" in name or "." in name),
+            key=lambda name: -summary[name]["p95"],
+        )
+        for name in sections[:6]:
+            lines.append(
+                f"{name} {summary[name]['mean']:.2f} / {summary[name]['p95']:.2f} ms"
+            )
+
+        last = cls.frames[-1] if cls.frames else {}
+        lines.append(
+            " ".join(
+                f"{name} {int(last.get(name, 0))}"
+                for name in ("blits", "tweens", "tiles allocated")
+            )
+        )
+
+        if cls.time_to_first_frame is not None:
+            lines.append(f"first frame {cls.time_to_first_frame:.0f} ms")
+
+        cls.lines = lines
+        cls.lines_frame = cls.frame_count
+        return lines
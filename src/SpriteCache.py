@@ -0,0 +1,76 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class SpriteCache, which composes every tile sprite
+(shadow, tile and power-up overlay) once so that a tile renders with a
+single blit.
+"""
+
+from typing import Dict, Tuple
+
+import pygame
+
+import settings
+
+
+class SpriteCache:
+    sprites: Dict[Tuple[int, int, int], pygame.Surface] = {}
+
+    @classmethod
+    def get(cls, color: int, variety: int, power_up: int) -> pygame.Surface:
+        key = (color, variety, power_up)
+        sprite = cls.sprites.get(key)
+
+        if sprite is None:
+            sprite = cls.sprites[key] = cls.__build(color, variety, power_up)
+
+        return sprite
+
+    @classmethod
+    def prewarm(cls) -> None:
+        for color in range(settings.NUM_COLORS):
+            for variety in range(settings.NUM_VARIETIES):
+                for power_up in range(3):
+                    cls.get(color, variety, power_up)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.sprites.clear()
+
+    @staticmethod
+    def __build(color: int, variety: int, power_up: int) -> pygame.Surface:
+        frame = settings.FRAMES["tiles"][color][variety]
+        size = settings.TILE_SIZE
+        half = size // 2
+
+        # The shadow is the tile covered by a dark rounded rect, 2px away
+        shadow = pygame.Surface((size, size), pygame.SRCALPHA)
+        shadow.blit(settings.TEXTURES["tiles"], (0, 0), frame)
+        pygame.draw.rect(
+            shadow,
+            (34, 32, 52, 200),
+            pygame.Rect(0, 0, size, size),
+            border_radius=7,
+        )
+
+        sprite = pygame.Surface((size + 2, size + 2), pygame.SRCALPHA)
+        sprite.blit(shadow, (2, 2))
+        sprite.blit(settings.TEXTURES["tiles"], (0, 0), frame)
+
+        if power_up == 1:
+            # Draw a cross overlay
+            pygame.draw.line(sprite, (255, 255, 255), (4, half), (size - 4, half), 2)
+            pygame.draw.line(sprite, (255, 255, 255), (half, 4), (half, size - 4), 2)
+        elif power_up == 2:
+            # Draw a circle overlay
+            pygame.draw.circle(sprite, (255, 255, 255), (half, half), size // 3, 2)
+
+        # Surfaces can only be converted once the display exists
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+
+        return sprite
@@ -0,0 +1,92 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class TextCache, which keeps the most recently used
+texts rasterized, with their shadows, so that a label is rendered again only
+when its text changes.
+"""
+
+from collections import OrderedDict
+from typing import Tuple
+
+import pygame
+
+from gale.text import render_text
+
+from src.Profiler import Profiler
+
+# Room around the text for its shadow
+PADDING = 4
+
+
+class TextCache:
+    surfaces: "OrderedDict[Tuple, pygame.Surface]" = OrderedDict()
+
+    # Maximum number of texts kept rasterized
+    max_size = 256
+
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get(
+        cls,
+        text: str,
+        font: pygame.font.Font,
+        color: Tuple[int, ...],
+        shadowed: bool = False,
+    ) -> pygame.Surface:
+        key = (text, font, tuple(color), shadowed)
+        text_surface = cls.surfaces.get(key)
+
+        if text_surface is not None:
+            cls.hits += 1
+            cls.surfaces.move_to_end(key)
+            return text_surface
+
+        cls.misses += 1
+        width, height = font.size(text)
+        text_surface = pygame.Surface(
+            (width + 2 * PADDING, height + 2 * PADDING), pygame.SRCALPHA
+        )
+        render_text(
+            text_surface, text, font, PADDING, PADDING, color, shadowed=shadowed
+        )
+
+        cls.surfaces[key] = text_surface
+        if len(cls.surfaces) > cls.max_size:
+            cls.surfaces.popitem(last=False)
+
+        return text_surface
+
+    @classmethod
+    def render_text(
+        cls,
+        surface: pygame.Surface,
+        text: str,
+        font: pygame.font.Font,
+        x: int,
+        y: int,
+        color: Tuple[int, ...],
+        center: bool = False,
+        shadowed: bool = False,
+    ) -> None:
+        text_surface = cls.get(text, font, color, shadowed)
+
+        if center:
+            width, height = font.size(text)
+            x -= width // 2
+            y -= height // 2
+
+        surface.blit(text_surface, (x - PADDING, y - PADDING))
+        Profiler.count("blits")
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.surfaces.clear()
+        cls.hits = 0
+        cls.misses = 0
@@ -0,0 +1,119 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class TileAnimator, which moves the tiles of a board
+in batches. A batch keeps the start positions and the distances of its tiles
+in contiguous arrays and a single elapsed time, so a frame only advances the
+time of every batch. While a batch runs, the positions of its tiles are read
+from its arrays (see position) and the x and y of the tiles keep their start
+values; they are set to the end positions when the batch finishes.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from array import array
+
+from src.Profiler import Profiler
+from src.Tile import Tile
+
+
+class TileBatch:
+    def __init__(
+        self,
+        duration: float,
+        motions: List[Tuple[Tile, Dict[str, Any]]],
+        on_finish: Optional[Callable[[], None]],
+    ) -> None:
+        self.duration = duration
+        self.elapsed = 0.0
+        self.fraction = 0.0
+        self.on_finish = on_finish
+        self.tiles = [tile for tile, _ in motions]
+        self.start_x = array("d", [tile.x for tile in self.tiles])
+        self.start_y = array("d", [tile.y for tile in self.tiles])
+        self.distance_x = array(
+            "d", [values.get("x", tile.x) - tile.x for tile, values in motions]
+        )
+        self.distance_y = array(
+            "d", [values.get("y", tile.y) - tile.y for tile, values in motions]
+        )
+
+    def position(self, k: int) -> Tuple[float, float]:
+        return (
+            self.start_x[k] + self.distance_x[k] * self.fraction,
+            self.start_y[k] + self.distance_y[k] * self.fraction,
+        )
+
+    def finish(self) -> None:
+        for tile, x, y, dx, dy in zip(
+            self.tiles, self.start_x, self.start_y, self.distance_x, self.distance_y
+        ):
+            tile.x = x + dx
+            tile.y = y + dy
+
+
+class TileAnimator:
+    def __init__(self, board) -> None:
+        self.board = board
+        self.batches: List[TileBatch] = []
+        # The batch that moves every tile in motion and its index in it
+        self.slots: Dict[Tile, Tuple[TileBatch, int]] = {}
+
+    def tween(
+        self,
+        duration: float,
+        motions: List[Tuple[Tile, Dict[str, Any]]],
+        on_finish: Optional[Callable[[], None]] = None,
+    ) -> None:
+        # Same arguments as gale's Timer.tween, for tiles and their x and y.
+        # A tile already in motion starts from where it is and follows the
+        # new batch from now on.
+        Profiler.count("tweens", len(motions))
+        for tile, _ in motions:
+            if tile in self.slots:
+                tile.x, tile.y = self.position(tile)
+
+        batch = TileBatch(duration, motions, on_finish)
+        self.batches.append(batch)
+        for k, tile in enumerate(batch.tiles):
+            self.slots[tile] = (batch, k)
+
+    def position(self, tile: Tile) -> Tuple[float, float]:
+        # Where a tile is drawn now
+        slot = self.slots.get(tile)
+        if slot is None:
+            return tile.x, tile.y
+        return slot[0].position(slot[1])
+
+    def update(self, dt: float) -> None:
+        if not self.batches:
+            return
+
+        finished = []
+
+        for batch in list(self.batches):
+            batch.elapsed += dt
+
+            if batch.elapsed < batch.duration:
+                batch.fraction = batch.elapsed / batch.duration
+                continue
+
+            batch.finish()
+            self.batches.remove(batch)
+            finished.append(batch)
+            for tile in batch.tiles:
+                if self.slots.get(tile, (None,))[0] is batch:
+                    del self.slots[tile]
+
+        # Callbacks may start new batches, which begin on the next frame
+        for batch in finished:
+            if batch.on_finish is not None:
+                batch.on_finish()
+
+    def clear(self) -> None:
+        self.batches = []
+        self.slots = {}
@@ -0,0 +1,50 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class TilePool, which recycles the tiles removed from
+the board to refill it instead of allocating new ones.
+"""
+
+from typing import List
+
+from src.Profiler import Profiler
+from src.Tile import Tile
+
+
+class TilePool:
+    tiles: List[Tile] = []
+
+    # Maximum number of free tiles kept for reuse
+    max_size = 1024
+
+    # Tiles created and tiles reused since the start
+    allocated = 0
+    reused = 0
+
+    @classmethod
+    def acquire(cls, i: int, j: int, color: int, variety: int) -> Tile:
+        if cls.tiles:
+            cls.reused += 1
+            Profiler.count("tiles reused")
+            tile = cls.tiles.pop()
+            tile.reset(i, j, color, variety)
+            return tile
+
+        cls.allocated += 1
+        Profiler.count("tiles allocated")
+        return Tile(i, j, color, variety)
+
+    @classmethod
+    def release(cls, tile: Tile) -> None:
+        if len(cls.tiles) < cls.max_size:
+            cls.tiles.append(tile)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.tiles.clear()
+        cls.allocated = 0
+        cls.reused = 0
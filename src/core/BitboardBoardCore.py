@@ -0,0 +1,307 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class BitboardBoardCore, a BoardCore that also keeps
+one bit mask per color and per power-up type, with bit i * width + j for the
+cell (i, j). Matches, valid moves and gravity are found with shifts and ANDs
+of whole rows and columns. An 8x8 board fits in a 64-bit mask; larger boards
+work the same with longer integers.
+"""
+
+from typing import List, Optional, Tuple
+
+from src.core.BoardCore import BoardCore, Cell, EMPTY
+from src.core.MoveIndex import Move
+
+
+def cells_of(mask: int, width: int) -> List[Cell]:
+    # Cells of the set bits, in row-major order
+    cells = []
+    while mask:
+        low = mask & -mask
+        k = low.bit_length() - 1
+        cells.append((k // width, k % width))
+        mask ^= low
+    return cells
+
+
+class BitboardBoardCore(BoardCore):
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        num_colors: int,
+        num_varieties: int,
+        min_moves: int = 1,
+        seed: Optional[int] = None,
+        cells: Optional[bytes] = None,
+    ) -> None:
+        # The constructor generates the board, so the masks of the borders
+        # are needed first
+        def columns(first: int, last: int) -> int:
+            mask = 0
+            for i in range(height):
+                for j in range(max(0, first), min(width, last + 1)):
+                    mask |= 1 << (i * width + j)
+            return mask
+
+        self.full_mask = (1 << (width * height)) - 1
+        # Cells with at least 1 or 2 cells to their left and to their right
+        self.left2_mask = columns(2, width - 1)
+        self.right1_mask = columns(0, width - 2)
+        self.right2_mask = columns(0, width - 3)
+        self.inner_mask = columns(1, width - 2)
+        self.column_masks = [columns(j, j) for j in range(width)]
+        super().__init__(
+            width, height, num_colors, num_varieties, min_moves, seed, cells
+        )
+
+    def copy_index(self, clone: BoardCore) -> None:
+        clone.masks = list(self.masks)
+        clone.power_up_masks = list(self.power_up_masks)
+
+    def rebuild_index(self) -> None:
+        # The masks are the index of the colors and of the power-up types
+        # (1 and 2)
+        self.masks: List[int] = [0] * self.num_colors
+        self.power_up_masks: List[int] = [0, 0, 0]
+
+        for k in range(self.width * self.height):
+            self.index_cell(k)
+
+    def index_cell(self, k: int) -> None:
+        if self.colors[k] != EMPTY:
+            self.masks[self.colors[k]] |= 1 << k
+        if self.power_ups[k] > 0:
+            self.power_up_masks[self.power_ups[k]] |= 1 << k
+
+    def unindex_cell(self, k: int) -> None:
+        if self.colors[k] != EMPTY:
+            self.masks[self.colors[k]] &= ~(1 << k)
+        if self.power_ups[k] > 0:
+            self.power_up_masks[self.power_ups[k]] &= ~(1 << k)
+
+    def filled_mask(self) -> int:
+        filled = 0
+        for mask in self.masks:
+            filled |= mask
+        return filled
+
+    def run_masks(self, mask: int) -> Tuple[int, int]:
+        # Cells of a color mask that belong to horizontal and vertical runs
+        # of 3 or more
+        w = self.width
+        h_start = mask & (mask >> 1) & (mask >> 2) & self.right2_mask
+        v_start = mask & (mask >> w) & (mask >> 2 * w)
+        return (
+            h_start | (h_start << 1) | (h_start << 2),
+            v_start | (v_start << w) | (v_start << 2 * w),
+        )
+
+    def has_match(self) -> bool:
+        for mask in self.masks:
+            h_run, v_run = self.run_masks(mask)
+            if h_run | v_run:
+                return True
+        return False
+
+    def calculate_matches_for(
+        self, new_cells: List[Cell], last_moved_i: int = -1, last_moved_j: int = -1
+    ) -> Optional[List[List[Cell]]]:
+        w = self.width
+        in_run = 0
+        # Bit k of h_link is set when the cells k and k + 1 are in the same
+        # horizontal run, and bit k of v_link when k and k + w are in the same
+        # vertical run
+        h_link = 0
+        v_link = 0
+
+        for mask in self.masks:
+            h_run, v_run = self.run_masks(mask)
+            in_run |= h_run | v_run
+            h_link |= h_run & (h_run >> 1) & self.right1_mask
+            v_link |= v_run & (v_run >> w)
+
+        self.matches = []
+        self.match_shapes = []
+
+        if in_run == 0:
+            return None
+
+        visited = 0
+
+        for i, j in new_cells:
+            bit = 1 << (i * w + j)
+            if visited & bit or not in_run & bit:
+                continue
+
+            # Flood fill through the links
+            match = bit
+            while True:
+                grown = (
+                    match
+                    | ((match & h_link) << 1)
+                    | ((match >> 1) & h_link)
+                    | ((match & v_link) << w)
+                    | ((match >> w) & v_link)
+                )
+                if grown == match:
+                    break
+                match = grown
+
+            visited |= match
+            self.matches.append(cells_of(match, w))
+
+        self.create_match_power_up(last_moved_i, last_moved_j)
+
+        return self.matches if len(self.matches) > 0 else None
+
+    def get_falling_tiles(self) -> Tuple[List[Tuple[int, int, int]], List[Cell]]:
+        # Tiles moved down as (from_i, to_i, j) and new tiles as (i, j)
+        moves: List[Tuple[int, int, int]] = []
+        new_cells: List[Cell] = []
+        w = self.width
+        filled = self.filled_mask()
+        layers = (self.colors, self.varieties, self.power_ups)
+
+        # Full columns are skipped; the others are compacted into their
+        # lowest cells
+        for j in range(w):
+            column = self.column_masks[j]
+            if filled & column == column:
+                continue
+
+            space_i = self.height - 1
+
+            for i in range(self.height - 1, -1, -1):
+                k = i * w + j
+                if not filled & (1 << k):
+                    continue
+
+                if i != space_i:
+                    to_k = space_i * w + j
+                    bits = (1 << k) | (1 << to_k)
+                    self.masks[self.colors[k]] ^= bits
+                    if self.power_ups[k] > 0:
+                        self.power_up_masks[self.power_ups[k]] ^= bits
+                    for layer in layers:
+                        layer[to_k] = layer[k]
+                    self.colors[k] = EMPTY
+                    self.varieties[k] = 0
+                    self.power_ups[k] = 0
+                    self.move_index.invalidate(i, j)
+                    self.move_index.invalidate(space_i, j)
+                    moves.append((i, space_i, j))
+
+                space_i -= 1
+
+            # create a replacement tiles at the top of the screen
+            for i in range(space_i + 1):
+                new_cells.append((i, j))
+
+        # New tiles are drawn in the order of BoardCore, column by column
+        for i, j in new_cells:
+            self.set_tile(
+                i,
+                j,
+                self.rng.randint(0, self.num_colors - 1),
+                self.rng.randint(0, self.num_varieties - 1),
+            )
+
+        return moves, new_cells
+
+    def valid_swaps(self) -> Tuple[int, int]:
+        # Swaps that make a match with one of the swapped tiles, as masks of
+        # the swaps k <-> k + 1 and k <-> k + w
+        w = self.width
+        full = self.full_mask
+        h_valid = 0
+        v_valid = 0
+        h_same = 0
+        v_same = 0
+        filled = 0
+
+        for mask in self.masks:
+            if mask == 0:
+                continue
+
+            filled |= mask
+
+            # Cells where the color would complete a run with the two cells
+            # to one side or with one cell at each side
+            left2 = (mask << 1) & (mask << 2) & self.left2_mask
+            right2 = (mask >> 1) & (mask >> 2) & self.right2_mask
+            left_right = (mask << 1) & (mask >> 1) & self.inner_mask
+            up2 = (mask << w) & (mask << 2 * w) & full
+            down2 = (mask >> w) & (mask >> 2 * w)
+            up_down = (mask << w) & (mask >> w) & full
+            horizontal = left2 | right2 | left_right
+            vertical = up2 | down2 | up_down
+
+            # The tile of k + 1 moved to k, or the tile of k moved to k + 1
+            h_valid |= (mask >> 1) & (left2 | vertical)
+            h_valid |= mask & ((right2 | vertical) >> 1)
+            # The tile of k + w moved to k, or the tile of k moved to k + w
+            v_valid |= (mask >> w) & (up2 | horizontal)
+            v_valid |= mask & ((down2 | horizontal) >> w)
+
+            h_same |= mask & (mask >> 1)
+            v_same |= mask & (mask >> w)
+
+        # An empty cell, as a cascade leaves them, cannot be swapped
+        h_swaps = h_valid & ~h_same & filled & (filled >> 1) & self.right1_mask
+        v_swaps = v_valid & ~v_same & filled & (filled >> w)
+        return h_swaps, v_swaps
+
+    def count_possible_matches(self) -> int:
+        h_swaps, v_swaps = self.valid_swaps()
+        match_count = bin(h_swaps).count("1") + bin(v_swaps).count("1")
+
+        # A recreated board has at least min_moves valid moves from 4 colors on
+        while match_count == 0:
+            self.recreate_board()
+            h_swaps, v_swaps = self.valid_swaps()
+            match_count = bin(h_swaps).count("1") + bin(v_swaps).count("1")
+
+        return match_count
+
+    def has_any_move(self) -> bool:
+        h_swaps, v_swaps = self.valid_swaps()
+        return (h_swaps | v_swaps) != 0
+
+    def valid_moves(self) -> List[Move]:
+        h_swaps, v_swaps = self.valid_swaps()
+        moves: List[Move] = []
+
+        # In the order of BoardCore.valid_moves, which sorts them
+        swaps = h_swaps | v_swaps
+        while swaps:
+            low = swaps & -swaps
+            i, j = divmod(low.bit_length() - 1, self.width)
+            if h_swaps & low:
+                moves.append((i, j, i, j + 1))
+            if v_swaps & low:
+                moves.append((i, j, i + 1, j))
+            swaps ^= low
+
+        return moves
+
+    def cells_of_color(self, color: int) -> List[Cell]:
+        return cells_of(self.masks[color], self.width)
+
+    def power_up_cells(self) -> List[Cell]:
+        return cells_of(self.power_up_masks[1] | self.power_up_masks[2], self.width)
+
+    def color_counts(self) -> List[int]:
+        return [bin(mask).count("1") for mask in self.masks]
+
+    def activate_power_up(self, i: int, j: int) -> List[Cell]:
+        if self.power_up(i, j) != 2:
+            return super().activate_power_up(i, j)
+
+        mask = self.masks[self.color(i, j)] & ~(1 << (i * self.width + j))
+        return cells_of(mask, self.width)
@@ -0,0 +1,488 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class BoardCore, the board logic without any pygame
+dependency. Every cell is stored as three bytes (color, variety, power-up)
+in flat bytearrays indexed by i * width + j.
+
+A snapshot of a board is a header followed by two bytes per cell, in
+row-major order, all little-endian:
+
+    header: 4s magic "M3BS", B version, H width, H height, B colors,
+            B varieties
+    cells:  B color of every cell (255 when empty), then B variety * 4 +
+            power-up of every cell
+"""
+
+from typing import List, Optional, Set, Tuple
+
+import copy
+import random
+import struct
+
+from src.core import match_shapes
+from src.core.board_generator import MIN_COLORS_TO_PLANT, generate_tiles
+from src.core.CascadeStep import CascadeStep
+from src.core.constants import EMPTY
+from src.core.MoveIndex import Move, MoveIndex
+
+Cell = Tuple[int, int]
+
+SNAPSHOT_MAGIC = b"M3BS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sBHHBB")
+
+# The power-up takes the 2 low bits of the byte of a cell and its variety the
+# other 6
+MAX_SNAPSHOT_VARIETIES = 64
+
+# Byte translations from the byte of a cell to its variety and power-up
+BYTE_TO_VARIETY = bytes(b >> 2 for b in range(256))
+BYTE_TO_POWER_UP = bytes(b & 3 for b in range(256))
+
+
+class BoardCore:
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        num_colors: int,
+        num_varieties: int,
+        min_moves: int = 1,
+        seed: Optional[int] = None,
+        cells: Optional[bytes] = None,
+    ) -> None:
+        # cells are those of a snapshot, as to_bytes writes them after its
+        # header, to start from instead of generating a new board
+        self.width = width
+        self.height = height
+        self.num_colors = num_colors
+        self.num_varieties = num_varieties
+        # Valid moves guaranteed on every new board
+        self.min_moves = min_moves
+        # Every random choice of the board comes from its own generator, so a
+        # board replays the same way from the same seed
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.colors = self.new_layer()
+        self.varieties = self.new_layer()
+        self.power_ups = self.new_layer()  # 0: normal, 1: cross, 2: circle
+        self.matches: List[List[Cell]] = []
+        # Shape of every match, from src.core.match_shapes
+        self.match_shapes: List[int] = []
+        # Number of times a board without moves has been recreated
+        self.reshuffle_count = 0
+        self.move_index = MoveIndex(self)
+
+        if cells is None:
+            self.initialize_tiles()
+        else:
+            self.load_cells(cells)
+
+    @property
+    def rng(self) -> random.Random:
+        # A clone shares the generator of its board until one of them draws
+        # from it, which then gets its own copy (setstate without seeding it)
+        if self.rng_shared:
+            rng = random.Random.__new__(random.Random)
+            rng.setstate(self.rng_source.getstate())
+            self.rng_source = rng
+            self.rng_shared = False
+        return self.rng_source
+
+    @rng.setter
+    def rng(self, rng: random.Random) -> None:
+        self.rng_source = rng
+        self.rng_shared = False
+
+    def new_layer(self) -> bytearray:
+        return bytearray(self.width * self.height)
+
+    def color(self, i: int, j: int) -> int:
+        return self.colors[i * self.width + j]
+
+    def variety(self, i: int, j: int) -> int:
+        return self.varieties[i * self.width + j]
+
+    def power_up(self, i: int, j: int) -> int:
+        return self.power_ups[i * self.width + j]
+
+    def is_empty(self, i: int, j: int) -> bool:
+        return self.colors[i * self.width + j] == EMPTY
+
+    def rebuild_index(self) -> None:
+        # Cells of every color and of every power-up type (1 and 2), as
+        # i * width + j
+        self.color_index: List[Set[int]] = [set() for _ in range(self.num_colors)]
+        self.power_up_index: List[Set[int]] = [set(), set(), set()]
+
+        for k in range(self.width * self.height):
+            self.index_cell(k)
+
+    def index_cell(self, k: int) -> None:
+        if self.colors[k] != EMPTY:
+            self.color_index[self.colors[k]].add(k)
+        if self.power_ups[k] > 0:
+            self.power_up_index[self.power_ups[k]].add(k)
+
+    def unindex_cell(self, k: int) -> None:
+        if self.colors[k] != EMPTY:
+            self.color_index[self.colors[k]].discard(k)
+        if self.power_ups[k] > 0:
+            self.power_up_index[self.power_ups[k]].discard(k)
+
+    def copy_index(self, clone: "BoardCore") -> None:
+        clone.color_index = [set(cells) for cells in self.color_index]
+        clone.power_up_index = [set(cells) for cells in self.power_up_index]
+
+    def clone(self) -> "BoardCore":
+        # A copy of the board to branch from, without generating a new board
+        # as the constructor does
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.colors = copy.copy(self.colors)
+        clone.varieties = copy.copy(self.varieties)
+        clone.power_ups = copy.copy(self.power_ups)
+        clone.matches = []
+        clone.match_shapes = []
+        self.copy_index(clone)
+        clone.move_index = self.move_index.copy(clone)
+        self.rng_shared = clone.rng_shared = True
+        return clone
+
+    def __copy__(self) -> "BoardCore":
+        return self.clone()
+
+    def to_bytes(self) -> bytes:
+        if self.num_varieties > MAX_SNAPSHOT_VARIETIES:
+            raise ValueError(
+                f"a snapshot has at most {MAX_SNAPSHOT_VARIETIES} varieties"
+            )
+
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_VERSION,
+            self.width,
+            self.height,
+            self.num_colors,
+            self.num_varieties,
+        )
+        low = bytes(
+            variety * 4 + power_up
+            for variety, power_up in zip(bytes(self.varieties), bytes(self.power_ups))
+        )
+        return header + bytes(self.colors) + low
+
+    @classmethod
+    def from_bytes(cls, data: bytes, seed: Optional[int] = None) -> "BoardCore":
+        # The random generator is not in the snapshot; the board draws its
+        # new tiles from seed
+        magic, version, *dimensions = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("not a board snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        if dimensions[-1] > MAX_SNAPSHOT_VARIETIES:
+            raise ValueError(
+                f"a snapshot has at most {MAX_SNAPSHOT_VARIETIES} varieties"
+            )
+
+        return cls(*dimensions, seed=seed, cells=data[SNAPSHOT_HEADER.size :])
+
+    def load_cells(self, cells: bytes) -> None:
+        n = self.width * self.height
+        if len(cells) != 2 * n:
+            raise ValueError("snapshot size does not match the board")
+
+        low = cells[n:]
+        self.colors[:] = memoryview(cells[:n])
+        self.varieties[:] = memoryview(low.translate(BYTE_TO_VARIETY))
+        self.power_ups[:] = memoryview(low.translate(BYTE_TO_POWER_UP))
+        self.matches = []
+        self.match_shapes = []
+        self.rebuild_index()
+        self.move_index.invalidate_all()
+
+    def set_tile(
+        self, i: int, j: int, color: int, variety: int, power_up: int = 0
+    ) -> None:
+        k = i * self.width + j
+        self.unindex_cell(k)
+        self.colors[k] = color
+        self.varieties[k] = variety
+        self.power_ups[k] = power_up
+        self.index_cell(k)
+        self.move_index.invalidate(i, j)
+
+    def clear(self, i: int, j: int) -> None:
+        self.set_tile(i, j, EMPTY, 0, 0)
+
+    def swap(self, i1: int, j1: int, i2: int, j2: int) -> None:
+        k1 = i1 * self.width + j1
+        k2 = i2 * self.width + j2
+        self.unindex_cell(k1)
+        self.unindex_cell(k2)
+        for values in (self.colors, self.varieties, self.power_ups):
+            values[k1], values[k2] = values[k2], values[k1]
+        self.index_cell(k1)
+        self.index_cell(k2)
+        self.move_index.invalidate(i1, j1)
+        self.move_index.invalidate(i2, j2)
+
+    def initialize_tiles(self) -> None:
+        # With fewer colors moves cannot be planted safely and a board without
+        # moves is recreated by count_possible_matches instead.
+        min_moves = self.min_moves if self.num_colors >= MIN_COLORS_TO_PLANT else 0
+        colors, varieties = generate_tiles(
+            self.width,
+            self.height,
+            self.num_colors,
+            self.num_varieties,
+            min_moves,
+            self.rng,
+        )
+        self.colors[:] = colors
+        self.varieties[:] = varieties
+        self.power_ups[:] = [0] * len(colors)
+        self.rebuild_index()
+        self.move_index.invalidate_all()
+
+    def __run(self, k: int, step: int, first: int, last: int) -> List[int]:
+        # Cells with the color of k next to it along step, between the cells
+        # first and last of its row or column
+        colors = self.colors
+        color = colors[k]
+        low = k
+        while low - step >= first and colors[low - step] == color:
+            low -= step
+        high = k
+        while high + step <= last and colors[high + step] == color:
+            high += step
+        return list(range(low, high + 1, step))
+
+    def calculate_matches_for(
+        self, new_cells: List[Cell], last_moved_i: int = -1, last_moved_j: int = -1
+    ) -> Optional[List[List[Cell]]]:
+        w = self.width
+        last = w * self.height - 1
+        in_match: Set[int] = set()
+        # Cells whose horizontal or vertical run has been looked at
+        h_seen: Set[int] = set()
+        v_seen: Set[int] = set()
+
+        self.matches = []
+
+        # Every match grows from a work list: each cell added to it adds the
+        # runs of 3 or more it belongs to
+        for i, j in new_cells:
+            k = i * w + j
+            if k in in_match or self.colors[k] == EMPTY:
+                continue
+
+            match: List[Cell] = []
+            pending = [k]
+
+            while len(pending) > 0:
+                c = pending.pop()
+                runs = []
+
+                if c not in h_seen:
+                    row = c - c % w
+                    run = self.__run(c, 1, row, row + w - 1)
+                    h_seen.update(run)
+                    runs.append(run)
+
+                if c not in v_seen:
+                    run = self.__run(c, w, c % w, last)
+                    v_seen.update(run)
+                    runs.append(run)
+
+                for run in runs:
+                    if len(run) < 3:
+                        continue
+                    for r in run:
+                        if r not in in_match:
+                            in_match.add(r)
+                            match.append(divmod(r, w))
+                            pending.append(r)
+
+            if len(match) > 0:
+                self.matches.append(match)
+
+        self.create_match_power_up(last_moved_i, last_moved_j)
+        return self.matches if len(self.matches) > 0 else None
+
+    def create_match_power_up(self, last_moved_i: int, last_moved_j: int) -> None:
+        # The moved tile of a line of 4 or more, an L or a T stays on the
+        # board as the power-up of its shape instead of being removed.
+        self.match_shapes = [match_shapes.classify(match) for match in self.matches]
+
+        if last_moved_i < 0 or last_moved_j < 0:
+            return
+
+        for match, shape in zip(self.matches, self.match_shapes):
+            power_up = match_shapes.POWER_UPS[shape]
+            if power_up > 0 and (last_moved_i, last_moved_j) in match:
+                k = last_moved_i * self.width + last_moved_j
+                self.unindex_cell(k)
+                self.power_ups[k] = power_up
+                self.index_cell(k)
+                match.remove((last_moved_i, last_moved_j))
+                break
+
+    def remove_matches(self) -> None:
+        for match in self.matches:
+            for i, j in match:
+                self.clear(i, j)
+
+        self.matches = []
+        self.match_shapes = []
+
+    def remove_cells(self, cells: List[Cell]) -> None:
+        for i, j in cells:
+            self.clear(i, j)
+
+    def get_falling_tiles(self) -> Tuple[List[Tuple[int, int, int]], List[Cell]]:
+        # Tiles moved down as (from_i, to_i, j) and new tiles as (i, j)
+        moves: List[Tuple[int, int, int]] = []
+        new_cells: List[Cell] = []
+
+        # for each column, go up tile by tile compacting tiles into the
+        # lowest free space
+        for j in range(self.width):
+            space_i = self.height - 1
+
+            for i in range(self.height - 1, -1, -1):
+                if self.is_empty(i, j):
+                    continue
+
+                if i != space_i:
+                    self.swap(i, j, space_i, j)
+                    moves.append((i, space_i, j))
+
+                space_i -= 1
+
+        # create a replacement tiles at the top of the screen
+        for j in range(self.width):
+            for i in range(self.height):
+                if self.is_empty(i, j):
+                    self.set_tile(
+                        i,
+                        j,
+                        self.rng.randint(0, self.num_colors - 1),
+                        self.rng.randint(0, self.num_varieties - 1),
+                    )
+                    new_cells.append((i, j))
+
+        return moves, new_cells
+
+    def resolve_cascade(
+        self, cells: List[Cell], last_moved_i: int = -1, last_moved_j: int = -1
+    ) -> List[CascadeStep]:
+        # Resolves the matches of the given cells and every match that follows
+        # at once, returning the steps in order. Empty cells, as a power-up
+        # leaves them, are filled in a first step without matches.
+        steps: List[CascadeStep] = []
+        moved = last_moved_i >= 0 and last_moved_j >= 0
+        power_up = self.power_up(last_moved_i, last_moved_j) if moved else 0
+        matches = self.calculate_matches_for(cells, last_moved_i, last_moved_j)
+        power_ups = []
+
+        # The moved tile of a line of 4 or more, an L or a T became a power-up
+        if moved and self.power_up(last_moved_i, last_moved_j) != power_up:
+            power_ups.append(
+                (
+                    last_moved_i,
+                    last_moved_j,
+                    self.color(last_moved_i, last_moved_j),
+                    self.variety(last_moved_i, last_moved_j),
+                    self.power_up(last_moved_i, last_moved_j),
+                )
+            )
+
+        while matches is not None or len(steps) == 0:
+            removed = self.matches
+
+            if matches is not None:
+                self.remove_matches()
+
+            moves, new_cells = self.get_falling_tiles()
+
+            if len(removed) == 0 and len(moves) == 0 and len(new_cells) == 0:
+                break
+
+            new_tiles = [
+                (i, j, self.color(i, j), self.variety(i, j)) for i, j in new_cells
+            ]
+            steps.append(CascadeStep(removed, power_ups, moves, new_tiles))
+            matches = self.calculate_matches_for(
+                [(to_i, j) for _, to_i, j in moves] + new_cells
+            )
+            power_ups = []
+            last_moved_i, last_moved_j = -1, -1
+
+        return steps
+
+    def count_possible_matches(self) -> int:
+        # The index counts the swaps that make a match with one of the swapped
+        # tiles, which are all the valid swaps of a board without matches.
+        match_count = self.move_index.count()
+
+        # A recreated board has at least min_moves valid moves from 4 colors on
+        while match_count == 0:
+            self.recreate_board()
+            match_count = self.move_index.count()
+
+        return match_count
+
+    def has_any_move(self) -> bool:
+        return self.move_index.any()
+
+    def valid_moves(self) -> List[Move]:
+        self.move_index.refresh()
+        return sorted(self.move_index.moves)
+
+    def recreate_board(self) -> None:
+        self.reshuffle_count += 1
+        self.initialize_tiles()
+
+    def create_power_up(self, i: int, j: int, match_size: int) -> None:
+        k = i * self.width + j
+        self.unindex_cell(k)
+        self.power_ups[k] = 1 if match_size == 4 else 2
+        self.varieties[k] = self.rng.randint(0, self.num_varieties - 1)
+        self.index_cell(k)
+
+    def cells_of_color(self, color: int) -> List[Cell]:
+        return [divmod(k, self.width) for k in sorted(self.color_index[color])]
+
+    def power_up_cells(self) -> List[Cell]:
+        cells = self.power_up_index[1] | self.power_up_index[2]
+        return [divmod(k, self.width) for k in sorted(cells)]
+
+    def color_counts(self) -> List[int]:
+        return [len(cells) for cells in self.color_index]
+
+    def activate_power_up(self, i: int, j: int) -> List[Cell]:
+        affected_cells: List[Cell] = []
+        power_up = self.power_up(i, j)
+
+        if power_up == 1:
+            for col in range(self.width):
+                if col != j and not self.is_empty(i, col):
+                    affected_cells.append((i, col))
+
+            for row in range(self.height):
+                if row != i and not self.is_empty(row, j):
+                    affected_cells.append((row, j))
+
+        elif power_up == 2:
+            for cell in self.cells_of_color(self.color(i, j)):
+                if cell != (i, j):
+                    affected_cells.append(cell)
+
+        return affected_cells
@@ -0,0 +1,87 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class BoardDiff, what a mutation of the board changed:
+the cells emptied, the tiles moved and created and the power-ups created.
+Renderers, sounds, scoring and replays can use it instead of reading the
+whole board again.
+
+It is serialized as four counts followed by the records, all little-endian:
+
+    header:   I removed, I moved, I created, I power-ups
+    removed:  H i, H j
+    moved:    H from_i, H from_j, H to_i, H to_j
+    created:  H i, H j, B color, B variety
+    power-up: H i, H j, B color, B variety, B power-up
+"""
+
+from typing import List, NamedTuple, Tuple
+
+import struct
+
+Cell = Tuple[int, int]
+
+HEADER = struct.Struct("<IIII")
+RECORDS = (
+    struct.Struct("<HH"),
+    struct.Struct("<HHHH"),
+    struct.Struct("<HHBB"),
+    struct.Struct("<HHBBB"),
+)
+
+
+class BoardDiff(NamedTuple):
+    # Cells left empty
+    removed: List[Cell]
+    # (from_i, from_j, to_i, to_j) of every tile moved
+    moved: List[Tuple[int, int, int, int]]
+    # (i, j, color, variety) of every new tile
+    created: List[Tuple[int, int, int, int]]
+    # (i, j, color, variety, power_up) of every power-up created
+    power_ups: List[Tuple[int, int, int, int, int]]
+
+    def apply(self, core) -> None:
+        # Makes the same changes on a board, in the order of a cascade step:
+        # the removals, the power-ups, the moves and the new tiles
+        for i, j in self.removed:
+            core.clear(i, j)
+
+        for i, j, color, variety, power_up in self.power_ups:
+            core.set_tile(i, j, color, variety, power_up)
+
+        # The tiles are read before any is written, as a swap moves each one
+        # into the cell of the other
+        tiles = [
+            (core.color(i, j), core.variety(i, j), core.power_up(i, j))
+            for i, j, _, _ in self.moved
+        ]
+        for i, j, _, _ in self.moved:
+            core.clear(i, j)
+        for (_, _, i, j), tile in zip(self.moved, tiles):
+            core.set_tile(i, j, *tile)
+
+        for i, j, color, variety in self.created:
+            core.set_tile(i, j, color, variety)
+
+    def to_bytes(self) -> bytes:
+        chunks = [HEADER.pack(*(len(records) for records in self))]
+        for record, records in zip(RECORDS, self):
+            chunks.extend(record.pack(*values) for values in records)
+        return b"".join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BoardDiff":
+        counts = HEADER.unpack_from(data)
+        offset = HEADER.size
+        fields = []
+
+        for record, count in zip(RECORDS, counts):
+            end = offset + record.size * count
+            fields.append(list(record.iter_unpack(data[offset:end])))
+            offset = end
+
+        return cls(*fields)
@@ -0,0 +1,37 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class CascadeStep, one step of a resolved cascade:
+the matches removed, the power-ups created in their place and the tiles that
+fell and were created to fill the holes.
+"""
+
+from typing import List, NamedTuple, Tuple
+
+from src.core.BoardDiff import BoardDiff
+
+Cell = Tuple[int, int]
+
+
+class CascadeStep(NamedTuple):
+    # Cells of every match removed. The first step of a power-up activation
+    # has no matches, only the fall into the cells it cleared.
+    matches: List[List[Cell]]
+    # (i, j, color, variety, power_up) of every power-up created
+    power_ups: List[Tuple[int, int, int, int, int]]
+    # (from_i, to_i, j) of every tile moved down
+    moves: List[Tuple[int, int, int]]
+    # (i, j, color, variety) of every new tile
+    new_tiles: List[Tuple[int, int, int, int]]
+
+    def diff(self) -> BoardDiff:
+        return BoardDiff(
+            [cell for match in self.matches for cell in match],
+            [(from_i, j, to_i, j) for from_i, to_i, j in self.moves],
+            self.new_tiles,
+            self.power_ups,
+        )
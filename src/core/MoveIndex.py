@@ -0,0 +1,166 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class MoveIndex, which keeps the set of valid swaps of
+a BoardCore up to date by re-checking only the swaps around changed cells.
+"""
+
+from typing import Set, Tuple
+
+from src.core.constants import EMPTY
+
+# A swap between (i1, j1) and its right or bottom neighbor (i2, j2)
+Move = Tuple[int, int, int, int]
+
+
+class MoveIndex:
+    def __init__(self, board) -> None:
+        self.board = board
+        self.moves: Set[Move] = set()
+        self.dirty_cells: Set[Tuple[int, int]] = set()
+        self.full_refresh = True
+
+    def copy(self, board) -> "MoveIndex":
+        clone = MoveIndex(board)
+        clone.moves = set(self.moves)
+        clone.dirty_cells = set(self.dirty_cells)
+        clone.full_refresh = self.full_refresh
+        return clone
+
+    def invalidate(self, i: int, j: int) -> None:
+        self.dirty_cells.add((i, j))
+
+    def invalidate_all(self) -> None:
+        self.dirty_cells.clear()
+        self.full_refresh = True
+
+    def __run_through(self, i: int, j: int) -> bool:
+        colors = self.board.colors
+        width = self.board.width
+        height = self.board.height
+        color = colors[i * width + j]
+
+        count = 1
+        col = j - 1
+        while col >= 0 and colors[i * width + col] == color:
+            count += 1
+            col -= 1
+        col = j + 1
+        while col < width and colors[i * width + col] == color:
+            count += 1
+            col += 1
+        if count >= 3:
+            return True
+
+        count = 1
+        row = i - 1
+        while row >= 0 and colors[row * width + j] == color:
+            count += 1
+            row -= 1
+        row = i + 1
+        while row < height and colors[row * width + j] == color:
+            count += 1
+            row += 1
+        return count >= 3
+
+    def is_valid(self, i1: int, j1: int, i2: int, j2: int) -> bool:
+        colors = self.board.colors
+        k1 = i1 * self.board.width + j1
+        k2 = i2 * self.board.width + j2
+        color1, color2 = colors[k1], colors[k2]
+
+        if color1 == color2 or color1 == EMPTY or color2 == EMPTY:
+            return False
+
+        # Swap only the colors, without notifying the index
+        colors[k1], colors[k2] = color2, color1
+        valid = self.__run_through(i1, j1) or self.__run_through(i2, j2)
+        colors[k1], colors[k2] = color1, color2
+        return valid
+
+    def __update(self, move: Move) -> None:
+        if self.is_valid(*move):
+            self.moves.add(move)
+        else:
+            self.moves.discard(move)
+
+    def __needs_full_refresh(self) -> bool:
+        # A swap depends on the cells up to 2 steps away from either of its
+        # tiles along their row and column, so a changed cell can only affect
+        # the swaps that touch one of those 9 cells.
+        cells = self.board.width * self.board.height
+        return self.full_refresh or len(self.dirty_cells) * 9 >= cells
+
+    def refresh(self) -> None:
+        width = self.board.width
+        height = self.board.height
+
+        if self.__needs_full_refresh():
+            self.moves.clear()
+            for i in range(height):
+                for j in range(width):
+                    if j < width - 1:
+                        self.__update((i, j, i, j + 1))
+                    if i < height - 1:
+                        self.__update((i, j, i + 1, j))
+        else:
+            to_check: Set[Move] = set()
+            for ci, cj in self.dirty_cells:
+                for i, j in (
+                    (ci - 2, cj),
+                    (ci - 1, cj),
+                    (ci, cj),
+                    (ci + 1, cj),
+                    (ci + 2, cj),
+                    (ci, cj - 2),
+                    (ci, cj - 1),
+                    (ci, cj + 1),
+                    (ci, cj + 2),
+                ):
+                    if not (0 <= i < height and 0 <= j < width):
+                        continue
+                    if j < width - 1:
+                        to_check.add((i, j, i, j + 1))
+                    if j > 0:
+                        to_check.add((i, j - 1, i, j))
+                    if i < height - 1:
+                        to_check.add((i, j, i + 1, j))
+                    if i > 0:
+                        to_check.add((i - 1, j, i, j))
+
+            for move in to_check:
+                self.__update(move)
+
+        self.dirty_cells.clear()
+        self.full_refresh = False
+
+    def count(self) -> int:
+        self.refresh()
+        return len(self.moves)
+
+    def any(self) -> bool:
+        # Whether there is a valid swap. When the whole board would be checked
+        # again, it is scanned only up to the first valid swap instead and the
+        # index is left to refresh later.
+        if not self.__needs_full_refresh():
+            self.refresh()
+            return len(self.moves) > 0
+
+        width = self.board.width
+        height = self.board.height
+        for i in range(height):
+            for j in range(width):
+                if j < width - 1 and self.is_valid(i, j, i, j + 1):
+                    return True
+                if i < height - 1 and self.is_valid(i, j, i + 1, j):
+                    return True
+
+        # Every swap was checked and none is valid
+        self.moves.clear()
+        self.dirty_cells.clear()
+        self.full_refresh = False
+        return False
@@ -0,0 +1,245 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class NumpyBoardCore, a BoardCore that keeps its
+cells in NumPy arrays and resolves matches, gravity and move counting with
+whole-array operations.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.core.BoardCore import BoardCore, Cell, EMPTY
+from src.core.MoveIndex import Move
+
+# Value around the padded color grid. It never equals a tile color.
+PAD = 254
+
+
+class NumpyBoardCore(BoardCore):
+    def new_layer(self) -> np.ndarray:
+        return np.zeros(self.width * self.height, dtype=np.uint8)
+
+    def color(self, i: int, j: int) -> int:
+        return int(self.colors[i * self.width + j])
+
+    def variety(self, i: int, j: int) -> int:
+        return int(self.varieties[i * self.width + j])
+
+    def power_up(self, i: int, j: int) -> int:
+        return int(self.power_ups[i * self.width + j])
+
+    # Cells are found with whole-array comparisons instead of an index
+    def rebuild_index(self) -> None:
+        self.color_index = []
+        self.power_up_index = []
+
+    def index_cell(self, k: int) -> None:
+        pass
+
+    def unindex_cell(self, k: int) -> None:
+        pass
+
+    def cells_of_color(self, color: int) -> List[Cell]:
+        rows, cols = np.nonzero(self.grid(self.colors) == color)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def power_up_cells(self) -> List[Cell]:
+        rows, cols = np.nonzero(self.grid(self.power_ups) > 0)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def color_counts(self) -> List[int]:
+        return np.bincount(
+            self.colors[self.colors != EMPTY], minlength=self.num_colors
+        ).tolist()
+
+    def grid(self, layer: np.ndarray) -> np.ndarray:
+        return layer.reshape(self.height, self.width)
+
+    def run_masks(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Cells that belong to horizontal and vertical runs of 3 or more
+        grid = self.grid(self.colors)
+        filled = grid != EMPTY
+
+        h_eq = (grid[:, :-1] == grid[:, 1:]) & filled[:, :-1]
+        h_start = h_eq[:, :-1] & h_eq[:, 1:]
+        h_run = np.zeros(grid.shape, dtype=bool)
+        h_run[:, :-2] |= h_start
+        h_run[:, 1:-1] |= h_start
+        h_run[:, 2:] |= h_start
+
+        v_eq = (grid[:-1, :] == grid[1:, :]) & filled[:-1, :]
+        v_start = v_eq[:-1, :] & v_eq[1:, :]
+        v_run = np.zeros(grid.shape, dtype=bool)
+        v_run[:-2, :] |= v_start
+        v_run[1:-1, :] |= v_start
+        v_run[2:, :] |= v_start
+
+        return h_run, v_run
+
+    def has_match(self) -> bool:
+        h_run, v_run = self.run_masks()
+        return bool(h_run.any() or v_run.any())
+
+    def calculate_matches_for(
+        self, new_cells: List[Cell], last_moved_i: int = -1, last_moved_j: int = -1
+    ) -> Optional[List[List[Cell]]]:
+        h_run, v_run = self.run_masks()
+        grid = self.grid(self.colors)
+
+        # Two neighbors are in the same match when both belong to the same
+        # run, that is, when they share the color and the run direction.
+        h_link = (h_run[:, :-1] & h_run[:, 1:] & (grid[:, :-1] == grid[:, 1:])).tolist()
+        v_link = (v_run[:-1, :] & v_run[1:, :] & (grid[:-1, :] == grid[1:, :])).tolist()
+        in_run = (h_run | v_run).tolist()
+
+        self.matches = []
+        visited = set()
+
+        for cell in new_cells:
+            i, j = cell
+            if cell in visited or not in_run[i][j]:
+                continue
+
+            visited.add(cell)
+            match = [cell]
+            for i, j in match:
+                neighbors = []
+                if j > 0 and h_link[i][j - 1]:
+                    neighbors.append((i, j - 1))
+                if j < self.width - 1 and h_link[i][j]:
+                    neighbors.append((i, j + 1))
+                if i > 0 and v_link[i - 1][j]:
+                    neighbors.append((i - 1, j))
+                if i < self.height - 1 and v_link[i][j]:
+                    neighbors.append((i + 1, j))
+
+                for neighbor in neighbors:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        match.append(neighbor)
+
+            self.matches.append(match)
+
+        self.create_match_power_up(last_moved_i, last_moved_j)
+
+        return self.matches if len(self.matches) > 0 else None
+
+    def get_falling_tiles(self) -> Tuple[List[Tuple[int, int, int]], List[Cell]]:
+        layers = [self.grid(self.colors), self.grid(self.varieties), self.grid(self.power_ups)]
+        empty = layers[0] == EMPTY
+
+        # Every tile falls as many rows as empty cells there are below it
+        empties_below = np.cumsum(empty[::-1], axis=0)[::-1] - empty
+        rows = np.arange(self.height)[:, None]
+        target = rows + empties_below
+        moving = ~empty & (empties_below > 0)
+
+        # Moves are reported column by column from the bottom up
+        order_j, order_i = np.nonzero(moving.T[:, ::-1])
+        from_i = self.height - 1 - order_i
+        to_i = target[from_i, order_j]
+        moves = list(zip(from_i.tolist(), to_i.tolist(), order_j.tolist()))
+
+        src_i, src_j = np.nonzero(~empty)
+        dst_i = target[src_i, src_j]
+        for layer, fill in zip(layers, (EMPTY, 0, 0)):
+            values = layer[src_i, src_j]
+            layer.fill(fill)
+            layer[dst_i, src_j] = values
+
+        # create a replacement tiles at the top of the screen
+        holes = empty.sum(axis=0)
+        new_j, new_i = np.nonzero((rows < holes).T)
+        new_cells = list(zip(new_i.tolist(), new_j.tolist()))
+        new_values = [
+            (
+                self.rng.randint(0, self.num_colors - 1),
+                self.rng.randint(0, self.num_varieties - 1),
+            )
+            for _ in new_cells
+        ]
+        if new_values:
+            colors, varieties = zip(*new_values)
+            layers[0][new_i, new_j] = colors
+            layers[1][new_i, new_j] = varieties
+
+        return moves, new_cells
+
+    def valid_swaps(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Swaps that make a match with one of the swapped tiles, as masks of
+        # the swaps (i, j) <-> (i, j + 1) and (i, j) <-> (i + 1, j)
+        grid = self.grid(self.colors)
+        h, w = grid.shape
+        padded = np.full((h + 4, w + 4), PAD, dtype=np.uint8)
+        padded[2:-2, 2:-2] = grid
+
+        def at(di: int, dj: int, rows: int, cols: int) -> np.ndarray:
+            # at(di, dj)[i, j] is the color of cell (i + di, j + dj)
+            return padded[2 + di : 2 + di + rows, 2 + dj : 2 + dj + cols]
+
+        def completes_run(color, di, dj, rows, cols, vertical) -> np.ndarray:
+            # Whether color placed at (i + di, j + dj) completes a run of 3
+            # along the axis perpendicular to the swap.
+            ui, uj = (1, 0) if vertical else (0, 1)
+            before = at(di - ui, dj - uj, rows, cols) == color
+            after = at(di + ui, dj + uj, rows, cols) == color
+            return (
+                (before & (at(di - 2 * ui, dj - 2 * uj, rows, cols) == color))
+                | (after & (at(di + 2 * ui, dj + 2 * uj, rows, cols) == color))
+                | (before & after)
+            )
+
+        # Horizontal swaps (i, j) <-> (i, j + 1). An empty cell, as a cascade
+        # leaves them, cannot be swapped.
+        rows, cols = h, w - 1
+        a, b = at(0, 0, rows, cols), at(0, 1, rows, cols)
+        h_swaps = (a != b) & (a != EMPTY) & (b != EMPTY) & (
+            ((at(0, -1, rows, cols) == b) & (at(0, -2, rows, cols) == b))
+            | completes_run(b, 0, 0, rows, cols, True)
+            | ((at(0, 2, rows, cols) == a) & (at(0, 3, rows, cols) == a))
+            | completes_run(a, 0, 1, rows, cols, True)
+        )
+
+        # Vertical swaps (i, j) <-> (i + 1, j)
+        rows, cols = h - 1, w
+        a, b = at(0, 0, rows, cols), at(1, 0, rows, cols)
+        v_swaps = (a != b) & (a != EMPTY) & (b != EMPTY) & (
+            ((at(-1, 0, rows, cols) == b) & (at(-2, 0, rows, cols) == b))
+            | completes_run(b, 0, 0, rows, cols, False)
+            | ((at(2, 0, rows, cols) == a) & (at(3, 0, rows, cols) == a))
+            | completes_run(a, 1, 0, rows, cols, False)
+        )
+
+        return h_swaps, v_swaps
+
+    def count_possible_matches(self) -> int:
+        h_swaps, v_swaps = self.valid_swaps()
+        match_count = int(h_swaps.sum() + v_swaps.sum())
+
+        # A recreated board has at least min_moves valid moves from 4 colors on
+        while match_count == 0:
+            self.recreate_board()
+            h_swaps, v_swaps = self.valid_swaps()
+            match_count = int(h_swaps.sum() + v_swaps.sum())
+
+        return match_count
+
+    def has_any_move(self) -> bool:
+        h_swaps, v_swaps = self.valid_swaps()
+        return bool(h_swaps.any() or v_swaps.any())
+
+    def valid_moves(self) -> List[Move]:
+        # The move index is not told about the tiles moved by
+        # get_falling_tiles, so the moves come from the masks
+        h_swaps, v_swaps = self.valid_swaps()
+        h_rows, h_cols = np.nonzero(h_swaps)
+        v_rows, v_cols = np.nonzero(v_swaps)
+        moves = [(i, j, i, j + 1) for i, j in zip(h_rows.tolist(), h_cols.tolist())]
+        moves += [(i, j, i + 1, j) for i, j in zip(v_rows.tolist(), v_cols.tolist())]
+        return sorted(moves)
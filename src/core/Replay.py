@@ -0,0 +1,192 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Replay, which records the seed of every board
+of a session and the moves played on it in a compact binary format, and plays
+them back on headless boards.
+
+The format is a header followed by the events, all little-endian:
+
+    header:   4s magic "M3RP", B version, H width, H height, B colors,
+              B varieties
+    event:    I milliseconds since the start of the session, B kind
+    board:    Q seed of the new board
+    swap:     H i1, H j1, H i2, H j2 (the tile at (i1, j1) is moved)
+    power-up: H i, H j
+
+Version 1 replays, with a B for every size and cell, can still be read.
+"""
+
+from typing import Iterator, List, Optional, Tuple, Type
+
+import struct
+import time
+from pathlib import Path
+
+from src.core.BoardCore import BoardCore
+from src.core.Solver import play_move, play_power_up
+
+MAGIC = b"M3RP"
+VERSION = 2
+
+BOARD = 0
+SWAP = 1
+POWER_UP = 2
+
+# Header and payloads of every version
+HEADERS = {
+    1: struct.Struct("<4sBBBBB"),
+    2: struct.Struct("<4sBHHBB"),
+}
+EVENT = struct.Struct("<IB")
+PAYLOADS = {
+    1: {
+        BOARD: struct.Struct("<Q"),
+        SWAP: struct.Struct("<BBBB"),
+        POWER_UP: struct.Struct("<BB"),
+    },
+    2: {
+        BOARD: struct.Struct("<Q"),
+        SWAP: struct.Struct("<HHHH"),
+        POWER_UP: struct.Struct("<HH"),
+    },
+}
+
+MAX_SIZE = 0xFFFF
+MAX_COUNT = 0xFF
+
+# (milliseconds, kind, values)
+Event = Tuple[int, int, Tuple[int, ...]]
+
+
+class Replay:
+    def __init__(
+        self, width: int, height: int, num_colors: int, num_varieties: int
+    ) -> None:
+        if not (0 < width <= MAX_SIZE and 0 < height <= MAX_SIZE):
+            raise ValueError(f"a replay board is at most {MAX_SIZE}x{MAX_SIZE}")
+        if not (0 < num_colors <= MAX_COUNT and 0 < num_varieties <= MAX_COUNT):
+            raise ValueError(f"a replay has at most {MAX_COUNT} colors and varieties")
+
+        self.width = width
+        self.height = height
+        self.num_colors = num_colors
+        self.num_varieties = num_varieties
+        self.events: List[Event] = []
+        self.start = time.perf_counter()
+
+    def __add(
+        self, kind: int, values: Tuple[int, ...], time_ms: Optional[int]
+    ) -> None:
+        if time_ms is None:
+            time_ms = int((time.perf_counter() - self.start) * 1000)
+        self.events.append((time_ms, kind, values))
+
+    def add_board(self, seed: int, time_ms: Optional[int] = None) -> None:
+        self.__add(BOARD, (seed,), time_ms)
+
+    def add_swap(
+        self, i1: int, j1: int, i2: int, j2: int, time_ms: Optional[int] = None
+    ) -> None:
+        self.__add(SWAP, (i1, j1, i2, j2), time_ms)
+
+    def add_power_up(self, i: int, j: int, time_ms: Optional[int] = None) -> None:
+        self.__add(POWER_UP, (i, j), time_ms)
+
+    def to_bytes(self) -> bytes:
+        chunks = [
+            HEADERS[VERSION].pack(
+                MAGIC,
+                VERSION,
+                self.width,
+                self.height,
+                self.num_colors,
+                self.num_varieties,
+            )
+        ]
+        for time_ms, kind, values in self.events:
+            chunks.append(EVENT.pack(time_ms, kind))
+            chunks.append(PAYLOADS[VERSION][kind].pack(*values))
+        return b"".join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        magic, version = data[:4], data[4] if len(data) > 4 else None
+        if magic != MAGIC:
+            raise ValueError("not a replay")
+        if version not in HEADERS:
+            raise ValueError(f"unsupported replay version {version}")
+
+        # A truncated file ends in the middle of the header or of an event
+        try:
+            _, _, *dimensions = HEADERS[version].unpack_from(data)
+            payloads = PAYLOADS[version]
+            replay = cls(*dimensions)
+            offset = HEADERS[version].size
+
+            while offset < len(data):
+                time_ms, kind = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                if kind not in payloads:
+                    raise ValueError(f"unknown replay event {kind}")
+                values = payloads[kind].unpack_from(data, offset)
+                offset += payloads[kind].size
+                if kind != BOARD and not replay.__on_board(values):
+                    raise ValueError("replay event out of the board")
+                replay.events.append((time_ms, kind, values))
+        except struct.error as error:
+            raise ValueError(f"truncated replay: {error}") from error
+
+        return replay
+
+    def __on_board(self, values: Tuple[int, ...]) -> bool:
+        # Whether the cells (i, j) of a swap or a power-up are in the board
+        return all(
+            i < self.height and j < self.width
+            for i, j in zip(values[::2], values[1::2])
+        )
+
+    def save(self, path: Path) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Path) -> "Replay":
+        return cls.from_bytes(Path(path).read_bytes())
+
+    def play(
+        self, backend: Type[BoardCore] = BoardCore
+    ) -> Iterator[Tuple[Event, BoardCore, int]]:
+        # Replays the events as fast as possible, yielding every event with
+        # the board after it and the points it scored. The moves are resolved
+        # as in PlayState, which counts the moves left after every cascade.
+        core: Optional[BoardCore] = None
+
+        for event in self.events:
+            _, kind, values = event
+            points = 0
+
+            if kind == BOARD:
+                core = backend(
+                    self.width,
+                    self.height,
+                    self.num_colors,
+                    self.num_varieties,
+                    seed=values[0],
+                )
+                core.count_possible_matches()
+            elif core is None:
+                raise ValueError("replay event before the first board")
+            elif kind == SWAP:
+                points = play_move(core, values)
+                # A swap without matches is reversed and changes nothing
+                if points > 0:
+                    core.count_possible_matches()
+            else:
+                points = play_power_up(core, *values)
+                core.count_possible_matches()
+
+            yield event, core, points
@@ -0,0 +1,308 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the classes Session, SessionServer and SessionClient.
+The server hosts many independent headless games in one asyncio process,
+validates every swap and power-up click with the rules of PlayState and
+answers with the diffs of the board and the score, so the scores of the
+games can be trusted. SessionClient is a client of the same protocol.
+
+Every request gets a response, in order, all little-endian:
+
+    request:  B command, then its payload
+    new:      (no payload)
+    swap:     I session, H i1, H j1, H i2, H j2 (the tile at (i1, j1) is moved)
+    power-up: I session, H i, H j
+    close:    I session
+    response: B status, I session, I score, I payload size, then the payload
+
+The payload of a new session is the snapshot of its board (BoardCore.to_bytes)
+and that of an accepted swap or power-up is the list of its diffs, each one as
+I size followed by BoardDiff.to_bytes: the swap or the tiles cleared by the
+power-up, every step of the cascade and, when the board ran out of moves, the
+new board as a diff that removes and creates every tile.
+"""
+
+from typing import Deque, Dict, List, Optional, Tuple, Type
+
+import asyncio
+import random
+import struct
+from collections import deque
+
+from src.core.BitboardBoardCore import BitboardBoardCore
+from src.core.BoardCore import BoardCore, Cell
+from src.core.BoardDiff import BoardDiff
+from src.core.Solver import POINTS_PER_TILE, cascade_points
+
+NEW = 0
+SWAP = 1
+POWER_UP = 2
+CLOSE = 3
+
+OK = 0
+REJECTED = 1  # not a valid move
+UNKNOWN_SESSION = 2
+FULL = 3  # no room for more sessions
+
+REQUESTS = {
+    NEW: struct.Struct("<"),
+    SWAP: struct.Struct("<IHHHH"),
+    POWER_UP: struct.Struct("<IHH"),
+    CLOSE: struct.Struct("<I"),
+}
+RESPONSE = struct.Struct("<BIII")
+DIFF_SIZE = struct.Struct("<I")
+
+# (status, session, score, payload)
+Response = Tuple[int, int, int, bytes]
+
+
+def pack_diffs(diffs: List[BoardDiff]) -> bytes:
+    chunks = []
+    for diff in diffs:
+        data = diff.to_bytes()
+        chunks.append(DIFF_SIZE.pack(len(data)))
+        chunks.append(data)
+    return b"".join(chunks)
+
+
+def unpack_diffs(payload: bytes) -> List[BoardDiff]:
+    diffs = []
+    offset = 0
+    while offset < len(payload):
+        (size,) = DIFF_SIZE.unpack_from(payload, offset)
+        offset += DIFF_SIZE.size
+        diffs.append(BoardDiff.from_bytes(payload[offset : offset + size]))
+        offset += size
+    return diffs
+
+
+class Session:
+    def __init__(self, core: BoardCore) -> None:
+        self.core = core
+        self.score = 0
+        self.core.count_possible_matches()
+
+    def __inside(self, i: int, j: int) -> bool:
+        return 0 <= i < self.core.height and 0 <= j < self.core.width
+
+    def swap(self, i1: int, j1: int, i2: int, j2: int) -> Optional[List[BoardDiff]]:
+        # As in PlayState, the tiles must be neighbors and the swap must make
+        # a match; the moved tile is the one at (i1, j1), which cannot be a
+        # power-up as clicking one activates it
+        di = abs(i2 - i1)
+        dj = abs(j2 - j1)
+        if not (self.__inside(i1, j1) and self.__inside(i2, j2)):
+            return None
+        if not (di <= 1 and dj <= 1 and di != dj):
+            return None
+        if self.core.power_up(i1, j1) > 0:
+            return None
+
+        self.core.swap(i1, j1, i2, j2)
+        steps = self.core.resolve_cascade([(i1, j1), (i2, j2)], i2, j2)
+
+        if len(steps) == 0:
+            self.core.swap(i1, j1, i2, j2)
+            return None
+
+        self.score += cascade_points(steps)
+        diffs = [BoardDiff([], [(i1, j1, i2, j2), (i2, j2, i1, j1)], [], [])]
+        return diffs + [step.diff() for step in steps] + self.__settle()
+
+    def activate_power_up(self, i: int, j: int) -> Optional[List[BoardDiff]]:
+        if not self.__inside(i, j) or self.core.power_up(i, j) == 0:
+            return None
+
+        cells = self.core.activate_power_up(i, j) + [(i, j)]
+        self.core.remove_cells(cells)
+        steps = self.core.resolve_cascade([])
+        self.score += len(cells) * POINTS_PER_TILE + cascade_points(steps)
+        diffs = [BoardDiff(cells, [], [], [])]
+        return diffs + [step.diff() for step in steps] + self.__settle()
+
+    def __settle(self) -> List[BoardDiff]:
+        # A board without moves is recreated, as PlayState does after every
+        # cascade
+        reshuffle_count = self.core.reshuffle_count
+        self.core.count_possible_matches()
+
+        if self.core.reshuffle_count == reshuffle_count:
+            return []
+
+        cells: List[Cell] = [
+            (i, j) for i in range(self.core.height) for j in range(self.core.width)
+        ]
+        created = [
+            (i, j, self.core.color(i, j), self.core.variety(i, j)) for i, j in cells
+        ]
+        return [BoardDiff(cells, [], created, [])]
+
+
+class SessionServer:
+    def __init__(
+        self,
+        width: int = 8,
+        height: int = 8,
+        num_colors: int = 18,
+        num_varieties: int = 6,
+        backend: Type[BoardCore] = BitboardBoardCore,
+        max_sessions: int = 100000,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.num_colors = num_colors
+        self.num_varieties = num_varieties
+        self.backend = backend
+        self.max_sessions = max_sessions
+        # The server chooses the seed of every board
+        self.rng = random.Random(seed)
+        self.sessions: Dict[int, Session] = {}
+        self.next_session = 1
+        self.commands = 0
+
+    def new_session(self) -> Optional[int]:
+        if len(self.sessions) >= self.max_sessions:
+            return None
+
+        session = self.next_session
+        self.next_session += 1
+        self.sessions[session] = Session(
+            self.backend(
+                self.width,
+                self.height,
+                self.num_colors,
+                self.num_varieties,
+                seed=self.rng.getrandbits(64),
+            )
+        )
+        return session
+
+    def execute(self, command: int, values: Tuple[int, ...]) -> bytes:
+        self.commands += 1
+
+        if command == NEW:
+            session = self.new_session()
+            if session is None:
+                return RESPONSE.pack(FULL, 0, 0, 0)
+            data = self.sessions[session].core.to_bytes()
+            return RESPONSE.pack(OK, session, 0, len(data)) + data
+
+        session = values[0]
+        game = self.sessions.get(session)
+        if game is None:
+            return RESPONSE.pack(UNKNOWN_SESSION, session, 0, 0)
+
+        if command == CLOSE:
+            del self.sessions[session]
+            return RESPONSE.pack(OK, session, game.score, 0)
+
+        if command == SWAP:
+            diffs = game.swap(*values[1:])
+        else:
+            diffs = game.activate_power_up(*values[1:])
+
+        if diffs is None:
+            return RESPONSE.pack(REJECTED, session, game.score, 0)
+
+        data = pack_diffs(diffs)
+        return RESPONSE.pack(OK, session, game.score, len(data)) + data
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # The commands of a connection are executed in order. An unknown
+        # command ends the connection, as the rest of the stream cannot be
+        # read.
+        try:
+            while True:
+                command = (await reader.readexactly(1))[0]
+                if command not in REQUESTS:
+                    break
+                request = REQUESTS[command]
+                values = request.unpack(await reader.readexactly(request.size))
+                writer.write(self.execute(command, values))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None
+    ) -> asyncio.AbstractServer:
+        # A TCP socket on host and port (0 picks a free one), or a Unix socket
+        # on path
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+class SessionClient:
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        # Requests are pipelined; the responses come back in the same order
+        self.pending: Deque[asyncio.Future] = deque()
+        self.reader_task = asyncio.ensure_future(self.__read())
+
+    @classmethod
+    async def connect(
+        cls, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None
+    ) -> "SessionClient":
+        if path is not None:
+            return cls(*await asyncio.open_unix_connection(path))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def __read(self) -> None:
+        try:
+            while True:
+                header = await self.reader.readexactly(RESPONSE.size)
+                status, session, score, size = RESPONSE.unpack(header)
+                payload = await self.reader.readexactly(size)
+                self.pending.popleft().set_result((status, session, score, payload))
+        except (asyncio.IncompleteReadError, ConnectionError) as error:
+            while self.pending:
+                self.pending.popleft().set_exception(ConnectionError(error))
+
+    def request(self, command: int, *values: int) -> "asyncio.Future[Response]":
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.writer.write(bytes((command,)) + REQUESTS[command].pack(*values))
+        return future
+
+    async def new_session(self) -> Tuple[int, Optional[BoardCore]]:
+        # The session and a copy of its board, or (0, None) if the server is
+        # full
+        status, session, _, payload = await self.request(NEW)
+        if status != OK:
+            return 0, None
+        return session, BoardCore.from_bytes(payload)
+
+    async def swap(
+        self, session: int, i1: int, j1: int, i2: int, j2: int
+    ) -> Tuple[int, int, List[BoardDiff]]:
+        status, _, score, payload = await self.request(SWAP, session, i1, j1, i2, j2)
+        return status, score, unpack_diffs(payload)
+
+    async def power_up(
+        self, session: int, i: int, j: int
+    ) -> Tuple[int, int, List[BoardDiff]]:
+        status, _, score, payload = await self.request(POWER_UP, session, i, j)
+        return status, score, unpack_diffs(payload)
+
+    async def close_session(self, session: int) -> Tuple[int, int]:
+        status, _, score, _ = await self.request(CLOSE, session)
+        return status, score
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.reader_task
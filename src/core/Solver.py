@@ -0,0 +1,185 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Solver, which finds the best swap of a board by
+simulating the cascade of every valid swap a few moves ahead. Power-up clicks
+are not searched: the solver only suggests and plays swaps.
+"""
+
+from typing import List, Optional, Tuple
+
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+
+from src.core.CascadeStep import CascadeStep
+from src.core.MoveIndex import Move
+
+# Points per removed tile, as in PlayState
+POINTS_PER_TILE = 50
+
+
+def valid_moves(core) -> List[Move]:
+    # The swaps the game accepts: a power-up cannot be the moved tile (i1, j1),
+    # as it is activated when clicked, so those swaps are played the other
+    # way around and the swaps of two power-ups are left out
+    moves = []
+    for i1, j1, i2, j2 in core.valid_moves():
+        if core.power_up(i1, j1) == 0:
+            moves.append((i1, j1, i2, j2))
+        elif core.power_up(i2, j2) == 0:
+            moves.append((i2, j2, i1, j1))
+    return moves
+
+
+def cascade_points(steps) -> int:
+    return sum(
+        len(match) * POINTS_PER_TILE for step in steps for match in step.matches
+    )
+
+
+def play_move(core, move: Move) -> int:
+    # Applies a swap and its whole cascade, returning the points it scores
+    i1, j1, i2, j2 = move
+    core.swap(i1, j1, i2, j2)
+    steps = core.resolve_cascade([(i1, j1), (i2, j2)], i2, j2)
+
+    if len(steps) == 0:
+        core.swap(i1, j1, i2, j2)
+
+    return cascade_points(steps)
+
+
+def resolve_power_up(core, i: int, j: int) -> Tuple[int, List[CascadeStep]]:
+    # Activates a power-up and resolves the cascade, as PlayState does,
+    # returning the tiles it cleared and the steps of the cascade
+    cells = core.activate_power_up(i, j) + [(i, j)]
+    core.remove_cells(cells)
+    return len(cells), core.resolve_cascade([])
+
+
+def play_power_up(core, i: int, j: int) -> int:
+    cleared, steps = resolve_power_up(core, i, j)
+    return cleared * POINTS_PER_TILE + cascade_points(steps)
+
+
+def search(core, depth: int, deadline: float = float("inf")) -> int:
+    # Best points reachable from this board in depth moves
+    if depth <= 0:
+        return 0
+
+    best = 0
+    for move in valid_moves(core):
+        if time.perf_counter() >= deadline:
+            raise TimeoutError("search deadline reached")
+        board = core.clone()
+        points = play_move(board, move)
+        best = max(best, points + search(board, depth - 1, deadline))
+
+    return best
+
+
+def evaluate_move(
+    core, move: Move, depth: int, seed: int, deadline: float = float("inf")
+) -> int:
+    # New tiles are random, so every evaluation draws them from the same seed
+    # to compare the moves on equal terms
+    if time.perf_counter() >= deadline:
+        raise TimeoutError("search deadline reached")
+    board = core.clone()
+    board.rng.seed(seed)
+    return play_move(board, move) + search(board, depth - 1, deadline)
+
+
+def evaluate_power_up(
+    core, i: int, j: int, depth: int, seed: int, deadline: float = float("inf")
+) -> int:
+    # As evaluate_move, for the click on the power-up at (i, j)
+    if time.perf_counter() >= deadline:
+        raise TimeoutError("search deadline reached")
+    board = core.clone()
+    board.rng.seed(seed)
+    return play_power_up(board, i, j) + search(board, depth - 1, deadline)
+
+
+class Solver:
+    def __init__(self, workers: int = 0, seed: int = 0) -> None:
+        # With no workers the moves are evaluated in this process
+        self.workers = workers
+        self.seed = seed
+        self.executor: Optional[ProcessPoolExecutor] = None
+        # Depth of the last answer of best_move
+        self.depth_reached = 0
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def __evaluate_serial(
+        self, core, moves: List[Move], depth: int, deadline: float
+    ) -> Optional[List[int]]:
+        try:
+            return [
+                evaluate_move(core, move, depth, self.seed, deadline) for move in moves
+            ]
+        except TimeoutError:
+            return None
+
+    def __evaluate_parallel(
+        self, core, moves: List[Move], depth: int, deadline: float
+    ) -> Optional[List[int]]:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        futures = [
+            self.executor.submit(evaluate_move, core, move, depth, self.seed, deadline)
+            for move in moves
+        ]
+        timeout = None
+        if deadline != float("inf"):
+            timeout = max(0.0, deadline - time.perf_counter())
+        done, not_done = wait(futures, timeout, FIRST_EXCEPTION)
+
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            return None
+
+        try:
+            return [future.result() for future in futures]
+        except TimeoutError:
+            return None
+
+    def best_move(
+        self, core, max_depth: int = 2, time_budget: Optional[float] = None
+    ) -> Optional[Move]:
+        # Iterative deepening: every depth that finishes within the time
+        # budget replaces the answer of the previous one.
+        deadline = (
+            float("inf") if time_budget is None else time.perf_counter() + time_budget
+        )
+        moves = valid_moves(core)
+        best: Optional[Move] = None
+        self.depth_reached = 0
+
+        if len(moves) == 0:
+            return None
+
+        for depth in range(1, max_depth + 1):
+            if self.workers > 0:
+                scores = self.__evaluate_parallel(core, moves, depth, deadline)
+            else:
+                scores = self.__evaluate_serial(core, moves, depth, deadline)
+
+            if scores is None:
+                break
+
+            best = moves[max(range(len(moves)), key=lambda k: scores[k])]
+            self.depth_reached = depth
+
+        # Without time for a single depth, any valid move is a hint
+        return best if best is not None else moves[0]
@@ -0,0 +1,29 @@
+from src.core.constants import EMPTY
+from src.core.BoardDiff import BoardDiff
+from src.core.CascadeStep import CascadeStep
+from src.core.MoveIndex import MoveIndex
+from src.core.BoardCore import BoardCore
+from src.core.BitboardBoardCore import BitboardBoardCore
+
+__all__ = [
+    "EMPTY",
+    "BoardDiff",
+    "CascadeStep",
+    "MoveIndex",
+    "BoardCore",
+    "BitboardBoardCore",
+    "NumpyBoardCore",
+]
+
+
+def __getattr__(name: str):
+    # NumPy is optional and slow to import, so the NumPy backend is only
+    # loaded when it is asked for. It is None without NumPy.
+    if name == "NumpyBoardCore":
+        try:
+            from src.core.NumpyBoardCore import NumpyBoardCore
+        except ImportError:
+            NumpyBoardCore = None
+        globals()[name] = NumpyBoardCore
+        return NumpyBoardCore
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
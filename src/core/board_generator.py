@@ -0,0 +1,240 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains a function to generate the colors of a board without
+matches and with a minimum number of valid moves: the moves are planted first
+and the other cells are filled with colors that complete no run.
+"""
+
+from typing import List, Optional, Tuple
+
+import random
+
+Cell = Tuple[int, int]
+
+
+def make_templates() -> List[Tuple[Tuple[Cell, ...], Cell, int, int]]:
+    # Every way to plant a move: two tiles in a line, the free cell at one end
+    # of the line and a third tile next to that cell, across the line or
+    # beyond it. Swapping the third tile into the free cell completes a run of
+    # 3. Each template is (tiles, free cell, rows, columns), with offsets
+    # from the top left corner of its rows x columns box.
+    templates = []
+    for di, dj in ((0, 1), (1, 0)):
+        # The free cell after the line or before it, and the way out of it
+        for end_i, end_j, out_i, out_j in (
+            (2 * di, 2 * dj, di, dj),
+            (-di, -dj, -di, -dj),
+        ):
+            for ti, tj in (
+                (end_i + dj, end_j + di),
+                (end_i - dj, end_j - di),
+                (end_i + out_i, end_j + out_j),
+            ):
+                cells = [(0, 0), (di, dj), (ti, tj), (end_i, end_j)]
+                top = min(i for i, _ in cells)
+                left = min(j for _, j in cells)
+                cells = [(i - top, j - left) for i, j in cells]
+                templates.append(
+                    (
+                        tuple(cells[:3]),
+                        cells[3],
+                        max(i for i, _ in cells) + 1,
+                        max(j for _, j in cells) + 1,
+                    )
+                )
+    return templates
+
+
+MOVE_TEMPLATES = make_templates()
+
+MIN_COLORS_TO_PLANT = 4
+
+# Random places tried for every planted move, and boards tried before giving
+# up. Planting fails only when the board is nearly full of planted moves.
+PLANT_ATTEMPTS = 16
+BOARD_ATTEMPTS = 32
+
+
+def completes_run(colors: List[int], width: int, height: int, i: int, j: int) -> bool:
+    # Whether the tile at (i, j) is in a run of 3 or more; empty cells are -1
+    color = colors[i * width + j]
+
+    count = 1
+    col = j - 1
+    while col >= 0 and colors[i * width + col] == color:
+        count += 1
+        col -= 1
+    col = j + 1
+    while col < width and colors[i * width + col] == color:
+        count += 1
+        col += 1
+    if count >= 3:
+        return True
+
+    count = 1
+    row = i - 1
+    while row >= 0 and colors[row * width + j] == color:
+        count += 1
+        row -= 1
+    row = i + 1
+    while row < height and colors[row * width + j] == color:
+        count += 1
+        row += 1
+    return count >= 3
+
+
+def plant_moves(
+    colors: List[int],
+    width: int,
+    height: int,
+    num_colors: int,
+    min_moves: int,
+    rng: random.Random,
+) -> int:
+    # Plants up to min_moves moves at random places, returning how many. The
+    # boxes of the moves may touch but their cells never overlap, so every
+    # move is a different swap, and a color is only used where it does not
+    # complete a run with the moves planted before.
+    reserved = bytearray(width * height)
+    planted = 0
+
+    for _ in range(PLANT_ATTEMPTS * min_moves):
+        if planted == min_moves:
+            break
+
+        tiles, free, rows, columns = rng.choice(MOVE_TEMPLATES)
+        if rows > height or columns > width:
+            continue
+
+        top = rng.randint(0, height - rows)
+        left = rng.randint(0, width - columns)
+        cells = [(top + i, left + j) for i, j in tiles]
+        ks = [i * width + j for i, j in cells]
+        free_k = (top + free[0]) * width + left + free[1]
+        if reserved[free_k] or any(reserved[k] for k in ks):
+            continue
+
+        for color in rng.sample(range(num_colors), num_colors):
+            for k in ks:
+                colors[k] = color
+            if not any(completes_run(colors, width, height, i, j) for i, j in cells):
+                break
+        else:
+            for k in ks:
+                colors[k] = -1
+            continue
+
+        for k in ks + [free_k]:
+            reserved[k] = 1
+        planted += 1
+
+    return planted
+
+
+def fill(
+    colors: List[int], width: int, height: int, num_colors: int, rng: random.Random
+) -> bool:
+    # Fills the empty cells excluding every color that would complete a run
+    # with the cells already assigned. Next to planted moves every color can
+    # be excluded with few colors, and then the board is given up.
+    def color_at(i: int, j: int) -> int:
+        if 0 <= i < height and 0 <= j < width:
+            return colors[i * width + j]
+        return -1
+
+    for i in range(height):
+        for j in range(width):
+            k = i * width + j
+            if colors[k] >= 0:
+                continue
+
+            excluded = set()
+            for (i1, j1), (i2, j2) in (
+                ((i, j - 1), (i, j - 2)),
+                ((i, j + 1), (i, j + 2)),
+                ((i, j - 1), (i, j + 1)),
+                ((i - 1, j), (i - 2, j)),
+                ((i + 1, j), (i + 2, j)),
+                ((i - 1, j), (i + 1, j)),
+            ):
+                color = color_at(i1, j1)
+                if color >= 0 and color == color_at(i2, j2):
+                    excluded.add(color)
+
+            if len(excluded) >= num_colors:
+                return False
+
+            # Pick uniformly among the allowed colors without retrying
+            color = rng.randint(0, num_colors - 1 - len(excluded))
+            for c in sorted(excluded):
+                if c <= color:
+                    color += 1
+            colors[k] = color
+
+    return True
+
+
+def count_moves(colors: List[int], width: int, height: int, limit: int) -> int:
+    # Valid swaps of a full board, counted up to limit
+    count = 0
+    for i in range(height):
+        for j in range(width):
+            for i2, j2 in ((i, j + 1), (i + 1, j)):
+                if i2 >= height or j2 >= width:
+                    continue
+                k1 = i * width + j
+                k2 = i2 * width + j2
+                if colors[k1] == colors[k2]:
+                    continue
+                colors[k1], colors[k2] = colors[k2], colors[k1]
+                valid = completes_run(colors, width, height, i, j) or completes_run(
+                    colors, width, height, i2, j2
+                )
+                colors[k1], colors[k2] = colors[k2], colors[k1]
+                count += valid
+                if count >= limit:
+                    return count
+    return count
+
+
+def generate_tiles(
+    width: int,
+    height: int,
+    num_colors: int,
+    num_varieties: int,
+    min_moves: int = 1,
+    rng: Optional[random.Random] = None,
+) -> Tuple[List[int], List[int]]:
+    if min_moves > 0 and num_colors < MIN_COLORS_TO_PLANT:
+        raise ValueError(
+            f"at least {MIN_COLORS_TO_PLANT} colors are needed to plant moves"
+        )
+
+    if rng is None:
+        rng = random.Random()
+
+    # A board is almost always done on the first attempt. The moves are
+    # counted only when fewer than min_moves could be planted, as the filled
+    # cells may add the rest.
+    for _ in range(BOARD_ATTEMPTS):
+        colors = [-1] * (width * height)
+        planted = plant_moves(colors, width, height, num_colors, min_moves, rng)
+        if not fill(colors, width, height, num_colors, rng):
+            continue
+        if planted >= min_moves or (
+            count_moves(colors, width, height, min_moves) >= min_moves
+        ):
+            break
+    else:
+        raise ValueError(
+            f"could not generate a {width}x{height} board with {min_moves} moves"
+        )
+
+    varieties = [rng.randint(0, num_varieties - 1) for _ in range(width * height)]
+
+    return colors, varieties
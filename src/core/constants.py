@@ -0,0 +1,12 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the constants shared by the headless board engine.
+"""
+
+# Color value of a cell without tile.
+EMPTY = 255
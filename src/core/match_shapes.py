@@ -0,0 +1,60 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the shapes of a match and the power-up each one creates.
+A match is a group of runs of 3 or more tiles of the same color joined by the
+cells they share.
+"""
+
+from typing import List, Set, Tuple
+
+Cell = Tuple[int, int]
+
+LINE_3 = 0
+LINE_4 = 1
+LINE_5 = 2  # 5 or more in a line
+L_SHAPE = 3  # two runs joined by an end of both
+T_SHAPE = 4  # two runs joined by the middle of one of them
+
+SHAPE_NAMES = ("line-3", "line-4", "line-5+", "L", "T")
+
+# Power-up left by the moved tile of every shape (0: none, 1: cross, 2: circle)
+POWER_UPS = (0, 1, 2, 2, 2)
+
+
+def runs(cells: Set[Cell], di: int, dj: int) -> List[List[Cell]]:
+    # Lines of 3 or more cells of the set along the direction (di, dj)
+    result = []
+    for i, j in cells:
+        if (i - di, j - dj) in cells:
+            continue
+        run = [(i, j)]
+        while (run[-1][0] + di, run[-1][1] + dj) in cells:
+            run.append((run[-1][0] + di, run[-1][1] + dj))
+        if len(run) >= 3:
+            result.append(run)
+    return result
+
+
+def classify(match: List[Cell]) -> int:
+    cells = set(match)
+    h_runs = runs(cells, 0, 1)
+    v_runs = runs(cells, 1, 0)
+
+    if len(h_runs) + len(v_runs) == 1:
+        return min(LINE_5, LINE_3 + len(match) - 3)
+
+    # The runs are joined by the cells in both directions; a match is an L
+    # when all of them are at an end of both runs
+    h_ends = {cell for run in h_runs for cell in (run[0], run[-1])}
+    v_ends = {cell for run in v_runs for cell in (run[0], run[-1])}
+    h_cells = {cell for run in h_runs for cell in run}
+    v_cells = {cell for run in v_runs for cell in run}
+
+    if all(cell in h_ends and cell in v_ends for cell in h_cells & v_cells):
+        return L_SHAPE
+    return T_SHAPE
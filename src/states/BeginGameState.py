@@ -10,20 +10,34 @@ This file contains the class BeginGameState.
 
 from typing import Dict, Any
 
+import random
+
 import pygame
 
 from gale.state import BaseState
-from gale.text import render_text
 from gale.timer import Timer
 
 import settings
 from src.Board import Board
+from src.core.Replay import Replay
+from src.TextCache import TextCache
 
 
 class BeginGameState(BaseState):
     def enter(self, **enter_params: Dict[str, Any]) -> None:
         self.transition_alpha = 255
-        self.board = Board(settings.VIRTUAL_WIDTH - 272, 16)
+        # The whole session is recorded, starting with the seed of each board
+        self.replay = enter_params.get("replay")
+        if self.replay is None:
+            self.replay = Replay(
+                settings.BOARD_WIDTH,
+                settings.BOARD_HEIGHT,
+                settings.NUM_COLORS,
+                settings.NUM_VARIETIES,
+            )
+        seed = random.getrandbits(64)
+        self.replay.add_board(seed)
+        self.board = Board(settings.VIRTUAL_WIDTH - 272, 16, seed=seed)
         self.level_label_y = -64
         self.level = enter_params.get("level", 1)
         self.score = enter_params.get("score", 0)
@@ -52,7 +66,11 @@ class BeginGameState(BaseState):
                         [(self, {"level_label_y": settings.VIRTUAL_HEIGHT + 30})],
                         # We are ready to play
                         on_finish=lambda: self.state_machine.change(
-                            "play", level=self.level, board=self.board, score=self.score
+                            "play",
+                            level=self.level,
+                            board=self.board,
+                            score=self.score,
+                            replay=self.replay,
                         ),
                     ),
                 ),
@@ -62,7 +80,7 @@ class BeginGameState(BaseState):
     def render(self, surface: pygame.Surface) -> None:
         self.board.render(surface)
 
-        render_text(
+        TextCache.render_text(
             surface,
             f"Level {self.level}",
             settings.FONTS["large"],
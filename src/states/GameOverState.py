@@ -8,18 +8,27 @@ alejandro.j.mujic4@gmail.com
 This file contains the class GameOverState.
 """
 
+from typing import Optional
+
+import time
+
 import pygame
 
 from gale.input_handler import InputData
 from gale.state import BaseState
-from gale.text import render_text
 
 import settings
+from src.core.Replay import Replay
+from src.TextCache import TextCache
 
 
 class GameOverState(BaseState):
-    def enter(self, score: int) -> None:
+    def enter(self, score: int, replay: Optional[Replay] = None) -> None:
         self.score = score
+
+        if replay is not None and settings.REPLAY_DIR is not None:
+            settings.REPLAY_DIR.mkdir(parents=True, exist_ok=True)
+            replay.save(settings.REPLAY_DIR / time.strftime("%Y%m%d-%H%M%S.m3r"))
         # A surface that supports alpha to draw behind the text.
         self.text_alpha_surface = pygame.Surface((424, 176), pygame.SRCALPHA)
         pygame.draw.rect(
@@ -28,7 +37,7 @@ class GameOverState(BaseState):
 
     def render(self, surface: pygame.Surface) -> None:
         surface.blit(self.text_alpha_surface, (settings.VIRTUAL_WIDTH // 2 - 212, 24))
-        render_text(
+        TextCache.render_text(
             surface,
             "GAME OVER",
             settings.FONTS["large"],
@@ -38,7 +47,7 @@ class GameOverState(BaseState):
             center=True,
             shadowed=True,
         )
-        render_text(
+        TextCache.render_text(
             surface,
             f"Your Score: {self.score}",
             settings.FONTS["medium"],
@@ -48,7 +57,7 @@ class GameOverState(BaseState):
             center=True,
             shadowed=True,
         )
-        render_text(
+        TextCache.render_text(
             surface,
             "Press Enter",
             settings.FONTS["medium"],
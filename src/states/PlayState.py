@@ -14,17 +14,28 @@ import pygame
 
 from gale.input_handler import InputData
 from gale.state import BaseState
-from gale.text import render_text
 from gale.timer import Timer
 
 import settings
+from src.core import CascadeStep
+from src.core.Solver import Solver
+from src.TextCache import TextCache
 
 
 class PlayState(BaseState):
+    # Camera steps of the arrow keys, for boards larger than the viewport
+    SCROLL_DIRECTIONS = {
+        "up": (0, -1),
+        "down": (0, 1),
+        "left": (-1, 0),
+        "right": (1, 0),
+    }
+
     def enter(self, **enter_params: Dict[str, Any]) -> None:
         self.level = enter_params["level"]
         self.board = enter_params["board"]
         self.score = enter_params["score"]
+        self.replay = enter_params["replay"]
 
         # Position in the grid which we are highlighting
         self.board_highlight_i1 = -1
@@ -49,6 +60,10 @@ class PlayState(BaseState):
 
         self.possible_matches_count = self.board.count_possible_matches()
 
+        # Tiles of the suggested swap while the hint is shown
+        self.solver = Solver()
+        self.hint = None
+
         # A surface that supports alpha to highlight a selected tile
         self.tile_alpha_surface = pygame.Surface(
             (settings.TILE_SIZE, settings.TILE_SIZE), pygame.SRCALPHA
@@ -66,6 +81,11 @@ class PlayState(BaseState):
             self.text_alpha_surface, (56, 56, 56, 234), pygame.Rect(0, 0, 212, 136)
         )
 
+        # The HUD panel with its texts, kept between frames. It spans up to
+        # the board in case a text is wider than the panel.
+        self.hud_surface = pygame.Surface((self.board.x - 16, 144), pygame.SRCALPHA)
+        self.hud_values = None
+
         def decrement_timer():
             self.timer -= 1
 
@@ -75,20 +95,28 @@ class PlayState(BaseState):
 
         Timer.every(1, decrement_timer)
 
-    def update(self, _: float) -> None:
+    def update(self, dt: float) -> None:
+        self.board.update(dt)
+
         if self.timer <= 0:
             Timer.clear()
             settings.SOUNDS["game-over"].play()
-            self.state_machine.change("game-over", score=self.score)
+            self.state_machine.change(
+                "game-over", score=self.score, replay=self.replay
+            )
 
         if self.score >= self.goal_score:
             Timer.clear()
             settings.SOUNDS["next-level"].play()
-            self.state_machine.change("begin", level=self.level + 1, score=self.score)
+            self.state_machine.change(
+                "begin", level=self.level + 1, score=self.score, replay=self.replay
+            )
 
     def render(self, surface: pygame.Surface) -> None:
         self.board.render(surface)
-        
+        origin_x, origin_y = self.board.screen_origin()
+        surface.set_clip(self.board.view_rect())
+
         # Drawing moving tile
         # I do it this way because I want to draw the moving tile on top of the other tiles.
         if self.highlighted_tile and self.dragged_tile is not None:
@@ -98,54 +126,77 @@ class PlayState(BaseState):
             self.dragged_tile.x = self.drag_offset_x
             self.dragged_tile.y = self.drag_offset_y
             
-            self.dragged_tile.render(surface, self.board.x, self.board.y)
+            self.dragged_tile.render(surface, origin_x, origin_y)
 
             self.dragged_tile.x = original_x
             self.dragged_tile.y = original_y
 
-        surface.blit(self.text_alpha_surface, (16, 16))
-        render_text(
-            surface,
+        if self.hint is not None:
+            for tile in self.hint:
+                x, y = self.board.animator.position(tile)
+                surface.blit(self.tile_alpha_surface, (origin_x + x, origin_y + y))
+
+        surface.set_clip(None)
+
+        # The HUD is redrawn only when one of its values changes
+        hud_values = (
+            self.level,
+            self.score,
+            self.goal_score,
+            self.timer,
+            self.possible_matches_count,
+        )
+        if hud_values != self.hud_values:
+            self.hud_values = hud_values
+            self.__render_hud()
+
+        surface.blit(self.hud_surface, (16, 16))
+
+    def __render_hud(self) -> None:
+        self.hud_surface.fill((0, 0, 0, 0))
+        self.hud_surface.blit(self.text_alpha_surface, (0, 0))
+        TextCache.render_text(
+            self.hud_surface,
             f"Level: {self.level}",
             settings.FONTS["medium"],
-            30,
-            24,
+            14,
+            8,
             (99, 155, 255),
             shadowed=True,
         )
-        render_text(
-            surface,
+        TextCache.render_text(
+            self.hud_surface,
             f"Score: {self.score}",
             settings.FONTS["medium"],
-            30,
-            52,
+            14,
+            36,
             (99, 155, 255),
             shadowed=True,
         )
-        render_text(
-            surface,
+        TextCache.render_text(
+            self.hud_surface,
             f"Goal: {self.goal_score}",
             settings.FONTS["medium"],
-            30,
-            80,
+            14,
+            64,
             (99, 155, 255),
             shadowed=True,
         )
-        render_text(
-            surface,
+        TextCache.render_text(
+            self.hud_surface,
             f"Timer: {self.timer}",
             settings.FONTS["medium"],
-            30,
-            108,
+            14,
+            92,
             (99, 155, 255),
             shadowed=True,
         )
-        render_text(
-            surface,
+        TextCache.render_text(
+            self.hud_surface,
             f"Possible Matches: {self.possible_matches_count}",
             settings.FONTS["small"],
-            30,
-            136,
+            14,
+            120,
             (99, 155, 255),
             shadowed=True,
         )
@@ -155,12 +206,7 @@ class PlayState(BaseState):
         pos_x = pos_x * settings.VIRTUAL_WIDTH // settings.WINDOW_WIDTH
         pos_y = pos_y * settings.VIRTUAL_HEIGHT // settings.WINDOW_HEIGHT
         
-        i = (pos_y - self.board.y) // settings.TILE_SIZE
-        j = (pos_x - self.board.x) // settings.TILE_SIZE
-        
-        if 0 <= i < settings.BOARD_HEIGHT and 0 <= j < settings.BOARD_WIDTH:
-            return (i, j)
-        return None
+        return self.board.cell_at(pos_x, pos_y)
 
     def on_input(self, input_id: str, input_data: InputData) -> None:
         if not self.active:
@@ -173,14 +219,16 @@ class PlayState(BaseState):
             if input_data.pressed and board_pos is not None:
 
                 i, j = board_pos
+                self.hint = None
 
                 # Check if the player clicked on a power-up
                 if self.board.tiles[i][j].power_up > 0 and not self.highlighted_tile:
                     self.active = False
                     power_up_tile = self.board.tiles[i][j]
+                    self.replay.add_power_up(i, j)
                     affected_tiles = self.board.activate_power_up(power_up_tile)
                     affected_tiles.append(power_up_tile)
-                    self.__remove_affected_tiles(affected_tiles)                    
+                    self.__remove_affected_tiles(affected_tiles)
                     return
 
                 if not self.highlighted_tile:
@@ -210,6 +258,12 @@ class PlayState(BaseState):
 
                     if di <= 1 and dj <= 1 and di != dj:
                         self.active = False
+                        self.replay.add_swap(
+                            self.highlighted_i1,
+                            self.highlighted_j1,
+                            self.highlighted_i2,
+                            self.highlighted_j2,
+                        )
                         tile1 = self.board.tiles[self.highlighted_i1][
                             self.highlighted_j1
                         ]
@@ -226,41 +280,17 @@ class PlayState(BaseState):
                             tile2 = self.board.tiles[self.highlighted_i2][
                                 self.highlighted_j2
                             ]
-                            (
-                                self.board.tiles[tile1.i][tile1.j],
-                                self.board.tiles[tile2.i][tile2.j],
-                            ) = (
-                                self.board.tiles[tile2.i][tile2.j],
-                                self.board.tiles[tile1.i][tile1.j],
-                            )
-                            tile1.i, tile1.j, tile2.i, tile2.j = (
-                                tile2.i,
-                                tile2.j,
-                                tile1.i,
-                                tile1.j,
-                            )
+                            self.board.swap(tile1, tile2)
 
                             def reverse():
                                 # Reverse changes
-                                (
-                                    self.board.tiles[tile1.i][tile1.j],
-                                    self.board.tiles[tile2.i][tile2.j],
-                                ) = (
-                                    self.board.tiles[tile2.i][tile2.j],
-                                    self.board.tiles[tile1.i][tile1.j],
-                                )
-                                tile1.i, tile1.j, tile2.i, tile2.j = (
-                                    tile2.i,
-                                    tile2.j,
-                                    tile1.i,
-                                    tile1.j,
-                                )
+                                self.board.swap(tile1, tile2)
                                 self.active = True
                             
-                            matches = self.board.calculate_matches_for([tile1, tile2], self.highlighted_i2, self.highlighted_j2)
+                            steps = self.board.resolve_cascade([tile1, tile2], self.highlighted_i2, self.highlighted_j2)
 
-                            if matches is None:
-                                Timer.tween(
+                            if len(steps) == 0:
+                                self.board.animator.tween(
                                     0.25,
                                     [
                                         (tile1, {"x": tile2.x, "y": tile2.y}),
@@ -269,10 +299,10 @@ class PlayState(BaseState):
                                     on_finish=reverse,
                                 )
                             else:
-                                self.__calculate_matches([tile1, tile2], self.highlighted_i2, self.highlighted_j2)
+                                self.__play_steps(steps)
 
                         # Swap tiles
-                        Timer.tween(
+                        self.board.animator.tween(
                             0.25,
                             [
                                 (tile1, {"x": tile2.x, "y": tile2.y}),
@@ -294,14 +324,34 @@ class PlayState(BaseState):
                 self.dragged_tile.draw = True
                 self.dragged_tile = None
 
+        elif input_id == "hint" and input_data.pressed and self.hint is None:
+            self.hint = self.board.find_best_swap(
+                self.solver, settings.HINT_DEPTH, settings.HINT_TIME_BUDGET
+            )
+
+            if self.hint is not None:
+                hint = self.hint
+
+                def hide_hint():
+                    if self.hint is hint:
+                        self.hint = None
+
+                Timer.after(settings.HINT_DURATION, hide_hint)
+
+        elif input_id in self.SCROLL_DIRECTIONS and not self.highlighted_tile:
+            if input_data.pressed:
+                dx, dy = self.SCROLL_DIRECTIONS[input_id]
+                self.board.scroll(dx * settings.TILE_SIZE, dy * settings.TILE_SIZE)
+
         elif input_id == "mouse_motion" and self.highlighted_tile:
             pos_x, pos_y = input_data.position
             pos_x = pos_x * settings.VIRTUAL_WIDTH // settings.WINDOW_WIDTH
             pos_y = pos_y * settings.VIRTUAL_HEIGHT // settings.WINDOW_HEIGHT
             
             # Tile center
-            origin_mouse_x = self.board.x + self.highlighted_j1 * settings.TILE_SIZE + settings.TILE_SIZE // 2
-            origin_mouse_y = self.board.y + self.highlighted_i1 * settings.TILE_SIZE + settings.TILE_SIZE // 2
+            origin_x, origin_y = self.board.screen_origin()
+            origin_mouse_x = origin_x + self.highlighted_j1 * settings.TILE_SIZE + settings.TILE_SIZE // 2
+            origin_mouse_y = origin_y + self.highlighted_i1 * settings.TILE_SIZE + settings.TILE_SIZE // 2
 
             delta_x = pos_x - origin_mouse_x
             delta_y = pos_y - origin_mouse_y
@@ -318,47 +368,38 @@ class PlayState(BaseState):
                 self.drag_offset_x = self.drag_origin_x
                 self.drag_offset_y = self.drag_origin_y + delta_y
 
-    def __calculate_matches(self, tiles: List, last_moved_i: int = -1, last_moved_j: int = -1) -> None:
-        matches = self.board.calculate_matches_for(tiles, last_moved_i, last_moved_j)
-
-        if matches is None:
+    def __play_steps(self, steps: List[CascadeStep]) -> None:
+        # The board is already resolved, the steps only animate it
+        if len(steps) == 0:
             self.possible_matches_count = self.board.count_possible_matches()
             self.active = True
             return
 
-        settings.SOUNDS["match"].stop()
-        settings.SOUNDS["match"].play()
+        diff = self.board.apply_step(steps[0])
 
-        for match in matches:
-            self.score += len(match) * 50
+        if len(diff.removed) > 0:
+            settings.SOUNDS["match"].stop()
+            settings.SOUNDS["match"].play()
 
-        self.board.remove_matches(last_moved_i, last_moved_j)
+        self.score += len(diff.removed) * 50
+        falling_tiles = self.board.tweens(diff)
 
-        falling_tiles = self.board.get_falling_tiles()
-
-        Timer.tween(
-            0.25,
-            falling_tiles,
-            on_finish=lambda: self.__calculate_matches(
-                [item[0] for item in falling_tiles]
-            ),
-        )
+        if settings.SKIP_ANIMATIONS:
+            for tile, values in falling_tiles:
+                for attr, value in values.items():
+                    setattr(tile, attr, value)
+            self.__play_steps(steps[1:])
+        else:
+            self.board.animator.tween(
+                0.25, falling_tiles, on_finish=lambda: self.__play_steps(steps[1:])
+            )
 
     def __remove_affected_tiles(self, tiles: List) -> None:
-        for tile in tiles:
-            self.board.tiles[tile.i][tile.j] = None
-                
-        self.score += len(tiles) * 50
-                
+        diff = self.board.remove_tiles(tiles)
+
+        self.score += len(diff.removed) * 50
+
         settings.SOUNDS["match"].stop()
         settings.SOUNDS["match"].play()
-                
-        falling_tiles = self.board.get_falling_tiles()
-                
-        Timer.tween(
-            0.25,
-            falling_tiles,
-            on_finish=lambda: self.__calculate_matches(
-                [item[0] for item in falling_tiles]
-            ),
-        )
\ No newline at end of file
+
+        self.__play_steps(self.board.resolve_cascade([]))
@@ -0,0 +1,174 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class ReplayState, which plays a recorded session
+back with the animations of the game.
+"""
+
+from typing import List, Optional
+
+import pygame
+
+from gale.input_handler import InputData
+from gale.state import BaseState
+from gale.timer import Timer
+
+import settings
+from src.Board import Board
+from src.core import CascadeStep
+from src.core.Replay import BOARD, SWAP, Replay
+from src.TextCache import TextCache
+
+
+class ReplayState(BaseState):
+    def enter(self, replay: Replay) -> None:
+        # Boards take their colors from the settings, so they must be the
+        # recorded ones
+        if (replay.num_colors, replay.num_varieties) != (
+            settings.NUM_COLORS,
+            settings.NUM_VARIETIES,
+        ):
+            raise ValueError("the replay was recorded with other board settings")
+
+        Timer.clear()
+        self.replay = replay
+        self.events = list(replay.events)
+        self.next_event = 0
+        # Milliseconds since the start of the session
+        self.time = 0.0
+        self.board: Optional[Board] = None
+        self.level = 0
+        self.score = 0
+        # Events wait while the previous one is animated
+        self.busy = False
+
+    def update(self, dt: float) -> None:
+        self.time += dt * 1000
+
+        if self.board is not None:
+            self.board.update(dt)
+
+        while (
+            not self.busy
+            and self.next_event < len(self.events)
+            and self.events[self.next_event][0] <= self.time
+        ):
+            _, kind, values = self.events[self.next_event]
+            self.next_event += 1
+
+            if kind == BOARD:
+                self.board = Board(
+                    settings.VIRTUAL_WIDTH - 272,
+                    16,
+                    seed=values[0],
+                    width=self.replay.width,
+                    height=self.replay.height,
+                )
+                self.board.count_possible_matches()
+                self.level += 1
+            elif kind == SWAP:
+                self.__swap(*values)
+            else:
+                self.__activate_power_up(*values)
+
+    def render(self, surface: pygame.Surface) -> None:
+        if self.board is not None:
+            self.board.render(surface)
+
+        TextCache.render_text(
+            surface,
+            f"Replay - Level {self.level}",
+            settings.FONTS["medium"],
+            16,
+            16,
+            (99, 155, 255),
+            shadowed=True,
+        )
+        TextCache.render_text(
+            surface,
+            f"Score: {self.score}",
+            settings.FONTS["medium"],
+            16,
+            44,
+            (99, 155, 255),
+            shadowed=True,
+        )
+
+        if self.next_event == len(self.events) and not self.busy:
+            TextCache.render_text(
+                surface,
+                "Press Enter",
+                settings.FONTS["medium"],
+                16,
+                72,
+                (99, 155, 255),
+                shadowed=True,
+            )
+
+    def on_input(self, input_id: str, input_data: InputData) -> None:
+        if input_id == "enter" and input_data.pressed:
+            Timer.clear()
+            self.state_machine.change("start")
+
+    def __swap(self, i1: int, j1: int, i2: int, j2: int) -> None:
+        self.busy = True
+        tile1 = self.board.tiles[i1][j1]
+        tile2 = self.board.tiles[i2][j2]
+
+        def arrive():
+            self.board.swap(tile1, tile2)
+            steps = self.board.resolve_cascade([tile1, tile2], i2, j2)
+
+            if len(steps) == 0:
+
+                def reverse():
+                    self.board.swap(tile1, tile2)
+                    self.busy = False
+
+                self.board.animator.tween(
+                    0.25,
+                    [
+                        (tile1, {"x": tile2.x, "y": tile2.y}),
+                        (tile2, {"x": tile1.x, "y": tile1.y}),
+                    ],
+                    on_finish=reverse,
+                )
+            else:
+                self.__play_steps(steps)
+
+        self.board.animator.tween(
+            0.25,
+            [
+                (tile1, {"x": tile2.x, "y": tile2.y}),
+                (tile2, {"x": tile1.x, "y": tile1.y}),
+            ],
+            on_finish=arrive,
+        )
+
+    def __activate_power_up(self, i: int, j: int) -> None:
+        self.busy = True
+        power_up_tile = self.board.tiles[i][j]
+        tiles = self.board.activate_power_up(power_up_tile)
+        tiles.append(power_up_tile)
+        diff = self.board.remove_tiles(tiles)
+        self.score += len(diff.removed) * 50
+        self.__play_steps(self.board.resolve_cascade([]))
+
+    def __play_steps(self, steps: List[CascadeStep]) -> None:
+        if len(steps) == 0:
+            self.board.count_possible_matches()
+            self.busy = False
+            return
+
+        diff = self.board.apply_step(steps[0])
+        self.score += len(diff.removed) * 50
+
+        self.board.animator.tween(
+            0.25,
+            self.board.tweens(diff),
+            on_finish=lambda: self.__play_steps(steps[1:]),
+        )
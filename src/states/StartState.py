@@ -14,10 +14,10 @@ import pygame
 
 from gale.input_handler import InputData
 from gale.state import BaseState, StateMachine
-from gale.text import render_text
 from gale.timer import Timer
 
 import settings
+from src.TextCache import TextCache
 
 
 class StartState(BaseState):
@@ -34,9 +34,6 @@ class StartState(BaseState):
     # letters of MATCH 3 and their spacing relative to the center
     LETTER_TABLE = {"M": -108, "A": -64, "T": -28, "C": 2, "H": 40, "3": 112}
 
-    # A list of frames just for display.
-    frames = []
-
     def __init__(self, state_machine: StateMachine, game) -> None:
         super().__init__(state_machine)
         self.game = game
@@ -56,28 +53,51 @@ class StartState(BaseState):
 
         self.alpha_transition = 0
 
-        # Generate the full tile list for display
-        for _ in range(settings.BOARD_WIDTH * settings.BOARD_HEIGHT):
-            color = random.randint(0, settings.NUM_COLORS - 1)
-            variety = random.randint(0, settings.NUM_VARIETIES - 1)
-            self.frames.append(settings.FRAMES["tiles"][color][variety])
-
         # A surface that supports alpha for the screen
         self.screen_alpha_surface = pygame.Surface(
             (settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT), pygame.SRCALPHA
         )
 
+        # keep the background and tiles a little darker than normal
+        self.darken_surface = pygame.Surface(
+            (settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT), pygame.SRCALPHA
+        )
+        self.darken_surface.fill((0, 0, 0, 128))
+
         # A surface that supports alpha for each tile to draw
-        self.tile_alpha_surface = pygame.Surface(
+        tile_alpha_surface = pygame.Surface(
             (settings.TILE_SIZE, settings.TILE_SIZE), pygame.SRCALPHA
         )
         pygame.draw.rect(
-            self.tile_alpha_surface,
+            tile_alpha_surface,
             (0, 0, 0, 255),
             pygame.Rect(0, 0, settings.TILE_SIZE, settings.TILE_SIZE),
             border_radius=7,
         )
 
+        # Compose the random tiles and their shadows for display once
+        self.backdrop = pygame.Surface(
+            (
+                settings.BOARD_WIDTH * settings.TILE_SIZE + 2,
+                settings.BOARD_HEIGHT * settings.TILE_SIZE + 2,
+            ),
+            pygame.SRCALPHA,
+        )
+        for i in range(settings.BOARD_HEIGHT):
+            for j in range(settings.BOARD_WIDTH):
+                x = j * settings.TILE_SIZE
+                y = i * settings.TILE_SIZE
+
+                color = random.randint(0, settings.NUM_COLORS - 1)
+                variety = random.randint(0, settings.NUM_VARIETIES - 1)
+                frame = settings.FRAMES["tiles"][color][variety]
+
+                self.backdrop.blit(settings.TEXTURES["tiles"], (x + 2, y + 2), frame)
+                self.backdrop.blit(tile_alpha_surface, (x + 2, y + 2))
+                self.backdrop.blit(settings.TEXTURES["tiles"], (x, y), frame)
+
+        self.backdrop = self.backdrop.convert_alpha()
+
         # A surface that supports alpha for the title and the menu
         self.text_alpha_surface = pygame.Surface((300, 58), pygame.SRCALPHA)
         pygame.draw.rect(
@@ -89,41 +109,19 @@ class StartState(BaseState):
         self.active = True
 
     def render(self, surface: pygame.Surface) -> None:
-        # Render all the tiles and their shadows
-        for i in range(settings.BOARD_HEIGHT):
-            for j in range(settings.BOARD_HEIGHT):
-                x = j * settings.TILE_SIZE + 128
-                y = i * settings.TILE_SIZE + 16
-
-                # Frame position in the list
-                f = i * settings.BOARD_HEIGHT + j
-
-                surface.blit(settings.TEXTURES["tiles"], (x + 2, y + 2), self.frames[f])
-                surface.blit(self.tile_alpha_surface, (x + 2, y + 2))
-                surface.blit(
-                    settings.TEXTURES["tiles"],
-                    (x, y),
-                    self.frames[i * settings.BOARD_HEIGHT + j],
-                )
-
-        # keep the background and tiles a little darker than normal
-        pygame.draw.rect(
-            self.screen_alpha_surface,
-            (0, 0, 0, 128),
-            pygame.Rect(0, 0, settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT),
-        )
-        surface.blit(self.screen_alpha_surface, (0, 0))
+        surface.blit(self.backdrop, (128, 16))
+        surface.blit(self.darken_surface, (0, 0))
         self.__draw_match3_text(surface, -60)
         self.__draw_options(surface, 12)
 
-        # draw our transition rect; is normally fully transparent, unless we're
-        # moving to a new state
-        pygame.draw.rect(
-            self.screen_alpha_surface,
-            (255, 255, 255, self.alpha_transition),
-            pygame.Rect(0, 0, settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT),
-        )
-        surface.blit(self.screen_alpha_surface, (0, 0))
+        # draw our transition rect only while we're moving to a new state
+        if self.alpha_transition > 0:
+            pygame.draw.rect(
+                self.screen_alpha_surface,
+                (255, 255, 255, self.alpha_transition),
+                pygame.Rect(0, 0, settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT),
+            )
+            surface.blit(self.screen_alpha_surface, (0, 0))
 
     def on_input(self, input_id: str, input_data: InputData) -> None:
         if not self.active:
@@ -152,7 +150,7 @@ class StartState(BaseState):
 
         # draw MATCH 3 text shadows
         for i, (l, x) in enumerate(self.LETTER_TABLE.items()):
-            render_text(
+            TextCache.render_text(
                 surface,
                 l,
                 settings.FONTS["huge"],
@@ -173,7 +171,7 @@ class StartState(BaseState):
             (99, 155, 255, 255) if self.current_menu_item == 1 else (48, 96, 130, 255)
         )
 
-        render_text(
+        TextCache.render_text(
             surface,
             "Start",
             settings.FONTS["medium"],
@@ -188,7 +186,7 @@ class StartState(BaseState):
             (99, 155, 255, 255) if self.current_menu_item == 2 else (48, 96, 130, 255)
         )
 
-        render_text(
+        TextCache.render_text(
             surface,
             "Quit Game",
             settings.FONTS["medium"],
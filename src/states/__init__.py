@@ -2,5 +2,6 @@ from src.states.StartState import StartState
 from src.states.BeginGameState import BeginGameState
 from src.states.PlayState import PlayState
 from src.states.GameOverState import GameOverState
+from src.states.ReplayState import ReplayState
 
-(StartState, BeginGameState, PlayState, GameOverState)
+(StartState, BeginGameState, PlayState, GameOverState, ReplayState)
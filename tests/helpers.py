@@ -0,0 +1,51 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the helpers shared by the tests: the backends to test and
+boards with given or random colors.
+"""
+
+from typing import List, Sequence
+
+import random
+
+import pytest
+
+from src.core import BitboardBoardCore, BoardCore, NumpyBoardCore
+
+# NumpyBoardCore is None without NumPy
+BACKENDS = [
+    pytest.param(BoardCore, id="list"),
+    pytest.param(BitboardBoardCore, id="bitboard"),
+    pytest.param(
+        NumpyBoardCore,
+        id="numpy",
+        marks=pytest.mark.skipif(NumpyBoardCore is None, reason="NumPy not installed"),
+    ),
+]
+
+NUM_VARIETIES = 6
+
+
+def board_of(
+    backend, colors: Sequence[int], width: int, num_colors: int, seed: int = 0
+) -> BoardCore:
+    # A board with these colors, row by row, and neither varieties nor
+    # power-ups
+    cells = bytes(colors) + bytes(len(colors))
+    height = len(colors) // width
+    return backend(width, height, num_colors, NUM_VARIETIES, seed=seed, cells=cells)
+
+
+def random_colors(
+    rng: random.Random, width: int, height: int, num_colors: int
+) -> List[int]:
+    return [rng.randrange(num_colors) for _ in range(width * height)]
+
+
+def layers(core: BoardCore) -> List[bytes]:
+    return [bytes(core.colors), bytes(core.varieties), bytes(core.power_ups)]
@@ -0,0 +1,84 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests that every backend finds the same matches,
+power-ups and valid moves as BoardCore and plays the same games.
+"""
+
+import random
+
+import pytest
+
+from src.core import BoardCore
+from src.core.Solver import play_move, play_power_up, valid_moves
+from tests.helpers import BACKENDS, board_of, layers, random_colors
+
+
+def normalized(matches):
+    return None if matches is None else sorted(sorted(match) for match in matches)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_matches_as_board_core(backend) -> None:
+    rng = random.Random(1)
+
+    for _ in range(200):
+        width = rng.randint(3, 10)
+        height = rng.randint(3, 10)
+        num_colors = rng.randint(3, 5)
+        colors = random_colors(rng, width, height, num_colors)
+        expected = board_of(BoardCore, colors, width, num_colors)
+        core = board_of(backend, colors, width, num_colors)
+
+        cells = [(rng.randrange(height), rng.randrange(width)) for _ in range(6)]
+        last_i, last_j = rng.choice([(-1, -1), cells[0]])
+
+        assert normalized(core.calculate_matches_for(cells, last_i, last_j)) == (
+            normalized(expected.calculate_matches_for(cells, last_i, last_j))
+        )
+        assert sorted(core.match_shapes) == sorted(expected.match_shapes)
+        assert layers(core) == layers(expected)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_valid_moves_as_board_core(backend) -> None:
+    rng = random.Random(2)
+
+    for _ in range(200):
+        width = rng.randint(3, 10)
+        height = rng.randint(3, 10)
+        num_colors = rng.randint(3, 8)
+        colors = random_colors(rng, width, height, num_colors)
+        expected = board_of(BoardCore, colors, width, num_colors)
+        core = board_of(backend, colors, width, num_colors)
+
+        assert core.valid_moves() == expected.valid_moves()
+        assert core.has_any_move() == expected.has_any_move()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_games_as_board_core(backend) -> None:
+    for seed in range(10):
+        expected = BoardCore(8, 8, 6, 6, seed=seed)
+        core = backend(8, 8, 6, 6, seed=seed)
+        rng = random.Random(seed)
+        assert layers(core) == layers(expected)
+
+        for _ in range(40):
+            power_ups = expected.power_up_cells()
+            assert core.power_up_cells() == power_ups
+
+            if len(power_ups) > 0 and rng.random() < 0.3:
+                i, j = rng.choice(power_ups)
+                assert play_power_up(core, i, j) == play_power_up(expected, i, j)
+            else:
+                move = rng.choice(valid_moves(expected))
+                assert play_move(core, move) == play_move(expected, move)
+
+            assert core.count_possible_matches() == expected.count_possible_matches()
+            assert layers(core) == layers(expected)
+            assert core.reshuffle_count == expected.reshuffle_count
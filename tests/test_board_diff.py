@@ -0,0 +1,65 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of BoardDiff: its round trip through bytes and
+how it rebuilds a board from a copy.
+"""
+
+import random
+
+import pytest
+
+from src.core import BoardCore, BoardDiff
+from src.core.Solver import valid_moves
+from tests.helpers import BACKENDS, layers
+
+
+def play_swap(core: BoardCore, move) -> list:
+    # Plays a swap as the server does, returning its diffs
+    i1, j1, i2, j2 = move
+    core.swap(i1, j1, i2, j2)
+    steps = core.resolve_cascade([(i1, j1), (i2, j2)], i2, j2)
+    diffs = [BoardDiff([], [(i1, j1, i2, j2), (i2, j2, i1, j1)], [], [])]
+    return diffs + [step.diff() for step in steps]
+
+
+def test_board_diff_bytes() -> None:
+    diffs = [
+        BoardDiff([], [], [], []),
+        BoardDiff(
+            [(0, 1), (300, 2)],
+            [(0, 0, 1, 0), (1, 2, 3, 2)],
+            [(0, 0, 17, 5)],
+            [(4, 4, 3, 2, 1), (70, 1, 0, 0, 2)],
+        ),
+    ]
+    core = BoardCore(8, 8, 6, 6, seed=1)
+    for _ in range(20):
+        diffs += play_swap(core, random.Random(len(diffs)).choice(valid_moves(core)))
+        core.count_possible_matches()
+
+    for diff in diffs:
+        assert BoardDiff.from_bytes(diff.to_bytes()) == diff
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_board_diffs_rebuild_the_board(backend) -> None:
+    core = backend(8, 8, 6, 6, seed=2)
+    mirror = backend.from_bytes(core.to_bytes())
+    rng = random.Random(2)
+
+    for _ in range(30):
+        core.count_possible_matches()
+        reshuffle_count = core.reshuffle_count
+        for diff in play_swap(core, rng.choice(valid_moves(core))):
+            diff.apply(mirror)
+        assert layers(mirror) == layers(core)
+
+        # A new board is not a diff; the mirror starts again from it
+        core.count_possible_matches()
+        if core.reshuffle_count != reshuffle_count:
+            mirror = backend.from_bytes(core.to_bytes())
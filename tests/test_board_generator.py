@@ -0,0 +1,69 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of the board generator: new boards start
+without matches and with at least the moves asked for.
+"""
+
+import random
+
+import pytest
+
+from src.core.board_generator import generate_tiles
+from tests.helpers import BACKENDS, board_of
+
+
+@pytest.mark.parametrize(
+    "width, height, num_colors, min_moves",
+    [
+        (8, 8, 18, 1),
+        (8, 8, 18, 2),
+        (8, 8, 18, 8),
+        (8, 8, 6, 10),
+        (8, 8, 4, 6),
+        (9, 7, 5, 4),
+        (2, 8, 6, 1),
+        (8, 2, 6, 2),
+        (1, 6, 5, 1),
+        (3, 3, 4, 1),
+        (32, 32, 18, 40),
+    ],
+)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_moves_and_no_matches(backend, width, height, num_colors, min_moves) -> None:
+    rng = random.Random(width * 1000 + height * 10 + min_moves)
+
+    for _ in range(20):
+        colors, varieties = generate_tiles(
+            width, height, num_colors, 6, min_moves, rng
+        )
+        assert all(0 <= color < num_colors for color in colors)
+        assert all(0 <= variety < 6 for variety in varieties)
+
+        core = board_of(backend, colors, width, num_colors)
+        cells = [(i, j) for i in range(height) for j in range(width)]
+        assert core.calculate_matches_for(cells) is None
+        assert len(core.valid_moves()) >= min_moves
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_new_boards(backend) -> None:
+    for seed in range(20):
+        core = backend(8, 8, 18, 6, min_moves=2, seed=seed)
+        cells = [(i, j) for i in range(8) for j in range(8)]
+        assert core.calculate_matches_for(cells) is None
+        assert len(core.valid_moves()) >= 2
+
+
+def test_impossible_boards() -> None:
+    # No swap can make a run of 3 on these boards
+    with pytest.raises(ValueError):
+        generate_tiles(2, 2, 6, 6, 1, random.Random(1))
+    with pytest.raises(ValueError):
+        generate_tiles(1, 3, 6, 6, 1, random.Random(1))
+    with pytest.raises(ValueError):
+        generate_tiles(8, 8, 3, 6, 1, random.Random(1))
@@ -0,0 +1,134 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of resolve_cascade: the order of its steps, the
+tiles that refill the board and the power-ups left at the moved tile.
+"""
+
+import random
+
+import pytest
+
+from src.core import BoardCore
+from src.core.constants import EMPTY
+from src.core.Solver import valid_moves
+from tests.helpers import BACKENDS, board_of, layers
+
+
+def play_swap(core: BoardCore, rng: random.Random):
+    # Swaps a random valid move, returning the move, the board before the
+    # cascade and the steps of the cascade
+    core.count_possible_matches()
+    i1, j1, i2, j2 = move = rng.choice(valid_moves(core))
+    core.swap(i1, j1, i2, j2)
+    board = core.clone()
+    return move, board, core.resolve_cascade([(i1, j1), (i2, j2)], i2, j2)
+
+
+def board_with_line(backend, row) -> BoardCore:
+    # Colors 0 to 3 in the last row of a 6x5 board, and color 0 over its
+    # third cell, so that the swap (3, 2, 4, 2) moves a 0 into it. The other
+    # cells have colors 4 to 9 without matches.
+    colors = [4 + (i * 3 + j) % 6 for i in range(5) for j in range(6)]
+    colors[24 : 24 + len(row)] = row
+    colors[3 * 6 + 2] = 0
+    return board_of(backend, colors, 6, 10)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_cascade_steps_in_order(backend) -> None:
+    for seed in range(6):
+        core = backend(8, 8, 6, 6, seed=seed)
+        rng = random.Random(seed)
+
+        for _ in range(10):
+            (i1, j1, i2, j2), board, steps = play_swap(core, rng)
+            # The first matches go through the swapped cells, the next ones
+            # through the cells that the previous step filled
+            cells = {(i1, j1), (i2, j2)}
+            assert len(steps) > 0
+
+            for step in steps:
+                # The moved tile left as a power-up is not in its match
+                power_ups = [(i, j) for i, j, _, _, _ in step.power_ups]
+                assert len(step.matches) > 0
+                for match in step.matches:
+                    assert len(match) >= 3
+                    assert len({board.color(i, j) for i, j in match}) == 1
+                    assert not cells.isdisjoint(match + power_ups)
+
+                for from_i, to_i, j in step.moves:
+                    assert from_i < to_i
+
+                step.diff().apply(board)
+                assert EMPTY not in layers(board)[0]
+                cells = {(to_i, j) for _, to_i, j in step.moves}
+                cells |= {(i, j) for i, j, _, _ in step.new_tiles}
+
+            # The last step leaves no matches
+            assert layers(board) == layers(core)
+            assert board.calculate_matches_for(list(cells)) is None
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_cascade_refill(backend) -> None:
+    core = backend(8, 8, 6, 6, seed=7)
+    rng = random.Random(7)
+
+    for _ in range(20):
+        core.count_possible_matches()
+        twin = core.clone()
+        state = rng.getstate()
+        _, board, steps = play_swap(core, rng)
+
+        for step in steps:
+            # Every column is refilled from the top, one new tile per hole
+            removed = [cell for match in step.matches for cell in match]
+            for j in range(core.width):
+                rows = sorted(i for i, k, _, _ in step.new_tiles if k == j)
+                holes = sum(1 for _, k in removed if k == j)
+                assert rows == list(range(holes))
+
+            for _, _, color, variety in step.new_tiles:
+                assert 0 <= color < 6 and 0 <= variety < 6
+
+        # The new tiles come from the board RNG, so a copy of the board draws
+        # the same ones
+        twin_rng = random.Random()
+        twin_rng.setstate(state)
+        assert play_swap(twin, twin_rng)[2] == steps
+        assert layers(twin) == layers(core)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(
+    "row, power_up",
+    [([0, 0, 1, 4], 0), ([0, 0, 1, 0], 1), ([0, 0, 1, 0, 0], 2)],
+)
+def test_cascade_power_up_at_moved_tile(backend, row, power_up) -> None:
+    core = board_with_line(backend, row)
+    core.swap(3, 2, 4, 2)
+    steps = core.resolve_cascade([(3, 2), (4, 2)], 4, 2)
+    line = [(4, j) for j, color in enumerate(row) if color == 0 and j != 2]
+
+    if power_up == 0:
+        # A line of 3 removes the moved tile too
+        assert [sorted(match) for match in steps[0].matches] == [
+            sorted(line + [(4, 2)])
+        ]
+        assert steps[0].power_ups == []
+        return
+
+    # The moved tile stays as the power-up, with its color, and the rest of
+    # the line is removed
+    assert [sorted(match) for match in steps[0].matches] == [line]
+    (i, j, color, variety, created), *others = steps[0].power_ups
+    assert (i, j, color, created) == (4, 2, 0, power_up)
+    assert others == []
+    assert (core.color(4, 2), core.variety(4, 2)) == (0, variety)
+    assert core.power_up(4, 2) == power_up
+    assert all(len(step.power_ups) == 0 for step in steps[1:])
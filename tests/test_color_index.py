@@ -0,0 +1,94 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of the index of the cells of every color and
+power-up, rebuilt from the cells after every change of the board.
+"""
+
+import random
+
+import pytest
+
+from src.core import BoardCore
+from src.core.constants import EMPTY
+from tests.helpers import BACKENDS, layers
+
+
+def assert_index(core: BoardCore) -> None:
+    colors, _, power_ups = layers(core)
+    cells = [divmod(k, core.width) for k in range(core.width * core.height)]
+
+    for color in range(core.num_colors):
+        expected = [cell for cell, c in zip(cells, colors) if c == color]
+        assert core.cells_of_color(color) == expected
+    assert core.color_counts() == [
+        colors.count(color) for color in range(core.num_colors)
+    ]
+    assert core.power_up_cells() == [
+        cell
+        for cell, color, power_up in zip(cells, colors, power_ups)
+        if color != EMPTY and power_up != 0
+    ]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_color_index_matches_the_cells(backend) -> None:
+    for seed in range(4):
+        core = backend(9, 7, 6, 6, seed=seed)
+        rng = random.Random(seed)
+        assert_index(core)
+
+        for _ in range(40):
+            action = rng.random()
+
+            if action < 0.3:
+                moves = core.valid_moves()
+                if len(moves) == 0:
+                    core.recreate_board()
+                    continue
+                i1, j1, i2, j2 = rng.choice(moves)
+                core.swap(i1, j1, i2, j2)
+                assert_index(core)
+                core.resolve_cascade([(i1, j1), (i2, j2)], i2, j2)
+            elif action < 0.5:
+                # Removed cells, then the fall and refill into them
+                cells = {
+                    (rng.randrange(core.height), rng.randrange(core.width))
+                    for _ in range(rng.randint(1, 6))
+                }
+                core.remove_cells(list(cells))
+                assert_index(core)
+                core.get_falling_tiles()
+            elif action < 0.6:
+                i, j = rng.randrange(core.height), rng.randrange(core.width)
+                core.create_power_up(i, j, rng.choice((4, 5)))
+            elif action < 0.7:
+                for i, j in core.power_up_cells()[:1]:
+                    core.remove_cells(core.activate_power_up(i, j) + [(i, j)])
+                    assert_index(core)
+                    core.resolve_cascade([])
+            elif action < 0.8:
+                core.recreate_board()
+            elif action < 0.9:
+                core = backend.from_bytes(core.to_bytes(), seed=seed)
+            else:
+                core = core.clone()
+
+            assert_index(core)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_color_index_of_a_clone_is_its_own(backend) -> None:
+    core = backend(8, 8, 6, 6, seed=9)
+    clone = core.clone()
+    clone.remove_cells([(0, 0), (3, 4)])
+    clone.create_power_up(5, 5, 5)
+    clone.get_falling_tiles()
+
+    assert_index(core)
+    assert_index(clone)
+    assert layers(core) != layers(clone)
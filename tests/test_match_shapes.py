@@ -0,0 +1,81 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of the shapes of the matches and the power-ups
+they leave.
+"""
+
+import pytest
+
+from src.core.match_shapes import (
+    L_SHAPE,
+    LINE_3,
+    LINE_4,
+    LINE_5,
+    POWER_UPS,
+    T_SHAPE,
+    classify,
+    runs,
+)
+from tests.helpers import BACKENDS, board_of
+
+
+@pytest.mark.parametrize(
+    "match, shape",
+    [
+        ([(0, 0), (0, 1), (0, 2)], LINE_3),
+        ([(0, 0), (1, 0), (2, 0)], LINE_3),
+        ([(2, 1), (2, 2), (2, 3), (2, 4)], LINE_4),
+        ([(0, 3), (1, 3), (2, 3), (3, 3), (4, 3)], LINE_5),
+        ([(0, j) for j in range(7)], LINE_5),
+        # Runs joined at an end of both, in the four corners
+        ([(0, 0), (0, 1), (0, 2), (1, 0), (2, 0)], L_SHAPE),
+        ([(0, 0), (0, 1), (0, 2), (1, 2), (2, 2)], L_SHAPE),
+        ([(2, 0), (2, 1), (2, 2), (0, 0), (1, 0)], L_SHAPE),
+        ([(2, 0), (2, 1), (2, 2), (0, 2), (1, 2)], L_SHAPE),
+        # Runs joined by the middle of one of them
+        ([(0, 0), (0, 1), (0, 2), (1, 1), (2, 1)], T_SHAPE),
+        ([(0, 0), (1, 0), (2, 0), (1, 1), (1, 2)], T_SHAPE),
+        ([(1, 0), (1, 1), (1, 2), (0, 1), (2, 1)], T_SHAPE),
+        # An end of the vertical run and the middle of the horizontal one
+        ([(0, 1), (1, 1), (2, 1), (2, 0), (2, 2)], T_SHAPE),
+    ],
+)
+def test_classify(match, shape) -> None:
+    assert classify(match) == shape
+
+
+def test_runs() -> None:
+    cells = {(0, 0), (0, 1), (0, 2), (1, 0), (2, 0), (1, 2)}
+    assert runs(cells, 0, 1) == [[(0, 0), (0, 1), (0, 2)]]
+    assert runs(cells, 1, 0) == [[(0, 0), (1, 0), (2, 0)]]
+
+
+def test_power_ups() -> None:
+    assert [POWER_UPS[shape] for shape in (LINE_3, LINE_4, LINE_5)] == [0, 1, 2]
+    assert POWER_UPS[L_SHAPE] == POWER_UPS[T_SHAPE] == 2
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_board_classifies_its_matches(backend) -> None:
+    # Color 0 makes an L when (3, 0) moves to (2, 0), and a line of 3 in the
+    # last row
+    colors = [
+        0, 1, 2, 3, 4,
+        0, 2, 3, 4, 1,
+        1, 0, 0, 2, 3,
+        0, 3, 4, 1, 2,
+        0, 0, 0, 3, 4,
+    ]  # fmt: skip
+    core = board_of(backend, colors, 5, 5)
+    core.swap(3, 0, 2, 0)
+    core.calculate_matches_for([(2, 0), (3, 0), (4, 0)], 2, 0)
+
+    shapes = dict(zip((min(match) for match in core.matches), core.match_shapes))
+    assert shapes == {(0, 0): L_SHAPE, (4, 0): LINE_3}
+    assert core.power_up(2, 0) == POWER_UPS[L_SHAPE]
+    assert core.power_up(4, 0) == 0
@@ -0,0 +1,121 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of the incremental index of valid swaps against
+the swaps found from scratch, after random swaps, falls and reshuffles.
+"""
+
+from typing import List, Set
+
+import random
+
+import pytest
+
+from src.core import BoardCore
+from src.core.constants import EMPTY
+from src.core.MoveIndex import Move
+from tests.helpers import BACKENDS, layers
+
+
+def in_run(colors: List[int], width: int, height: int, i: int, j: int) -> bool:
+    color = colors[i * width + j]
+    for di, dj in ((0, 1), (1, 0)):
+        count = 1
+        for step in (1, -1):
+            row, col = i + di * step, j + dj * step
+            while 0 <= row < height and 0 <= col < width:
+                if colors[row * width + col] != color:
+                    break
+                count += 1
+                row, col = row + di * step, col + dj * step
+        if count >= 3:
+            return True
+    return False
+
+
+def moves_from_scratch(core: BoardCore) -> Set[Move]:
+    width, height = core.width, core.height
+    colors = list(layers(core)[0])
+    moves = set()
+
+    for i in range(height):
+        for j in range(width):
+            for i2, j2 in ((i, j + 1), (i + 1, j)):
+                if i2 >= height or j2 >= width:
+                    continue
+                k1, k2 = i * width + j, i2 * width + j2
+                if colors[k1] == colors[k2] or EMPTY in (colors[k1], colors[k2]):
+                    continue
+                colors[k1], colors[k2] = colors[k2], colors[k1]
+                if in_run(colors, width, height, i, j) or in_run(
+                    colors, width, height, i2, j2
+                ):
+                    moves.add((i, j, i2, j2))
+                colors[k1], colors[k2] = colors[k2], colors[k1]
+
+    return moves
+
+
+def assert_index(core: BoardCore) -> None:
+    expected = moves_from_scratch(core)
+    assert core.has_any_move() == (len(expected) > 0)
+    if len(expected) > 0:
+        assert core.count_possible_matches() == len(expected)
+    assert set(core.valid_moves()) == expected
+
+
+def random_swap(core: BoardCore, rng: random.Random) -> Move:
+    i = rng.randrange(core.height)
+    j = rng.randrange(core.width)
+    if j < core.width - 1 and (i == core.height - 1 or rng.random() < 0.5):
+        return i, j, i, j + 1
+    if i < core.height - 1:
+        return i, j, i + 1, j
+    return i, j - 1, i, j
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("width, height, num_colors", [(8, 8, 4), (20, 16, 6)])
+def test_move_index_as_from_scratch(backend, width, height, num_colors) -> None:
+    for seed in range(4):
+        core = backend(width, height, num_colors, 6, seed=seed)
+        rng = random.Random(seed)
+        assert_index(core)
+
+        for _ in range(60):
+            action = rng.random()
+
+            if action < 0.4:
+                # A swap, undone when it makes no match as the game does
+                i1, j1, i2, j2 = random_swap(core, rng)
+                valid = (i1, j1, i2, j2) in core.valid_moves()
+                core.swap(i1, j1, i2, j2)
+                if valid:
+                    core.resolve_cascade([(i1, j1), (i2, j2)], i2, j2)
+                else:
+                    assert_index(core)
+                    core.swap(i1, j1, i2, j2)
+            elif action < 0.7:
+                # Holes, as a power-up leaves them, checked before and after
+                # the tiles fall into them
+                cells = {
+                    (rng.randrange(height), rng.randrange(width))
+                    for _ in range(rng.randint(1, 4))
+                }
+                core.remove_cells(list(cells))
+                assert_index(core)
+                core.resolve_cascade([])
+            elif action < 0.8:
+                core.create_power_up(
+                    rng.randrange(height), rng.randrange(width), rng.choice((4, 5))
+                )
+            elif action < 0.9:
+                core.recreate_board()
+            else:
+                core = core.clone()
+
+            assert_index(core)
@@ -0,0 +1,136 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of the replays: their round trip through
+bytes, the versions they are read from and the games they play back.
+"""
+
+import random
+import struct
+
+import pytest
+
+from src.core import BoardCore
+from src.core.Replay import HEADERS, PAYLOADS, Replay
+from src.core.Solver import play_move, play_power_up, valid_moves
+from tests.helpers import BACKENDS, layers
+
+
+def record_game(seed: int) -> Replay:
+    # A game of two boards with swaps and power-ups, as PlayState records it
+    replay = Replay(8, 8, 6, 6)
+    rng = random.Random(seed)
+    time_ms = 0
+
+    for board in range(2):
+        board_seed = rng.getrandbits(64)
+        replay.add_board(board_seed, time_ms)
+        core = BoardCore(8, 8, 6, 6, seed=board_seed)
+        core.count_possible_matches()
+
+        for _ in range(30):
+            time_ms += rng.randint(100, 3000)
+            power_ups = core.power_up_cells()
+            if len(power_ups) > 0 and rng.random() < 0.3:
+                replay.add_power_up(*power_ups[0], time_ms)
+                play_power_up(core, *power_ups[0])
+            else:
+                move = rng.choice(valid_moves(core))
+                replay.add_swap(*move, time_ms)
+                play_move(core, move)
+            core.count_possible_matches()
+
+    return replay
+
+
+def test_replay_bytes() -> None:
+    replay = record_game(6)
+    copy = Replay.from_bytes(replay.to_bytes())
+
+    assert (copy.width, copy.height, copy.num_colors, copy.num_varieties) == (
+        8,
+        8,
+        6,
+        6,
+    )
+    assert copy.events == replay.events
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_replay_plays_the_same_game(backend) -> None:
+    replay = Replay.from_bytes(record_game(7).to_bytes())
+    expected = [(event, layers(core), points) for event, core, points in replay.play()]
+    played = [
+        (event, layers(core), points) for event, core, points in replay.play(backend)
+    ]
+
+    assert played == expected
+    assert sum(points for _, _, points in played) > 0
+
+
+def test_replay_sizes() -> None:
+    replay = Replay(300, 1000, 6, 6)
+    replay.add_board(1, 0)
+    replay.add_swap(999, 299, 999, 298, 10)
+    replay.add_power_up(512, 256, 20)
+    assert Replay.from_bytes(replay.to_bytes()).events == replay.events
+
+    with pytest.raises(ValueError):
+        Replay(70000, 8, 6, 6)
+    with pytest.raises(ValueError):
+        Replay(8, 8, 256, 6)
+
+
+def test_replay_version_1() -> None:
+    event = struct.Struct("<IB")
+    data = (
+        HEADERS[1].pack(b"M3RP", 1, 8, 8, 6, 6)
+        + event.pack(0, 0)
+        + PAYLOADS[1][0].pack(42)
+        + event.pack(250, 1)
+        + PAYLOADS[1][1].pack(1, 2, 1, 3)
+        + event.pack(500, 2)
+        + PAYLOADS[1][2].pack(4, 5)
+    )
+    replay = Replay.from_bytes(data)
+
+    assert (replay.width, replay.height) == (8, 8)
+    assert replay.events == [(0, 0, (42,)), (250, 1, (1, 2, 1, 3)), (500, 2, (4, 5))]
+
+
+def test_replay_errors() -> None:
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b"M3BS" + bytes(8))
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b"M3RP" + bytes([9]) + bytes(6))
+
+
+def test_replay_truncated() -> None:
+    replay = record_game(4)
+    data = replay.to_bytes()
+
+    # Cut at an event boundary a replay keeps the events before the cut;
+    # anywhere else it is not read
+    for size in range(len(data)):
+        try:
+            events = Replay.from_bytes(data[:size]).events
+        except ValueError:
+            continue
+        assert events == replay.events[: len(events)]
+
+
+def test_replay_corrupt() -> None:
+    replay = Replay(8, 8, 6, 6)
+    replay.add_board(1, 0)
+    header = replay.to_bytes()
+
+    for kind, payload in ((3, bytes(8)), (1, PAYLOADS[2][1].pack(8, 0, 7, 0))):
+        data = header + struct.pack("<IB", 10, kind) + payload
+        with pytest.raises(ValueError):
+            Replay.from_bytes(data)
+    with pytest.raises(ValueError):
+        Replay.from_bytes(HEADERS[2].pack(b"M3RP", 2, 0, 8, 6, 6))
@@ -0,0 +1,128 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of the session server: a client keeps a copy of
+its board from the diffs of the server and the server rejects what the game
+does not allow.
+"""
+
+import asyncio
+import random
+
+from src.core import BoardCore
+from src.core.SessionServer import (
+    FULL,
+    NEW,
+    OK,
+    REJECTED,
+    UNKNOWN_SESSION,
+    Session,
+    SessionClient,
+    SessionServer,
+)
+from tests.helpers import layers
+
+
+def swaps(board: BoardCore) -> list:
+    # The valid swaps with a moved tile that is not a power-up
+    moves = []
+    for i1, j1, i2, j2 in board.valid_moves():
+        if board.power_up(i1, j1) == 0:
+            moves.append((i1, j1, i2, j2))
+        elif board.power_up(i2, j2) == 0:
+            moves.append((i2, j2, i1, j1))
+    return moves
+
+
+async def play_session(seed: int) -> None:
+    server = SessionServer(num_colors=6, max_sessions=2, seed=seed)
+    listener = await server.start()
+    port = listener.sockets[0].getsockname()[1]
+    client = await SessionClient.connect(port=port)
+    rng = random.Random(seed)
+
+    try:
+        session, board = await client.new_session()
+        assert layers(board) == layers(server.sessions[session].core)
+        score = 0
+
+        for _ in range(60):
+            power_ups = board.power_up_cells()
+            if len(power_ups) > 0 and rng.random() < 0.3:
+                status, new_score, diffs = await client.power_up(
+                    session, *rng.choice(power_ups)
+                )
+            else:
+                status, new_score, diffs = await client.swap(
+                    session, *rng.choice(swaps(board))
+                )
+
+            assert status == OK
+            assert new_score > score
+            score = new_score
+            for diff in diffs:
+                diff.apply(board)
+            assert layers(board) == layers(server.sessions[session].core)
+
+        assert await client.close_session(session) == (OK, score)
+        assert session not in server.sessions
+    finally:
+        await client.close()
+        listener.close()
+        await listener.wait_closed()
+
+
+def test_client_board_follows_the_diffs() -> None:
+    for seed in range(3):
+        asyncio.run(play_session(seed))
+
+
+async def reject_commands() -> None:
+    server = SessionServer(num_colors=6, max_sessions=1, seed=1)
+    listener = await server.start()
+    port = listener.sockets[0].getsockname()[1]
+    client = await SessionClient.connect(port=port)
+
+    try:
+        session, board = await client.new_session()
+        assert await client.new_session() == (0, None)
+        status, _, _, _ = await client.request(NEW)
+        assert status == FULL
+
+        no_match = next(
+            (0, j, 0, j + 1)
+            for j in range(7)
+            if (0, j, 0, j + 1) not in board.valid_moves()
+        )
+        for move in ((0, 0, 2, 0), (0, 0, 1, 1), (7, 7, 8, 7), no_match):
+            assert await client.swap(session, *move) == (REJECTED, 0, [])
+
+        no_power_up = next(
+            (i, j) for i in range(8) for j in range(8) if board.power_up(i, j) == 0
+        )
+        assert await client.power_up(session, *no_power_up) == (REJECTED, 0, [])
+        assert (await client.swap(session + 1, 0, 0, 0, 1))[0] == UNKNOWN_SESSION
+        assert layers(board) == layers(server.sessions[session].core)
+    finally:
+        await client.close()
+        listener.close()
+        await listener.wait_closed()
+
+
+def test_server_rejects_invalid_commands() -> None:
+    asyncio.run(reject_commands())
+
+
+def test_power_up_cannot_be_moved() -> None:
+    # Clicking a power-up activates it, so it is never the moved tile
+    session = Session(BoardCore(8, 8, 6, 6, seed=2))
+    i1, j1, i2, j2 = session.core.valid_moves()[0]
+    session.core.create_power_up(i1, j1, 4)
+
+    assert session.swap(i1, j1, i2, j2) is None
+    assert session.score == 0
+    assert session.swap(i2, j2, i1, j1) is not None
@@ -0,0 +1,73 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of the board snapshots and their round trip
+through every backend.
+"""
+
+import random
+
+import pytest
+
+from src.core import BitboardBoardCore, BoardCore
+from src.core.BoardCore import SNAPSHOT_HEADER
+from src.core.Solver import play_move, play_power_up, valid_moves
+from tests.helpers import BACKENDS, layers
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_snapshot(backend) -> None:
+    core = backend(9, 7, 18, 6, seed=3)
+    rng = random.Random(3)
+    for _ in range(10):
+        core.count_possible_matches()
+        play_move(core, rng.choice(valid_moves(core)))
+    for i, j in core.power_up_cells()[:1]:
+        play_power_up(core, i, j)
+    core.create_power_up(0, 0, 4)
+    core.create_power_up(6, 8, 5)
+
+    for loader in (backend, BoardCore, BitboardBoardCore):
+        copy = loader.from_bytes(core.to_bytes(), seed=4)
+        assert (copy.width, copy.height) == (core.width, core.height)
+        assert (copy.num_colors, copy.num_varieties) == (18, 6)
+        assert layers(copy) == layers(core)
+        assert copy.valid_moves() == core.valid_moves()
+        assert copy.power_up_cells() == core.power_up_cells()
+        assert copy.to_bytes() == core.to_bytes()
+
+
+def test_snapshot_errors() -> None:
+    data = BoardCore(8, 8, 6, 6, seed=5).to_bytes()
+
+    with pytest.raises(ValueError):
+        BoardCore.from_bytes(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        BoardCore.from_bytes(data[:4] + bytes([99]) + data[5:])
+    with pytest.raises(ValueError):
+        BoardCore.from_bytes(data[:-1])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_snapshot_keeps_every_variety(backend) -> None:
+    core = backend(8, 8, 6, 64, seed=6)
+    for k in range(64):
+        core.set_tile(k // 8, k % 8, k % 6, k, k % 3)
+
+    copy = backend.from_bytes(core.to_bytes())
+    assert layers(copy) == layers(core)
+
+
+def test_snapshot_too_many_varieties() -> None:
+    data = BoardCore(8, 8, 6, 64, seed=7).to_bytes()
+
+    with pytest.raises(ValueError):
+        BoardCore(8, 8, 6, 65, seed=7).to_bytes()
+    with pytest.raises(ValueError):
+        # The number of varieties is the last field of the header
+        size = SNAPSHOT_HEADER.size
+        BoardCore.from_bytes(data[: size - 1] + bytes([65]) + data[size:])
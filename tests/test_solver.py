@@ -0,0 +1,101 @@
+"""
+ISPPV1 2023
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests of the solver: the moves it considers, the move
+it finds and its answer when the time budget runs out.
+"""
+
+import random
+
+import pytest
+
+from src.core import BoardCore
+from src.core.Solver import Solver, evaluate_move, play_move, valid_moves
+from tests.helpers import BACKENDS, board_of, layers
+
+
+def board_with_power_ups(backend, seed: int) -> BoardCore:
+    # A board where some valid swaps move one power-up and some move two
+    core = backend(8, 8, 6, 6, seed=seed)
+    moves = core.valid_moves()
+    for i1, j1, i2, j2 in moves[:3]:
+        core.create_power_up(i1, j1, 4)
+    for i1, j1, i2, j2 in moves[-2:]:
+        core.create_power_up(i1, j1, 5)
+        core.create_power_up(i2, j2, 4)
+    return core
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_valid_moves_never_move_a_power_up(backend) -> None:
+    for seed in range(10):
+        core = board_with_power_ups(backend, seed)
+        moves = valid_moves(core)
+
+        expected = set()
+        for i1, j1, i2, j2 in core.valid_moves():
+            if core.power_up(i1, j1) == 0:
+                expected.add((i1, j1, i2, j2))
+            elif core.power_up(i2, j2) == 0:
+                expected.add((i2, j2, i1, j1))
+
+        assert len(moves) == len(expected) > 0
+        assert set(moves) == expected
+        assert all(core.power_up(i1, j1) == 0 for i1, j1, _, _ in moves)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_best_move(backend) -> None:
+    for seed in range(4):
+        core = board_with_power_ups(backend, seed)
+        before = layers(core)
+        solver = Solver(seed=seed)
+
+        for depth in (1, 2):
+            move = solver.best_move(core, depth)
+            moves = valid_moves(core)
+            scores = [evaluate_move(core, other, depth, seed) for other in moves]
+
+            assert solver.depth_reached == depth
+            assert move in moves
+            assert core.power_up(move[0], move[1]) == 0
+            assert scores[moves.index(move)] == max(scores)
+
+        # The board is only simulated on copies
+        assert layers(core) == before
+
+
+def test_best_move_without_time() -> None:
+    core = board_with_power_ups(BoardCore, 7)
+    solver = Solver()
+
+    # Without time for a single depth any valid move is a hint
+    assert solver.best_move(core, 3, time_budget=0) == valid_moves(core)[0]
+    assert solver.depth_reached == 0
+
+    # A budget that runs out keeps the answer of the last depth finished
+    move = solver.best_move(core, 50, time_budget=0.05)
+    assert move in valid_moves(core)
+    assert solver.depth_reached < 50
+
+
+def test_best_move_without_moves() -> None:
+    colors = [(i * 3 + j) % 6 for i in range(5) for j in range(5)]
+    core = board_of(BoardCore, colors, 5, 6)
+
+    assert Solver().best_move(core) is None
+
+
+def test_play_move_scores_the_cascade() -> None:
+    rng = random.Random(11)
+    core = BoardCore(8, 8, 6, 6, seed=11)
+    for _ in range(20):
+        core.count_possible_matches()
+        board = core.clone()
+        points = play_move(board, rng.choice(valid_moves(core)))
+        assert points > 0 and points % 50 == 0
+        core = board